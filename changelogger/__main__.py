@@ -1,3 +1,5 @@
 from changelogger.app import app
 
-app(prog_name="changelogger")
+# Guarded, since child processes started by spawning import this module.
+if __name__ == "__main__":
+    app(prog_name="changelogger")
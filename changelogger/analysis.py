@@ -0,0 +1,231 @@
+"""Analysis of how versioned file patterns perform against their files.
+
+Each pattern is timed over its file, with its matches counted and measured,
+and its parsed form is inspected for quantifiers which risk catastrophic
+backtracking, such as `(a+)+`, or scanning to the end of the file and
+backtracking, such as `[\\s\\S]*` followed by more of the pattern.
+"""
+import re
+from typing import Any, NamedTuple
+
+from changelogger import changelog, engines, large_files, templating
+from changelogger.conf import settings
+from changelogger.conf.models import VersionedFile
+from changelogger.exceptions import PatternTimeoutException
+from changelogger.models.domain_models import ChangelogUpdate
+
+try:
+    from re import _parser as sre_parse  # type: ignore
+    from re._constants import (  # type: ignore
+        ANY,
+        BRANCH,
+        CATEGORY,
+        IN,
+        MAX_REPEAT,
+        MAXREPEAT,
+        MIN_REPEAT,
+        SUBPATTERN,
+    )
+except ImportError:  # Python 3.10
+    import sre_parse  # type: ignore
+    from sre_constants import (  # type: ignore
+        ANY,
+        BRANCH,
+        CATEGORY,
+        IN,
+        MAX_REPEAT,
+        MAXREPEAT,
+        MIN_REPEAT,
+        SUBPATTERN,
+    )
+
+# Matches spanning more than this many characters are worth bounding.
+LARGE_MATCH_SIZE = 10_000
+
+_REPEATS = (MAX_REPEAT, MIN_REPEAT)
+
+# Shown as the engine of literal patterns, which don't use one.
+LITERAL = "literal"
+
+# Profiling looks for the patterns which backtrack, so it always stops them,
+# even when no timeout is configured.
+DEFAULT_TIMEOUT = 5.0
+
+
+class PatternProfile(NamedTuple):
+    file: VersionedFile
+    pattern: str
+    engine: str
+    seconds: float | None
+    matches: int
+    largest_match: int
+    warnings: list[str]
+
+
+def profile_pattern(
+    file: VersionedFile,
+    update: ChangelogUpdate,
+    content: str | None,
+) -> PatternProfile:
+    """Times every match of the file's rendered pattern over the content,
+    warning about risky quantifiers and large matches, and about patterns
+    which take longer than the timeout. Large files are memory mapped and
+    searched in place when no content is given.
+    """
+    pattern = templating.render_pattern(file, update)
+    engine = file.engine or settings.REGEX_ENGINE
+    if file.is_literal:
+        engine = LITERAL
+    elif engine != engines.RE2 or not engines.is_available(engines.RE2):
+        engine = engines.RE
+
+    span = (
+        None
+        if content is None
+        else changelog.segment_span(file, update, content)
+    )
+    # RE2 and literal searches take linear time, so they never backtrack.
+    warnings = (
+        risky_quantifiers(pattern, file.regex_flags, bounded=bool(span))
+        if engine == engines.RE
+        else []
+    )
+
+    timeout = file.timeout or settings.PATTERN_TIMEOUT or DEFAULT_TIMEOUT
+    try:
+        if content is None:
+            seconds, sizes = engines.time_file_matches(
+                large_files.compile_pattern(file, pattern),
+                file.rel_path,
+                timeout,
+            )
+        else:
+            start, end = span or (0, len(content))
+            seconds, sizes = engines.time_matches(
+                templating.compile_pattern(file, pattern),
+                content,
+                start,
+                end,
+                timeout,
+            )
+    except PatternTimeoutException as e:
+        return PatternProfile(
+            file, pattern, engine, None, 0, 0, [*warnings, str(e)]
+        )
+
+    largest_match = max(sizes, default=0)
+    if largest_match > LARGE_MATCH_SIZE:
+        warnings.append(
+            f"Matches up to {largest_match} characters; bound the pattern "
+            "to the text it replaces."
+        )
+    if not sizes:
+        warnings.append("No matches.")
+
+    return PatternProfile(
+        file,
+        pattern,
+        engine,
+        seconds,
+        len(sizes),
+        largest_match,
+        warnings,
+    )
+
+
+def risky_quantifiers(
+    pattern: str,
+    flags: int = 0,
+    bounded: bool = False,
+) -> list[str]:
+    """Warnings for nested unbounded quantifiers, and for greedy quantifiers
+    over any character which are followed by more of the pattern. The
+    latter are expected when the pattern only searches a bounded span.
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        # The engine will report invalid patterns when they're compiled.
+        return []
+
+    warnings: list[str] = []
+    dotall = bool(parsed.state.flags & re.DOTALL)
+    _walk(list(parsed), dotall, bounded, False, False, warnings)
+    return list(dict.fromkeys(warnings))
+
+
+def _walk(
+    items: list[tuple[Any, Any]],
+    dotall: bool,
+    bounded: bool,
+    in_repeat: bool,
+    followed: bool,
+    warnings: list[str],
+) -> None:
+    for i, (op, av) in enumerate(items):
+        item_followed = followed or i < len(items) - 1
+        if op in _REPEATS:
+            min_repeat, max_repeat, subpattern = av
+            unbounded = max_repeat == MAXREPEAT
+            if unbounded and in_repeat:
+                warnings.append(
+                    "Nested unbounded quantifiers, like `(a+)+`, risk "
+                    "catastrophic backtracking."
+                )
+            if (
+                unbounded
+                and op == MAX_REPEAT
+                and item_followed
+                and not bounded
+                and _matches_anything(list(subpattern), dotall)
+            ):
+                warnings.append(
+                    "Greedy `[\\s\\S]*` scans to the end of the file; "
+                    "prefer `*?` or a narrower class."
+                )
+            _walk(
+                list(subpattern),
+                dotall,
+                bounded,
+                in_repeat or unbounded,
+                item_followed or max_repeat > 1,
+                warnings,
+            )
+        elif op == SUBPATTERN:
+            _walk(
+                list(av[-1]),
+                dotall,
+                bounded,
+                in_repeat,
+                item_followed,
+                warnings,
+            )
+        elif op == BRANCH:
+            for branch in av[1]:
+                _walk(
+                    list(branch),
+                    dotall,
+                    bounded,
+                    in_repeat,
+                    item_followed,
+                    warnings,
+                )
+
+
+def _matches_anything(items: list[tuple[Any, Any]], dotall: bool) -> bool:
+    if len(items) != 1:
+        return False
+
+    op, av = items[0]
+    if op == ANY:
+        return dotall
+    if op != IN:
+        return False
+
+    # A class of a category and its negation, like `[\s\S]`.
+    categories = {str(category) for kind, category in av if kind == CATEGORY}
+    return any(
+        category.replace("_NOT_", "_") in categories
+        for category in categories
+        if "_NOT_" in category
+    )
@@ -3,16 +3,17 @@ from pathlib import Path
 from typing import Callable
 
 import typer
-from git.exc import InvalidGitRepositoryError
-from git.repo import Repo
 from rich import print
 
+from changelogger import metrics, profiling, templating, utils
 from changelogger.app.commands.add import add
+from changelogger.app.commands.cache import cache
 from changelogger.app.commands.check import check
 from changelogger.app.commands.force import force
 from changelogger.app.commands.init import init
 from changelogger.app.commands.notes import notes
 from changelogger.app.commands.precommit import precommit
+from changelogger.app.commands.recover import recover
 from changelogger.app.commands.upgrade import upgrade
 from changelogger.app.commands.versions import versions
 from changelogger.conf import settings
@@ -52,6 +53,8 @@ app.add_command(notes)
 app.add_command(upgrade, "up")
 app.add_command(force)
 app.add_command(versions)
+app.add_command(cache)
+app.add_command(recover)
 app.add_command(precommit, hidden=True)
 
 
@@ -73,7 +76,41 @@ def changelogger(
         help="The version of Changelogger you have installed.",
         callback=version_callback,
     ),
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Print how long each phase of the command took.",
+    ),
+    profile_trace: Path = typer.Option(
+        None,
+        "--profile-trace",
+        help=(
+            "Write the profile to this file as a Chrome trace, viewable in "
+            "chrome://tracing or Perfetto. Implies --profile."
+        ),
+        dir_okay=False,
+    ),
+    metrics_path: Path = typer.Option(
+        None,
+        "--metrics",
+        envvar=metrics.METRICS_ENV_VAR,
+        help=(
+            "Write counters of file reads, regex and template compiles, and "
+            "bytes read and written to this file as JSON, or to stderr if "
+            "it's `-`."
+        ),
+        dir_okay=False,
+    ),
 ):
+    if profile or profile_trace:
+        profiling.enable()
+        ctx.call_on_close(partial(_report_profile, profile_trace))
+
+    if metrics_path:
+        ctx.call_on_close(
+            partial(_dump_metrics, metrics_path, ctx.invoked_subcommand)
+        )
+
     if (
         not ctx.invoked_subcommand == init.__name__
         and not settings.CHANGELOG_PATH.exists()
@@ -84,7 +121,12 @@ def changelogger(
         )
         raise typer.Abort()
 
-    if settings.HAS_DEFAULTS:
+    # Most repos can be recognized by their ".git" entry, which avoids
+    # importing GitPython for commands which never need it.
+    if settings.HAS_DEFAULTS and not Path.cwd().joinpath(".git").exists():
+        from git.exc import InvalidGitRepositoryError
+        from git.repo import Repo
+
         try:
             __ = Repo(Path.cwd()).git_dir
         except InvalidGitRepositoryError:
@@ -95,6 +137,22 @@ def changelogger(
             raise typer.Abort()
 
 
+def _dump_metrics(path: Path, command: str | None) -> None:
+    metrics.dump(
+        path,
+        command=command,
+        regex_cache=utils.regex_cache_stats(),
+        template_cache=templating.cache_stats(),
+    )
+
+
+def _report_profile(trace_path: Path | None) -> None:
+    profiling.disable()
+    profiling.print_summary()
+    if trace_path:
+        profiling.write_trace(trace_path)
+
+
 changelogger.__doc__ = f"""
 Automated management of your changelog and other versioned files, following the
 principles of Keep a Changelog and Semantic Versioning.\n
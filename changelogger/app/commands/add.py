@@ -1,13 +1,13 @@
 import typer
 
-from changelogger import changelog
+from changelogger import changelog, fragments
 from changelogger.app.prompts import (
     prompt_unreleased_changelog,
     rollback_handler,
 )
 from changelogger.conf import settings
 from changelogger.conf.models import VersionedFile
-from changelogger.models.domain_models import ChangelogUpdate
+from changelogger.models.domain_models import ChangelogUpdate, ReleaseNotes
 
 ADDED_HELP = "For new features."
 CHANGED_HELP = "For changes in existing functionality."
@@ -28,6 +28,19 @@ def add(
     """Add changes to the unreleased section of your changelog file. If no
     options are provided, you will be prompted for changes.
     """
+    if settings.FRAGMENTS:
+        _add_fragments(
+            ReleaseNotes(
+                added=list(added),
+                changed=list(changed),
+                deprecated=list(deprecated),
+                removed=list(removed),
+                fixed=list(fixed),
+                security=list(security),
+            )
+        )
+        return
+
     all_versions = changelog.get_all_versions()
     old_version = all_versions[0]
     release_notes = changelog.get_release_notes("Unreleased", old_version)
@@ -60,3 +73,18 @@ def add(
             update=update,
             versioned_files=[changelog_file],
         )
+
+
+def _add_fragments(release_notes: ReleaseNotes) -> None:
+    # Each note is written to its own file, so the changelog doesn't need to
+    # be read, let alone rendered.
+    if not release_notes:
+        release_notes = prompt_unreleased_changelog(
+            ChangelogUpdate(
+                new_version=None,
+                old_version=None,
+                release_notes=release_notes,
+            )
+        ).release_notes
+
+    fragments.write(release_notes)
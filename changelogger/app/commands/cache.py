@@ -0,0 +1,41 @@
+from enum import Enum
+
+from rich import print
+
+from changelogger import cache as changelogger_cache
+from changelogger import changelog
+from changelogger.conf import settings
+
+
+class CacheAction(Enum):
+    STATS = "stats"
+    CLEAR = "clear"
+    WARM = "warm"
+
+
+def cache(action: CacheAction) -> None:
+    """Manages the on-disk cache of the parsed changelog, which lets
+    repeat invocations skip parsing an unchanged changelog file.
+    """
+    if action == CacheAction.CLEAR:
+        changelogger_cache.clear()
+        print(f'Cleared the cache in "{settings.CACHE_DIR}".')
+        return
+
+    if action == CacheAction.WARM:
+        index = changelog.get_changelog_index()
+        print(
+            f"Cached {len(index.headings)} headings and {len(index.links)} "
+            f'links from "{settings.CHANGELOG_PATH}".'
+        )
+        return
+
+    entries = changelogger_cache.entries()
+    total_size = sum(entry.stat().st_size for entry in entries)
+    print(f'[bold]Cache directory:[/bold] "{settings.CACHE_DIR}"')
+    print(f"[bold]Entries:[/bold] {len(entries)} ({total_size} bytes)")
+    for entry in entries:
+        print(
+            f"  {entry.relative_to(settings.CACHE_DIR)} "
+            f"({entry.stat().st_size} bytes)"
+        )
@@ -1,16 +1,33 @@
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Callable
 
 import typer
 from rich import print
+from rich.markup import escape
 from rich.progress import Progress
+from rich.table import Table
 
-from changelogger import changelog, templating
+from changelogger import (
+    analysis,
+    changelog,
+    engines,
+    large_files,
+    literals,
+    profiling,
+    templating,
+)
 from changelogger.conf import settings
 from changelogger.conf.models import VersionedFile
-from changelogger.exceptions import ValidationException
+from changelogger.exceptions import (
+    PatternTimeoutException,
+    ValidationException,
+)
 from changelogger.models.domain_models import ChangelogUpdate
-from changelogger.utils import cached_compile
+from changelogger.utils import read_text
+
+JOBS_HELP = "The number of versioned files to check concurrently."
 
 
 def check(
@@ -25,6 +42,21 @@ def check(
         "--file",
         help="Only check the specified file(s).",
     ),
+    jobs: int = typer.Option(
+        1,
+        "--jobs",
+        "-j",
+        min=1,
+        help=JOBS_HELP,
+    ),
+    profile_patterns: bool = typer.Option(
+        False,
+        "--profile-patterns",
+        help=(
+            "Instead of checking, time each pattern against its file and "
+            "warn about patterns which risk slow searches."
+        ),
+    ),
 ) -> None:
     """Checks the versioned files for any unparsable sections which do not match
     the Changelogger configuration and reports them.
@@ -38,8 +70,13 @@ def check(
             if str(file.rel_path) in files_set
         ]
     )
+    if profile_patterns:
+        if _profile_patterns(versioned_files) and sys_exit:
+            raise typer.Exit(code=2)
+        return
+
     try:
-        _check_versioned_files(versioned_files)
+        _check_versioned_files(versioned_files, jobs)
     except ValidationException as e:
         print(f"[bold red]Error:[/bold red] {str(e)}")
         if sys_exit:
@@ -50,24 +87,30 @@ def check(
         )
 
 
-def _check_versioned_files(versioned_files: list[VersionedFile]) -> None:
+def _check_versioned_files(
+    versioned_files: list[VersionedFile],
+    jobs: int = 1,
+) -> None:
     """For each of the user-specified and default versioned files, check
     that a search for the pattern over the files content results in a find.
+
+    Entries sharing a path are checked together so each file is read once,
+    and up to `jobs` files are checked concurrently. Every problem found is
+    reported, in the order the files were declared.
     """
 
-    # Contrive a fake update so we can check if the pattern would have been
-    # found.
-    old_version = changelog.get_latest_version()
-    update = ChangelogUpdate(
-        new_version=old_version.bump_minor(),
-        old_version=old_version,
-        release_notes=changelog.get_release_notes("Unreleased", old_version),
-    )
+    update = _contrived_update()
 
+    # Counter preserves the order in which each path is first declared.
     counts = Counter(file.rel_path for file in versioned_files)
+    groups: dict[Path, list[VersionedFile]] = {path: [] for path in counts}
+    for file in versioned_files:
+        groups[file.rel_path].append(file)
+
+    errors: list[str] = []
     with Progress() as progress:
         if settings.CHANGELOG_PATH in counts:
-            counts[settings.CHANGELOG_PATH] += 6
+            counts[settings.CHANGELOG_PATH] += 1
 
         tasks = {
             path: progress.add_task(
@@ -77,30 +120,146 @@ def _check_versioned_files(versioned_files: list[VersionedFile]) -> None:
             for path, total in counts.items()
         }
 
-        for file in versioned_files:
-            _check_versioned_file(file, update)
-            progress.advance(tasks[file.rel_path])
+        def check_group(path: Path, files: list[VersionedFile]) -> list[str]:
+            # Large files are searched in place rather than read.
+            content = None
+            if not large_files.is_large(path):
+                try:
+                    with profiling.span("file read", path=path):
+                        content = read_text(path)
+                except OSError as e:
+                    return [f'Could not read "{path}": {e}']
 
-        if any(
-            file.rel_path == settings.CHANGELOG_PATH
-            for file in versioned_files
-        ):
+            group_errors = []
+            found = _find_literals(path, files, update, content)
+            for i, file in enumerate(files):
+                try:
+                    _check_versioned_file(file, update, content, found.get(i))
+                except ValidationException as e:
+                    group_errors.append(str(e))
+                progress.advance(tasks[path])
+            return group_errors
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            # map yields results in submission order, keeping the reported
+            # errors deterministic regardless of which file finishes first.
+            for group_errors in executor.map(
+                check_group,
+                groups,
+                groups.values(),
+            ):
+                errors.extend(group_errors)
+
+        if settings.CHANGELOG_PATH in groups:
             advancer = lambda: progress.advance(
                 tasks[settings.CHANGELOG_PATH],
             )
-            _check_changelog(advancer)
+            try:
+                _check_changelog(advancer)
+            except ValidationException as e:
+                errors.append(str(e))
+
+    if errors:
+        raise ValidationException("\n\n".join(errors))
+
+
+def _profile_patterns(versioned_files: list[VersionedFile]) -> bool:
+    """Prints a table of how each versioned file's pattern performs against
+    its file, returning whether any pattern was warned about.
+    """
+    update = _contrived_update()
+    contents: dict[Path, str] = {}
+
+    table = Table(title="Pattern profiles")
+    for column in ("File", "Pattern", "Engine"):
+        table.add_column(column)
+    for column in ("Time (ms)", "Matches", "Largest match"):
+        table.add_column(column, justify="right")
+    table.add_column("Warnings")
+
+    warned = False
+    for file in versioned_files:
+        if file.rel_path not in contents and not large_files.is_large(
+            file.rel_path
+        ):
+            try:
+                with profiling.span("file read", path=file.rel_path):
+                    contents[file.rel_path] = read_text(file.rel_path)
+            except OSError as e:
+                warned = True
+                table.add_row(
+                    str(file.rel_path),
+                    escape(file.pattern),
+                    *["-"] * 4,
+                    escape(f"Could not read the file: {e}"),
+                )
+                continue
+        profile = analysis.profile_pattern(
+            file,
+            update,
+            contents.get(file.rel_path),
+        )
+        warned = warned or bool(profile.warnings)
+        table.add_row(
+            str(file.rel_path),
+            escape(profile.pattern),
+            profile.engine,
+            "-" if profile.seconds is None else f"{profile.seconds * 1e3:.3f}",
+            str(profile.matches),
+            str(profile.largest_match),
+            escape("\n".join(profile.warnings)),
+        )
+
+    print(table)
+    return warned
+
+
+def _contrived_update() -> ChangelogUpdate:
+    """Contrive a fake update so we can check if the patterns would have been
+    found.
+    """
+    try:
+        old_version = changelog.get_latest_version()
+        return ChangelogUpdate(
+            new_version=old_version.bump_minor(),
+            old_version=old_version,
+            release_notes=changelog.get_release_notes(
+                "Unreleased",
+                old_version,
+            ),
+        )
+    except Exception as e:
+        # The changelog can't be read; report everything wrong with it.
+        _check_changelog(lambda: None)
+        raise ValidationException(f"Failed to read the changelog: {e}")
 
 
 def _check_versioned_file(
-    file: VersionedFile, update: ChangelogUpdate
+    file: VersionedFile,
+    update: ChangelogUpdate,
+    content: str | None = None,
+    found: bool | None = None,
 ) -> None:
     """Renders the versioned files pattern with an update and confirms
-    there's a match.
+    there's a match in the content, which is read from the file if it
+    isn't provided. Large files are searched in place instead. The search
+    is skipped when whether the pattern was found is already known.
     """
 
     pattern = templating.render_pattern(file, update)
-    content = file.rel_path.read_text()
-    if cached_compile(pattern).search(content):
+    timeout = file.timeout or settings.PATTERN_TIMEOUT
+    try:
+        if found is not None:
+            pass
+        elif content is None and large_files.is_large(file.rel_path):
+            found = large_files.search(file, pattern, timeout)
+        else:
+            found = _search(file, update, pattern, content, timeout)
+    except PatternTimeoutException as e:
+        raise PatternTimeoutException(
+            f'Timed out checking "{file.rel_path}". {e}'
+        ) from e
+    if found:
         return
 
     raise ValidationException(
@@ -110,67 +269,62 @@ def _check_versioned_file(
     )
 
 
-def _check_changelog(advance: Callable) -> None:
-    """Validates the specified versioned files are parsable and updatable."""
-    # Validate there's at least 1 version
-    # Point of Failure 0
-    all_versions = changelog.get_all_versions()
-    if not all_versions:
-        raise ValidationException(
-            "Expected there to be at least 1 version; None found."
-        )
-    advance()
+def _find_literals(
+    path: Path,
+    files: list[VersionedFile],
+    update: ChangelogUpdate,
+    content: str | None,
+) -> dict[int, bool]:
+    """Whether each of the file's literal patterns is found, by their index
+    in the files, searching for all of them in one pass when there are
+    enough to be worth it. Large files are searched in place.
+    """
+    # Literals with flags are left to fail compiling if they're unsupported.
+    indices = [
+        i for i, file in enumerate(files) if file.is_literal and not file.flags
+    ]
+    if len(indices) < literals.AUTOMATON_MIN_LITERALS:
+        return {}
 
-    # Validate all release notes are parseable for all versions
-    # Point of Failure 1
-    changelog_versions = ["Unreleased", *all_versions, None]
-    for new_version, old_version in zip(
-        changelog_versions, changelog_versions[1:]
-    ):
-        try:
-            changelog.get_release_notes(new_version, old_version)  # type: ignore
-        except Exception as e:
-            raise ValidationException(
-                f"Failed to validate notes for version {new_version}: {str(e)}."
-            )
-    advance()
+    patterns = [templating.render_pattern(files[i], update) for i in indices]
+    with profiling.span("regex search", path=path):
+        if content is not None:
+            found = literals.find_all(patterns, content)
+        else:
+            with engines.map_file(path) as buffer:
+                found = literals.find_all(
+                    [pattern.encode() for pattern in patterns],
+                    buffer,
+                )
+    return dict(zip(indices, found))
 
-    # Validate there are links in the expected format for all versions
-    # Point of Failure 2
-    sorted_versions = changelog.get_sorted_versions()
-    all_links = changelog.get_all_links()
-    for prev_version, version in zip(sorted_versions, sorted_versions[1:]):
-        link = all_links.get(version)
-        if not link:
-            raise ValidationException(
-                f"Could not find the link for version {version}"
-            )
 
-        # Point of Failure 3
-        if f"{prev_version}...{version}" not in link:
-            raise ValidationException(
-                f"Link is incorrect for version {version}"
-            )
-    advance()
+def _search(
+    file: VersionedFile,
+    update: ChangelogUpdate,
+    pattern: str,
+    content: str | None,
+    timeout: float | None,
+) -> bool:
+    if content is None:
+        with profiling.span("file read", path=file.rel_path):
+            content = read_text(file.rel_path)
+    compiled = templating.compile_pattern(file, pattern)
+    span = changelog.segment_span(file, update, content) or (0, len(content))
+    with profiling.span("regex search", path=file.rel_path):
+        return engines.search(compiled, content, *span, timeout=timeout)
 
-    link = all_links.get("Unreleased")
-    # Point of Failure 4
-    if not link:
-        raise ValidationException(
-            "Could not find the link for unreleased changes."
-        )
-    advance()
 
-    # Point of Failure 5
-    if f"{all_versions[0]}...HEAD" not in link:
-        raise ValidationException(
-            "Link is incorrect for the unreleased changes."
-        )
+def _check_changelog(advance: Callable) -> None:
+    """Validates the changelog is parsable and updatable, reporting every
+    problem found rather than only the first.
+    """
+    problems = changelog.validate_changelog()
     advance()
+    if not problems:
+        return
 
-    # Point of Failure 6
-    if sorted_versions[0] not in all_links:
-        raise ValidationException(
-            f"Could not find the link for version {sorted_versions[0]}"
-        )
-    advance()
+    raise ValidationException(
+        f'Found {len(problems)} problem(s) in "{settings.CHANGELOG_PATH}":\n'
+        + "\n".join(f"  {problem}" for problem in problems)
+    )
@@ -2,7 +2,7 @@ import typer
 from rich import print
 from rich.markdown import Markdown
 
-from changelogger import changelog
+from changelogger import changelog, fragments
 from changelogger.app.prompts import (
     prompt_unreleased_changelog,
     rollback_handler,
@@ -21,12 +21,26 @@ def force(
         True,
         help="Prompt for additional release notes before applying them.",
     ),
+    jobs: int = typer.Option(
+        1,
+        "--jobs",
+        "-j",
+        min=1,
+        help=(
+            "The number of versioned files to read and render concurrently. "
+            "No file is replaced unless every one succeeds."
+        ),
+    ),
 ) -> None:
     """Force a version override for the upgrade."""
     old_version = changelog.get_latest_version()
     new_version = VersionInfo.parse(forced_version)
 
     release_notes = changelog.get_release_notes("Unreleased", old_version)
+    fragment_paths = fragments.paths() if settings.FRAGMENTS else []
+    if fragment_paths:
+        release_notes = fragments.merge(release_notes, fragment_paths)
+
     update = ChangelogUpdate(
         old_version=old_version,
         new_version=new_version,
@@ -53,4 +67,7 @@ def force(
         changelog.update_versioned_files(
             update,
             settings.VERSIONED_FILES,
+            jobs,
         )
+        # The fragments are part of the release now.
+        fragments.remove(fragment_paths)
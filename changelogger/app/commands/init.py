@@ -55,7 +55,7 @@ def _init_changelog(console: Console) -> None:
             settings.CHANGELOG_JINJA.read_text(),
             dict(
                 today=date.today(),
-                context=dict(git=git.get_ctx()),
+                context=dict(git=git.get_ctx(settings.FIRST_COMMIT)),
             ),
         )
     )
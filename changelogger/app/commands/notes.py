@@ -2,7 +2,8 @@ import typer
 from rich import print
 from rich.markdown import Markdown
 
-from changelogger import changelog
+from changelogger import changelog, fragments
+from changelogger.conf import settings
 from changelogger.models.domain_models import ReleaseNotes, VersionInfo
 
 VERSION_HELP = """
@@ -55,7 +56,10 @@ def _unreleased_notes() -> ReleaseNotes:
     all_versions = changelog.get_all_versions()
 
     # all_versions[0] is the topmost version in the changelog file.
-    return changelog.get_release_notes("Unreleased", all_versions[0])
+    release_notes = changelog.get_release_notes("Unreleased", all_versions[0])
+    if settings.FRAGMENTS:
+        release_notes = fragments.merge(release_notes, fragments.paths())
+    return release_notes
 
 
 def _released_notes(version: VersionInfo) -> ReleaseNotes:
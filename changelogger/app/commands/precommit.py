@@ -1,7 +1,23 @@
-from changelogger.app.commands.check import check
+import typer
+
+from changelogger.app.commands.check import JOBS_HELP, check
 from changelogger.conf import settings
 
 
-def precommit(files: list[str]) -> None:
+def precommit(
+    files: list[str],
+    jobs: int = typer.Option(
+        1,
+        "--jobs",
+        "-j",
+        min=1,
+        help=JOBS_HELP,
+    ),
+) -> None:
     if any(str(file.rel_path) in files for file in settings.VERSIONED_FILES):
-        check(sys_exit=True, files=files)
+        check(
+            sys_exit=True,
+            files=files,
+            jobs=jobs,
+            profile_patterns=False,
+        )
@@ -0,0 +1,18 @@
+from rich import print
+
+from changelogger import transaction
+
+
+def recover() -> None:
+    """Finishes an interrupted upgrade which had begun replacing the
+    versioned files, or undoes one which hadn't.
+    """
+    recovery = transaction.recover()
+    if recovery is None:
+        print("No interrupted upgrade found.")
+        return
+
+    action = "Finished" if recovery.finished else "Undid"
+    print(f"{action} the interrupted upgrade of:")
+    for path in recovery.paths:
+        print(f"  {path}")
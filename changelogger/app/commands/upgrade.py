@@ -2,7 +2,7 @@ import typer
 from rich import print
 from rich.markdown import Markdown
 
-from changelogger import changelog
+from changelogger import changelog, fragments
 from changelogger.app.prompts import (
     prompt_unreleased_changelog,
     rollback_handler,
@@ -21,6 +21,16 @@ def upgrade(
         True,
         help="Prompt for additional release notes before applying them.",
     ),
+    jobs: int = typer.Option(
+        1,
+        "--jobs",
+        "-j",
+        min=1,
+        help=(
+            "The number of versioned files to read and render concurrently. "
+            "No file is replaced unless every one succeeds."
+        ),
+    ),
 ) -> None:
     """Upgrades all versioned files, as specified in the changelogger config file."""
     old_version = changelog.get_latest_version()
@@ -28,6 +38,10 @@ def upgrade(
     new_version = bump()
 
     release_notes = changelog.get_release_notes("Unreleased", old_version)
+    fragment_paths = fragments.paths() if settings.FRAGMENTS else []
+    if fragment_paths:
+        release_notes = fragments.merge(release_notes, fragment_paths)
+
     update = ChangelogUpdate(
         old_version=old_version,
         new_version=new_version,
@@ -54,4 +68,7 @@ def upgrade(
         changelog.update_versioned_files(
             update,
             settings.VERSIONED_FILES,
+            jobs,
         )
+        # The fragments are part of the release now.
+        fragments.remove(fragment_paths)
@@ -0,0 +1,129 @@
+"""An on-disk cache for data derived from files in the repository.
+
+Each entry is a JSON document stored under the configured cache directory,
+alongside the fingerprint of the file it was derived from. An entry is only
+returned while that fingerprint still matches, so a stale entry is never
+used.
+"""
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any
+
+from changelogger import transaction
+from changelogger.conf import settings
+from changelogger.exceptions import CommandException
+from changelogger.utils import CACHE_GITIGNORE, make_cache_dir
+
+CACHE_FORMAT_VERSION = 2
+
+
+def fingerprint(
+    path: Path,
+    data: bytes,
+    mtime_ns: int,
+    size: int,
+) -> dict[str, Any]:
+    """The size, modification time and content hash of a file, hashing the
+    bytes as they were read.
+    """
+    return dict(
+        path=str(path),
+        size=size,
+        mtime_ns=mtime_ns,
+        hash=hashlib.blake2b(data, digest_size=16).hexdigest(),
+    )
+
+
+def read(name: str, file_fingerprint: dict[str, Any]) -> Any | None:
+    """Returns the data cached under the name, if it was stored with the
+    same fingerprint by this version of changelogger.
+    """
+    try:
+        entry = json.loads(_entry_path(name).read_text())
+    except (OSError, ValueError):
+        return None
+
+    if (
+        not isinstance(entry, dict)
+        or entry.get("version") != _version()
+        or entry.get("fingerprint") != file_fingerprint
+    ):
+        return None
+    return entry.get("data")
+
+
+def write(name: str, file_fingerprint: dict[str, Any], data: Any) -> None:
+    """Stores the data under the name. Failing to write the cache never
+    fails a command; the data is simply derived again next time.
+    """
+    entry = dict(
+        version=_version(),
+        fingerprint=file_fingerprint,
+        data=data,
+    )
+    path = _entry_path(name)
+    try:
+        make_cache_dir(settings.CACHE_DIR)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(entry, separators=(",", ":")))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def entries() -> list[Path]:
+    """All files changelogger has cached in the cache directory, other than
+    an interrupted upgrade's journal and snapshots.
+    """
+    if not settings.CACHE_DIR.is_dir():
+        return []
+    # Only what changelogger writes, as the directory is configurable and
+    # may be shared with the user's own files.
+    paths = [
+        path
+        for path in settings.CACHE_DIR.glob("*.json")
+        if not transaction.is_upgrade_file(
+            path.relative_to(settings.CACHE_DIR)
+        )
+    ]
+    paths.extend(bytecode_dir().rglob("*"))
+    return sorted(path for path in paths if path.is_file())
+
+
+def clear() -> None:
+    """Removes the cached files, and the cache directory if that leaves it
+    empty, refusing to while an upgrade's journal would be removed with it.
+    """
+    if transaction.journal_path().exists():
+        raise CommandException(
+            "An upgrade is in progress or was interrupted. Run `changelogger "
+            "recover` to finish or undo it before clearing the cache."
+        )
+    for path in entries():
+        path.unlink(missing_ok=True)
+    shutil.rmtree(bytecode_dir(), ignore_errors=True)
+
+    gitignore = settings.CACHE_DIR.joinpath(".gitignore")
+    if gitignore.is_file() and gitignore.read_text() == CACHE_GITIGNORE:
+        gitignore.unlink()
+    try:
+        settings.CACHE_DIR.rmdir()
+    except OSError:
+        # Anything left there isn't changelogger's to remove.
+        pass
+
+
+def bytecode_dir() -> Path:
+    """The directory of compiled templates."""
+    return settings.CACHE_DIR.joinpath("jinja")
+
+
+def _entry_path(name: str) -> Path:
+    return settings.CACHE_DIR.joinpath(f"{name}.json")
+
+
+def _version() -> list:
+    return [CACHE_FORMAT_VERSION, settings.CHANGELOGGER_VERSION]
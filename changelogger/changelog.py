@@ -1,8 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Literal
+from typing import Literal, NamedTuple
 
-from changelogger import templating
+from changelogger import cache, large_files, profiling, templating, transaction
 from changelogger.conf import settings
+from changelogger.conf.defaults import (
+    DEFAULT_LINKS_JINJA_PATTERN,
+    DEFAULT_OVERVIEW_JINJA_PATTERN,
+)
 from changelogger.conf.models import VersionedFile
 from changelogger.exceptions import (
     CommandException,
@@ -13,93 +19,516 @@ from changelogger.models.domain_models import (
     ChangelogUpdate,
     ReleaseNotes,
     VersionInfo,
+    parse_version,
+    sort_versions,
+)
+from changelogger.utils import (
+    decode_text,
+    read_bytes,
+    read_text,
+    register_pattern,
 )
-from changelogger.utils import cached_compile
 
 CHANGELOG_PARTITION_RELEASE_NOTES = "RELEASE NOTES"
 CHANGELOG_PARTITION_LINKS = "LINKS"
 
+UNRELEASED = "Unreleased"
+
+CHANGELOG_CACHE_NAME = "changelog"
+
+HEADING_RE = register_pattern(r"### \[(.*)](?: - (\d+-\d+-\d+))?")
+SECTION_RE = register_pattern(r"#+(.*)")
+NOTE_RE = register_pattern(r"\- (.*)")
+LINK_RE = register_pattern(r"\[(.*)]: (.*)")
+
+
+class Heading(NamedTuple):
+    """A `### [<label>]` heading found in the release notes partition."""
+
+    label: str
+    version: VersionInfo | None
+    date: str | None
+    # Offsets into the changelog content; `start` is the beginning of the
+    # heading line and `end` is where the next heading (or the partition)
+    # begins.
+    start: int
+    end: int
+    line: int
+    sections: dict[str, list[str]]
+
+
+class ChangelogProblem(NamedTuple):
+    """A problem found while validating the changelog."""
+
+    line: int
+    message: str
+
+    def __str__(self) -> str:
+        return f"line {self.line}: {self.message}"
+
+
+class ChangelogIndex:
+    """The parsed contents of a changelog file.
+
+    The changelog is scanned once, line by line, when the index is built.
+    Every heading, its offsets, date and section bullets are recorded,
+    along with the link table, so lookups never have to search the raw
+    content again.
+    """
+
+    def __init__(self, content: str, cached: dict | None = None) -> None:
+        """Indexes the content, or restores the index from the output of
+        `to_dict` if it was cached for this same content.
+        """
+        self.content = content
+        if cached:
+            self._restore(cached)
+        else:
+            self._scan()
+
+        # Heading positions by label, so a version's notes can be found
+        # without searching. The topmost heading wins for duplicate labels.
+        self._positions: dict[str, int] = {}
+        for i, heading in enumerate(self.headings):
+            self._positions.setdefault(heading.label, i)
+
+    def to_dict(self) -> dict:
+        """A JSON serializable representation of the index."""
+        return dict(
+            partitions=self.partitions,
+            headings=[
+                [
+                    heading.label,
+                    _dump_version(heading.version),
+                    *heading[2:],
+                ]
+                for heading in self.headings
+            ],
+            links=[
+                [
+                    label if isinstance(label, str) else _dump_version(label),
+                    link,
+                    self.link_lines[label],
+                ]
+                for label, link in self.links.items()
+            ],
+        )
+
+    def partition(self, partition: str) -> str:
+        start, end = self._partition_span(partition)
+        return self.content[start:end]
+
+    @property
+    def versions(self) -> list[VersionInfo]:
+        self._partition_span(CHANGELOG_PARTITION_RELEASE_NOTES)
+        return [
+            heading.version
+            for heading in self.headings
+            if heading.version is not None
+        ]
 
-def _get_changelog_parition(partition: str) -> str:
-    changelog_content = settings.CHANGELOG_PATH.read_text()
+    def heading(
+        self,
+        version: VersionInfo | Literal["Unreleased"],
+    ) -> Heading | None:
+        i = self._positions.get(str(version))
+        return None if i is None else self.headings[i]
+
+    def notes_span(
+        self,
+        new_version: VersionInfo | Literal["Unreleased"],
+        old_version: VersionInfo | None,
+    ) -> tuple[int, int]:
+        """Returns the offsets of the notes under the new version's heading,
+        which must be directly followed by the old version's heading if one
+        is provided.
+        """
+        heading = self._notes_heading(new_version, old_version)
+        heading_end = self.content.find("\n", heading.start, heading.end)
+        return (
+            heading.end if heading_end == -1 else heading_end + 1,
+            heading.end,
+        )
+
+    def release_notes(
+        self,
+        new_version: VersionInfo | Literal["Unreleased"],
+        old_version: VersionInfo | None,
+    ) -> ReleaseNotes:
+        heading = self._notes_heading(new_version, old_version)
+
+        release_notes = ReleaseNotes()
+        for attr, notes in heading.sections.items():
+            release_notes[attr] = list(notes)
+        return release_notes
+
+    def _notes_heading(
+        self,
+        new_version: VersionInfo | Literal["Unreleased"],
+        old_version: VersionInfo | None,
+    ) -> Heading:
+        self._partition_span(CHANGELOG_PARTITION_RELEASE_NOTES)
+
+        i = self._positions.get(str(new_version))
+        if i is None:
+            raise UpgradeException("Could not extract release notes.")
+
+        # The notes for a version end at the heading which follows it.
+        if old_version and (
+            i + 1 >= len(self.headings)
+            or self.headings[i + 1].label != str(old_version)
+        ):
+            raise UpgradeException("Could not extract release notes.")
+
+        return self.headings[i]
+
+    def validate(self) -> list[ChangelogProblem]:
+        """Walks the headings and links once, returning every problem which
+        would stop the changelog from being parsed or upgraded, ordered by
+        line.
+        """
+        problems: list[ChangelogProblem] = []
+        for partition in (
+            CHANGELOG_PARTITION_RELEASE_NOTES,
+            CHANGELOG_PARTITION_LINKS,
+        ):
+            if partition not in self.partitions:
+                problems.append(
+                    ChangelogProblem(
+                        1,
+                        f"Expected partition for `{partition}`; None found.",
+                    )
+                )
+        if problems:
+            return problems
+
+        sections = set(ReleaseNotes.sections())
+        versions: list[VersionInfo] = []
+        for i, heading in enumerate(self.headings):
+            if heading.label == UNRELEASED:
+                if i != 0:
+                    problems.append(
+                        ChangelogProblem(
+                            heading.line,
+                            "Expected the unreleased heading to be the "
+                            "first heading.",
+                        )
+                    )
+            elif heading.version is None:
+                problems.append(
+                    ChangelogProblem(
+                        heading.line,
+                        f"`{heading.label}` is not a valid version.",
+                    )
+                )
+            elif self._positions[heading.label] != i:
+                problems.append(
+                    ChangelogProblem(
+                        heading.line,
+                        f"Duplicate heading for version {heading.version}.",
+                    )
+                )
+            elif versions and heading.version > versions[-1]:
+                problems.append(
+                    ChangelogProblem(
+                        heading.line,
+                        f"Version {heading.version} is out of order; "
+                        f"expected it to be lower than {versions[-1]}.",
+                    )
+                )
+            else:
+                versions.append(heading.version)
+
+            for section in heading.sections:
+                if section not in sections:
+                    problems.append(
+                        ChangelogProblem(
+                            heading.line,
+                            "Failed to validate notes for version "
+                            f"{heading.label}: unknown section `{section}`.",
+                        )
+                    )
+
+        notes_line = self._partition_line(CHANGELOG_PARTITION_RELEASE_NOTES)
+        if UNRELEASED not in self._positions:
+            problems.append(
+                ChangelogProblem(
+                    notes_line,
+                    "Could not find the unreleased heading.",
+                )
+            )
+
+        if not versions:
+            problems.append(
+                ChangelogProblem(
+                    notes_line,
+                    "Expected there to be at least 1 version; None found.",
+                )
+            )
+            return sorted(problems)
+
+        sorted_versions = sort_versions(versions)
+        for prev_version, version in zip(
+            [None, *sorted_versions],
+            sorted_versions,
+        ):
+            heading = self.headings[self._positions[str(version)]]
+            link = self.links.get(version)
+            if not link:
+                problems.append(
+                    ChangelogProblem(
+                        heading.line,
+                        f"Could not find the link for version {version}.",
+                    )
+                )
+            elif prev_version and f"{prev_version}...{version}" not in link:
+                problems.append(
+                    ChangelogProblem(
+                        self.link_lines[version],
+                        f"Link is incorrect for version {version}; expected "
+                        f"it to compare {prev_version}...{version}.",
+                    )
+                )
+
+        link = self.links.get(UNRELEASED)
+        if not link:
+            problems.append(
+                ChangelogProblem(
+                    self._partition_line(CHANGELOG_PARTITION_LINKS),
+                    "Could not find the link for unreleased changes.",
+                )
+            )
+        elif f"{versions[0]}...HEAD" not in link:
+            problems.append(
+                ChangelogProblem(
+                    self.link_lines[UNRELEASED],
+                    "Link is incorrect for the unreleased changes; expected "
+                    f"it to compare {versions[0]}...HEAD.",
+                )
+            )
+
+        return sorted(problems)
 
+    def _partition_span(self, partition: str) -> tuple[int, int]:
+        if partition not in self.partitions:
+            raise CommandException(
+                f"Expected partition for `{partition}`; None found."
+            )
+        return self.partitions[partition]
+
+    def _partition_line(self, partition: str) -> int:
+        start, _ = self.partitions[partition]
+        return self.content.count("\n", 0, start) + 1
+
+    def _lines(self, partition: str):
+        """Yields each line of the partition with its offset and line
+        number.
+        """
+        if partition not in self.partitions:
+            return
+
+        start, end = self.partitions[partition]
+        offset = start
+        line_no = self._partition_line(partition)
+        for line in self.content[start:end].split("\n"):
+            yield line, offset, line_no
+            offset += len(line) + 1
+            line_no += 1
+
+    def _scan(self) -> None:
+        self.partitions: dict[str, tuple[int, int]] = {}
+        for partition in (
+            CHANGELOG_PARTITION_RELEASE_NOTES,
+            CHANGELOG_PARTITION_LINKS,
+        ):
+            if span := _find_partition(self.content, partition):
+                self.partitions[partition] = span
+
+        self.headings = self._scan_headings()
+        self.links, self.link_lines = self._scan_links()
+
+    def _restore(self, cached: dict) -> None:
+        self.partitions = {
+            partition: (start, end)
+            for partition, (start, end) in cached["partitions"].items()
+        }
+        self.headings = [
+            Heading(label, _load_version(version), *rest)
+            for label, version, *rest in cached["headings"]
+        ]
+        self.links = {}
+        self.link_lines = {}
+        for label, link, line_no in cached["links"]:
+            version = label if label == UNRELEASED else VersionInfo(*label)
+            self.links[version] = link
+            self.link_lines[version] = line_no
+
+    def _scan_headings(self) -> list[Heading]:
+        headings: list[Heading] = []
+        section: str | None = None
+        for line, offset, line_no in self._lines(
+            CHANGELOG_PARTITION_RELEASE_NOTES,
+        ):
+            stripped = line.lstrip()
+            if match := HEADING_RE.match(stripped):
+                if headings:
+                    headings[-1] = headings[-1]._replace(end=offset)
+
+                label, date = match[1], match[2]
+                version = parse_version(label)
+                headings.append(
+                    Heading(label, version, date, offset, -1, line_no, {})
+                )
+                section = None
+            elif match := SECTION_RE.match(stripped):
+                section = match[1].strip().lower() or None
+                if headings and section:
+                    headings[-1].sections[section] = []
+            elif headings and section and (match := NOTE_RE.search(line)):
+                headings[-1].sections[section].append(match[1].strip())
+
+        if headings:
+            _, end = self.partitions[CHANGELOG_PARTITION_RELEASE_NOTES]
+            headings[-1] = headings[-1]._replace(end=end)
+
+        return headings
+
+    def _scan_links(
+        self,
+    ) -> tuple[dict[VersionInfo | str, str], dict[VersionInfo | str, int]]:
+        links: dict[VersionInfo | str, str] = {}
+        link_lines: dict[VersionInfo | str, int] = {}
+        for line, _, line_no in self._lines(CHANGELOG_PARTITION_LINKS):
+            match = LINK_RE.search(line)
+            if not match:
+                continue
+
+            version_str = match[1]
+            link = match[2]
+
+            if version_str == UNRELEASED:
+                links[version_str] = link
+                link_lines[version_str] = line_no
+                continue
+
+            version = parse_version(version_str)
+            if version is None:
+                continue
+
+            links[version] = link
+            link_lines[version] = line_no
+
+        return links, link_lines
+
+
+def _find_partition(content: str, partition: str) -> tuple[int, int] | None:
     start_partition = f"<!-- BEGIN {partition} -->"
     end_partition = f"<!-- END {partition} -->"
-    partition_re = cached_compile(
-        rf"{start_partition}([\s\S]*){end_partition}"
-    )
-
-    match = partition_re.search(changelog_content)
-    if not match:
-        raise CommandException(
-            f"Expected partition for `{partition}`; None found."
+    start = content.find(start_partition)
+    end = content.rfind(end_partition)
+    if start == -1 or end < start + len(start_partition):
+        return None
+    return start + len(start_partition), end
+
+
+def segment_span(
+    file: VersionedFile,
+    update: ChangelogUpdate,
+    content: str,
+) -> tuple[int, int] | None:
+    """The span of the content the default overview and links segments of
+    the changelog can match within, or None to match the whole content.
+
+    The overview's `[\s\S]*` is greedy, so matching it against the whole
+    changelog scans to the end of the file and backtracks. Bounding it at
+    the old version's heading keeps it proportional to the unreleased notes
+    instead of the whole history.
+    """
+    if file.rel_path != settings.CHANGELOG_PATH:
+        return None
+
+    if file.pattern == DEFAULT_OVERVIEW_JINJA_PATTERN:
+        start = content.find(
+            f"<!-- BEGIN {CHANGELOG_PARTITION_RELEASE_NOTES} -->",
         )
-    return match[1]
+        old_heading = f"### [{update.old_version}]"
+        heading_start = content.find(old_heading, max(start, 0))
+        if start == -1 or heading_start == -1:
+            return None
+        return start, heading_start + len(old_heading)
 
+    if file.pattern == DEFAULT_LINKS_JINJA_PATTERN:
+        return _find_partition(content, CHANGELOG_PARTITION_LINKS)
 
-def _get_release_notes_parition() -> str:
-    return _get_changelog_parition(CHANGELOG_PARTITION_RELEASE_NOTES)
+    return None
 
 
-def _get_links_parition() -> str:
-    return _get_changelog_parition(CHANGELOG_PARTITION_LINKS)
+def get_changelog_index() -> ChangelogIndex:
+    """Returns the index of the changelog file. The file is only read and
+    parsed again if it has changed since the index was last built.
+    """
+    path = settings.CHANGELOG_PATH
+    stat = path.stat()
+    return _load_changelog_index(path, stat.st_mtime_ns, stat.st_size)
 
 
-def get_all_links() -> dict[VersionInfo | str, str]:
-    lines = _get_links_parition().split("\n")
-
-    links = {}
-    for line in lines:
-        match = cached_compile(
-            r"\[(.*)]: (.*)",
-        ).search(
-            line,
-        )
+@lru_cache(maxsize=1)
+def _load_changelog_index(
+    path: Path,
+    mtime_ns: int,
+    size: int,
+) -> ChangelogIndex:
+    with profiling.span("file read", path=path):
+        data = read_bytes(path)
+        content = decode_text(data)
 
-        if not match:
-            continue
+    # Repeat invocations against an unchanged changelog restore the index
+    # from the on-disk cache rather than parsing the file again.
+    fingerprint = cache.fingerprint(path, data, mtime_ns, size)
+    # Not kept alive alongside the content while it's parsed.
+    del data
+    if cached := cache.read(CHANGELOG_CACHE_NAME, fingerprint):
+        with profiling.span("changelog parse", cached=True):
+            return ChangelogIndex(content, cached)
 
-        version_str = match[1]
-        link = match[2]
+    with profiling.span("changelog parse", cached=False):
+        index = ChangelogIndex(content)
+    cache.write(CHANGELOG_CACHE_NAME, fingerprint, index.to_dict())
+    return index
 
-        if version_str == "Unreleased":
-            links[version_str] = link
-            continue
 
-        match = VersionInfo._REGEX.fullmatch(version_str)
-        if not match:
-            continue
+def _dump_version(version: VersionInfo | None) -> list | None:
+    return list(version.to_tuple()) if version else None
 
-        links[VersionInfo.parse(version_str)] = link
 
-    return links
+def _load_version(parts: list | None) -> VersionInfo | None:
+    return VersionInfo(*parts) if parts else None
 
 
-def get_all_versions() -> list[VersionInfo]:
-    lines = _get_release_notes_parition().split("\n")
-    versions = []
-    for line in lines:
-        match = cached_compile(
-            r"### \[(.*)]",
-        ).search(
-            line,
-        )
+def _get_changelog_parition(partition: str) -> str:
+    return get_changelog_index().partition(partition)
+
+
+def _get_release_notes_parition() -> str:
+    return _get_changelog_parition(CHANGELOG_PARTITION_RELEASE_NOTES)
 
-        if not match:
-            continue
 
-        version_str = match[1]
+def _get_links_parition() -> str:
+    return _get_changelog_parition(CHANGELOG_PARTITION_LINKS)
 
-        match = VersionInfo._REGEX.fullmatch(version_str)
-        if not match:
-            continue
 
-        versions.append(VersionInfo.parse(version_str))
-    return versions
+def get_all_links() -> dict[VersionInfo | str, str]:
+    index = get_changelog_index()
+    index.partition(CHANGELOG_PARTITION_LINKS)
+    return dict(index.links)
+
+
+def get_all_versions() -> list[VersionInfo]:
+    return get_changelog_index().versions
 
 
 def get_sorted_versions() -> list[VersionInfo]:
-    return sorted(get_all_versions())
+    return sort_versions(get_all_versions())
 
 
 def get_latest_version() -> VersionInfo:
@@ -109,76 +538,115 @@ def get_latest_version() -> VersionInfo:
     return versions[-1]
 
 
+def validate_changelog() -> list[ChangelogProblem]:
+    return get_changelog_index().validate()
+
+
 def get_release_notes(
     new_version: VersionInfo | Literal["Unreleased"],
     old_version: VersionInfo | None,
 ) -> ReleaseNotes:
-    new_version_pattern = str(new_version).replace(".", r"\.")
-
-    content = _get_release_notes_parition()
-
-    pattern = rf"### \[{new_version_pattern}\]( - \d+-\d+-\d+)?([\s\S]*)"
-    if old_version:
-        old_version_pattern = str(old_version).replace(".", r"\.")
-        pattern += rf"### \[{old_version_pattern}\]"
-    match = cached_compile(
-        pattern,
-    ).search(
-        content,
-    )
-    if not match:
-        raise UpgradeException("Could not extract release notes.")
-
-    raw_notes = match[2]
-    raw_sections = cached_compile("[#]+").split(raw_notes)
-
-    release_notes = ReleaseNotes()
-    for section in raw_sections:
-        section_name, *notes = section.split("\n")
-        if not section_name:
-            continue
-
-        notes = [
-            match[1].strip()
-            for note in notes
-            if (
-                match := cached_compile(
-                    r"\- (.*)",
-                ).search(note)
-            )
-        ]
+    return get_changelog_index().release_notes(new_version, old_version)
 
-        attr = section_name.strip().lower()
-        release_notes[attr] = notes
 
-    return release_notes
+def _is_unchanged(content: str, segments: list[str]) -> bool:
+    """Whether the segments make up the content, without joining them."""
+    offset = 0
+    for segment in segments:
+        if not content.startswith(segment, offset):
+            return False
+        offset += len(segment)
+    return offset == len(content)
 
 
-def _rollback(rollback: list[tuple[Path, str]]) -> None:
-    for path, content in rollback:
-        path.write_text(content)
+def _stage_versioned_file(
+    txn: transaction.Transaction,
+    update: ChangelogUpdate,
+    path: Path,
+    files: list[VersionedFile],
+) -> None:
+    """Stages the file with each of the entries' replacements applied, and
+    snapshots the original, unless the update leaves it unchanged.
+    """
+    if large_files.is_large(path):
+        staged = large_files.update(path, files, update)
+        if staged is not None:
+            txn.stage_file(path, staged)
+            txn.snapshot(path)
+        return
+
+    with profiling.span("file read", path=path):
+        content = read_text(path)
+    new_content = content
+    segments: list[str] = []
+    for i, file in enumerate(files):
+        if i:
+            # Later entries match against the earlier entries' output.
+            new_content = "".join(segments)
+        segments = templating.rewrite(
+            file,
+            update,
+            new_content,
+            segment_span(file, update, new_content),
+        )
+    if not _is_unchanged(content, segments):
+        txn.stage(path, segments)
+        txn.snapshot(path)
 
 
 def update_versioned_files(
     update: ChangelogUpdate,
     versioned_files: list[VersionedFile],
+    jobs: int = 1,
 ) -> None:
-    rollback: list[tuple[Path, str]] = []
+    """Updates the versioned files in a transaction, staging every updated
+    file before any is replaced, and skipping files the update leaves
+    unchanged. Up to `jobs` files are read, rendered and staged
+    concurrently, and none are replaced unless all of them succeed.
+    """
+    # Entries sharing a path are applied to the file's content in the order
+    # they were declared, so each file is read, snapshotted and written once.
+    groups: dict[Path, list[VersionedFile]] = {}
+    for file in versioned_files:
+        groups.setdefault(file.rel_path, []).append(file)
+
+    txn = transaction.Transaction()
+    txn.begin(groups)
     try:
-        for file in versioned_files:
-            content = file.rel_path.read_text()
-            rollback.append((file.rel_path, content))
-            new_content = templating.update(file, update, content)
-            file.rel_path.write_text(new_content)
+        stage = partial(_stage_versioned_file, txn, update)
+        if jobs > 1 and len(groups) > 1:
+            # Leaving the executor waits for running stages, so none are
+            # still writing by the time a failed upgrade is cleaned up;
+            # those yet to start are cancelled by the failure.
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                list(executor.map(stage, groups.keys(), groups.values()))
+        else:
+            for path, files in groups.items():
+                stage(path, files)
+
+        txn.commit(jobs)
     except Exception as upgrade_exc:
         try:
-            # Need to reverse rollback list for proper rollback
-            _rollback(rollback[::-1])
+            # Only committed files were replaced; the rest are untouched.
+            txn.rollback()
         except Exception as rollback_exc:
+            # The journal and snapshots are kept, so the rollback can still
+            # be finished by `recover`.
             raise RollbackException(
                 "An exception occured while upgrading; rollback unsuccessful."
+                "\n\nRun `changelogger recover` to finish undoing the upgrade."
             ) from rollback_exc
+        txn.end()
 
         raise UpgradeException(
             f"An exception occured while upgrading; rollback successful.\n\nException: {repr(upgrade_exc)}"
         ) from upgrade_exc
+
+    txn.end()
+
+    # The changelog may have been rewritten within the resolution of its
+    # modification time, so the index can't be trusted to notice.
+    _load_changelog_index.cache_clear()
+    if settings.CHANGELOG_PATH in groups:
+        # Write the upgraded changelog through to the on-disk cache.
+        get_changelog_index()
@@ -15,6 +15,13 @@ DEFAULT_LINKS_TEMPLATE = Path("links.jinja2")
 
 DEFAULT_TEMPLATES_DIR = Path(".changelogger/templates/")
 
+DEFAULT_CACHE_DIR = Path(".changelogger/cache/")
+
+DEFAULT_FRAGMENTS_DIR = Path(".changelogger/unreleased/")
+
+# Versioned files larger than this many bytes are memory mapped.
+DEFAULT_LARGE_FILE_SIZE = 32 * 1024 * 1024
+
 CHANGELOGGER_NAME = ".changelogger.yml"
 
 CHANGELOGGER_PATH = (
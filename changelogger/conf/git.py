@@ -1,6 +1,9 @@
+from functools import lru_cache
 from pathlib import Path
 
-from git.repo import Repo
+from changelogger import cache, profiling
+
+FIRST_COMMIT_CACHE_NAME = "first_commit"
 
 
 class _Git:
@@ -10,6 +13,10 @@ class _Git:
     GIT_SUFFIX = ".git"
 
     def __init__(self) -> None:
+        # GitPython is slow to import, and only needed once a command asks
+        # for the git context.
+        from git.repo import Repo
+
         self._repo = Repo(
             Path.cwd(),
         )
@@ -31,14 +38,30 @@ class _Git:
         )
 
     def _get_first_commit(self) -> str:
-        commits = list(self._repo.iter_commits())
-        return commits[-1].hexsha[:10]
+        head = self._repo.head.commit.hexsha
+        fingerprint = dict(head=head)
+        if first_commit := cache.read(FIRST_COMMIT_CACHE_NAME, fingerprint):
+            return first_commit
+
+        # Only list the root commits rather than walking the whole history;
+        # when there are several, the oldest is listed last.
+        roots = self._repo.git.rev_list("--max-parents=0", head).split()
+        first_commit = roots[-1][:10]
+        cache.write(FIRST_COMMIT_CACHE_NAME, fingerprint, first_commit)
+        return first_commit
 
-    def get_ctx(self) -> dict:
+    def get_ctx(self, first_commit: str | None = None) -> dict:
         return dict(
             repo=self._get_git_repo(),
-            first_commit=self._get_first_commit(),
+            first_commit=first_commit or self._get_first_commit(),
         )
 
 
-get_ctx = _Git().get_ctx
+@lru_cache(maxsize=None)
+def get_ctx(first_commit: str | None = None) -> dict:
+    """The git context available to templates. The first commit is looked
+    up from the repo unless it's provided, as it must be for shallow clones
+    which don't contain the root commit.
+    """
+    with profiling.span("git context"):
+        return _Git().get_ctx(first_commit)
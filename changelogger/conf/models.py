@@ -1,16 +1,23 @@
 from __future__ import annotations
 
+import re
 from collections import defaultdict
+from enum import Enum
+from functools import reduce
+from operator import or_
 from pathlib import Path
 from typing import DefaultDict
 
 import yaml  # type: ignore
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 from changelogger.conf import git
 from changelogger.conf.defaults import (
     CHANGELOGGER_PATH,
+    DEFAULT_CACHE_DIR,
     DEFAULT_CHANGELOG_PATH,
+    DEFAULT_FRAGMENTS_DIR,
+    DEFAULT_LARGE_FILE_SIZE,
     DEFAULT_LINKS_JINJA_PATTERN,
     DEFAULT_LINKS_TEMPLATE,
     DEFAULT_OVERVIEW_JINJA_PATTERN,
@@ -20,12 +27,58 @@ from changelogger.conf.defaults import (
 )
 
 
+class RegexFlag(str, Enum):
+    ASCII = "ascii"
+    IGNORECASE = "ignorecase"
+    MULTILINE = "multiline"
+    DOTALL = "dotall"
+    VERBOSE = "verbose"
+
+
+class RegexEngine(str, Enum):
+    RE = "re"
+    RE2 = "re2"
+
+
+class MatchMode(str, Enum):
+    REGEX = "regex"
+    LITERAL = "literal"
+
+
 class VersionedFile(BaseModel):
     rel_path: Path
     pattern: str
     jinja: str | None = None
     template: Path | None = None
     context: dict = {}
+    flags: list[RegexFlag] = []
+    engine: RegexEngine | None = None
+    timeout: float | None = None
+    match: MatchMode | None = None
+
+    _regex_flags: int | None = PrivateAttr(None)
+
+    class Config:
+        use_enum_values = True
+
+    @property
+    def is_literal(self) -> bool:
+        """Whether the rendered pattern is matched as text rather than as a
+        regular expression.
+        """
+        return self.match == MatchMode.LITERAL
+
+    @property
+    def regex_flags(self) -> int:
+        """The flags the rendered pattern is compiled with."""
+        # Computed once, as it's needed each time the pattern is compiled.
+        if self._regex_flags is None:
+            self._regex_flags = reduce(
+                or_,
+                (re.RegexFlag[flag.upper()] for flag in self.flags),
+                0,
+            )
+        return self._regex_flags
 
     def simple_dict(self) -> dict:
         return {
@@ -61,6 +114,7 @@ class Changelog(BaseModel):
     release_notes: ChangelogSegment = _default_release_notes_segment
     overview: ChangelogSegment = _default_overview_segment
     links: ChangelogSegment = _default_links_segment
+    first_commit: str | None = None
 
     def has_defaults(self) -> bool:
         return (
@@ -71,7 +125,7 @@ class Changelog(BaseModel):
     def as_versioned_files(self) -> list[VersionedFile]:
         context: DefaultDict = defaultdict(dict)
         if self.has_defaults():
-            context["git"] = git.get_ctx()
+            context["git"] = git.get_ctx(self.first_commit)
 
         return [
             VersionedFile(
@@ -88,6 +142,16 @@ class ChangeloggerConfig(BaseModel):
     changelog: Changelog = Changelog()
     versioned_files: list[VersionedFile] = []
     templates_dir: Path = DEFAULT_TEMPLATES_DIR
+    cache_dir: Path = DEFAULT_CACHE_DIR
+    jinja_bytecode_cache: bool = False
+    regex_engine: RegexEngine = RegexEngine.RE
+    pattern_timeout: float | None = None
+    large_file_size: int = DEFAULT_LARGE_FILE_SIZE
+    fragments: bool = False
+    fragments_dir: Path = DEFAULT_FRAGMENTS_DIR
+
+    class Config:
+        use_enum_values = True
 
     @classmethod
     def from_config_or_default(cls) -> "ChangeloggerConfig":
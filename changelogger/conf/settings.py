@@ -1,47 +1,102 @@
+"""Changelogger settings.
+
+Settings which require parsing the config file, inspecting the git repo or
+building the template environment are evaluated the first time they're
+accessed, so commands which don't need them never pay for them.
+"""
+import sys
+from functools import cache
 from importlib import resources
-
-from jinja2 import Environment, FileSystemLoader
+from typing import Any, Callable
 
 from changelogger.conf.defaults import *  # nopycln: import
-from changelogger.conf.models import ChangeloggerConfig
-
-_config = ChangeloggerConfig.from_config_or_default()
 
 DEBUG = False
 
-CHANGELOG_PATH = _config.changelog.rel_path
-
 CHANGELOG_JINJA = resources.files("changelogger").joinpath(
     "templates/changelog.md.jinja2",
 )
 
-TEMPLATES_DIR = _config.templates_dir
+_settings = sys.modules[__name__]
+
+
+@cache
+def _config():
+    from changelogger import profiling
+    from changelogger.conf.models import ChangeloggerConfig
+
+    with profiling.span("config load"):
+        return ChangeloggerConfig.from_config_or_default()
 
-OVERVIEW_JINJA_PATTERN = _config.changelog.overview.pattern
-OVERVIEW_TEMPLATE = _config.changelog.overview.template
 
-LINKS_JINJA_PATTERN = _config.changelog.links.pattern
-LINKS_TEMPLATE = _config.changelog.links.template
+def _versioned_files() -> list:
+    return [
+        *_config().versioned_files,
+        *_config().changelog.as_versioned_files(),
+    ]
 
-RELEASE_NOTES_TEMPLATE = _config.changelog.release_notes.template
 
-VERSIONED_FILES = _config.versioned_files
-VERSIONED_FILES.extend(_config.changelog.as_versioned_files())
+def _tmpl_env():
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
-HAS_DEFAULTS = _config.changelog.has_defaults()
+    from changelogger import cache
+    from changelogger.utils import make_cache_dir
 
+    bytecode_cache = None
+    if _settings.JINJA_BYTECODE_CACHE:
+        make_cache_dir(_settings.CACHE_DIR)
+        bytecode_dir = cache.bytecode_dir()
+        bytecode_dir.mkdir(exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(str(bytecode_dir))
 
-with resources.as_file(
-    resources.files("changelogger").joinpath("templates"),
-) as package_templates:
-    TMPL_ENV = Environment(
-        loader=FileSystemLoader(
-            [
-                TEMPLATES_DIR,
-                package_templates,
-            ]
+    with resources.as_file(
+        resources.files("changelogger").joinpath("templates"),
+    ) as package_templates:
+        return Environment(
+            loader=FileSystemLoader(
+                [
+                    _settings.TEMPLATES_DIR,
+                    package_templates,
+                ]
+            ),
+            # Templates never change during a run, so there's no need to
+            # stat their files each time they're used.
+            auto_reload=False,
+            bytecode_cache=bytecode_cache,
         )
-    )
+
+
+_LAZY_SETTINGS: dict[str, Callable[[], Any]] = dict(
+    CHANGELOG_PATH=lambda: _config().changelog.rel_path,
+    TEMPLATES_DIR=lambda: _config().templates_dir,
+    CACHE_DIR=lambda: _config().cache_dir,
+    JINJA_BYTECODE_CACHE=lambda: _config().jinja_bytecode_cache,
+    REGEX_ENGINE=lambda: _config().regex_engine,
+    PATTERN_TIMEOUT=lambda: _config().pattern_timeout,
+    LARGE_FILE_SIZE=lambda: _config().large_file_size,
+    FRAGMENTS=lambda: _config().fragments,
+    FRAGMENTS_DIR=lambda: _config().fragments_dir,
+    OVERVIEW_JINJA_PATTERN=lambda: _config().changelog.overview.pattern,
+    OVERVIEW_TEMPLATE=lambda: _config().changelog.overview.template,
+    LINKS_JINJA_PATTERN=lambda: _config().changelog.links.pattern,
+    LINKS_TEMPLATE=lambda: _config().changelog.links.template,
+    RELEASE_NOTES_TEMPLATE=lambda: _config().changelog.release_notes.template,
+    FIRST_COMMIT=lambda: _config().changelog.first_commit,
+    VERSIONED_FILES=_versioned_files,
+    HAS_DEFAULTS=lambda: _config().changelog.has_defaults(),
+    TMPL_ENV=_tmpl_env,
+)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_SETTINGS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # Store the evaluated setting as a module global, so later accesses no
+    # longer go through this function.
+    value = _LAZY_SETTINGS[name]()
+    setattr(_settings, name, value)
+    return value
 
 
 # THIS MUST BE IMPORTED LAST
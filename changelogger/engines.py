@@ -0,0 +1,281 @@
+"""Regular expression engines for versioned file patterns.
+
+Patterns come from the config, and a badly written one can make the stdlib
+engine backtrack for minutes over a large file. The `re2` engine matches in
+linear time; it's used when the google-re2 package is installed, with the
+stdlib engine as the fallback. Searches with the stdlib engine can also be
+given a timeout, in which case they run in a child process which is stopped
+once the timeout passes, as can timing every match of a pattern.
+"""
+import mmap
+import multiprocessing
+import re
+from functools import cache
+from multiprocessing.connection import Connection
+from pathlib import Path
+from time import perf_counter
+from types import ModuleType
+from typing import Any, AnyStr, Callable, Pattern
+
+from changelogger.exceptions import CommandException, PatternTimeoutException
+
+RE = "re"
+RE2 = "re2"
+
+# RE2 doesn't take the stdlib's flags, but supports these inline. Its
+# character classes only ever match ASCII, making the ascii flag a no-op.
+_RE2_INLINE_FLAGS = {
+    re.IGNORECASE: "i",
+    re.MULTILINE: "m",
+    re.DOTALL: "s",
+}
+_RE2_IGNORED_FLAGS = re.ASCII | re.UNICODE
+
+
+@cache
+def _re2() -> ModuleType | None:
+    try:
+        import re2  # type: ignore
+    except ImportError:
+        return None
+    return re2
+
+
+def is_available(engine: str) -> bool:
+    return engine != RE2 or _re2() is not None
+
+
+def compile(
+    pattern: AnyStr,
+    flags: int = 0,
+    engine: str = RE,
+) -> Pattern[AnyStr]:
+    """Compiles the text or bytes pattern with the engine, or with the stdlib
+    if the engine isn't installed.
+    """
+    if engine != RE2 or (re2 := _re2()) is None:
+        return re.compile(pattern, flags)
+
+    inline = ""
+    for flag, letter in _RE2_INLINE_FLAGS.items():
+        if flags & flag:
+            inline += letter
+            flags &= ~flag
+    if flags & ~_RE2_IGNORED_FLAGS:
+        raise CommandException(
+            f"Unsupported flags for the re2 engine: {re.RegexFlag(flags)!r}."
+        )
+    if not inline:
+        return re2.compile(pattern)
+    prefix = f"(?{inline})"
+    return re2.compile(
+        prefix.encode() + pattern
+        if isinstance(pattern, bytes)
+        else prefix + pattern
+    )
+
+
+def search(
+    compiled: Pattern,
+    content: str,
+    pos: int = 0,
+    endpos: int | None = None,
+    timeout: float | None = None,
+) -> bool:
+    """Whether the pattern is found within the content between pos and
+    endpos, raising a PatternTimeoutException if a search with the stdlib
+    engine takes longer than the timeout.
+    """
+    if endpos is None:
+        endpos = len(content)
+
+    # Other engines match in linear time, and stdlib patterns without a
+    # timeout aren't worth the cost of a child process.
+    if timeout is None or not isinstance(compiled, re.Pattern):
+        return compiled.search(content, pos, endpos) is not None
+
+    return _run_with_timeout(
+        _search_in_child,
+        (compiled.pattern, compiled.flags, content, pos, endpos),
+        compiled.pattern,
+        timeout,
+    )
+
+
+def search_file(
+    compiled: Pattern[bytes],
+    path: Path,
+    timeout: float | None = None,
+) -> bool:
+    """Whether the bytes pattern is found in the file, which is memory
+    mapped rather than read, raising a PatternTimeoutException if a search
+    with the stdlib engine takes longer than the timeout.
+    """
+    if timeout is None or not isinstance(compiled, re.Pattern):
+        with map_file(path) as buffer:
+            return compiled.search(buffer) is not None
+
+    # The child maps the file itself rather than being sent its content.
+    return _run_with_timeout(
+        _search_file_in_child,
+        (compiled.pattern, compiled.flags, path),
+        compiled.pattern,
+        timeout,
+    )
+
+
+def time_matches(
+    compiled: Pattern,
+    content: str,
+    pos: int = 0,
+    endpos: int | None = None,
+    timeout: float | None = None,
+) -> tuple[float, list[int]]:
+    """Times finding every match of the pattern within the content between
+    pos and endpos, returning the seconds taken and the size of each match,
+    and raising a PatternTimeoutException if the stdlib engine takes longer
+    than the timeout.
+    """
+    if endpos is None:
+        endpos = len(content)
+
+    if timeout is None or not isinstance(compiled, re.Pattern):
+        return _time_finditer(compiled, content, pos, endpos)
+
+    return _run_with_timeout(
+        _time_matches_in_child,
+        (compiled.pattern, compiled.flags, content, pos, endpos),
+        compiled.pattern,
+        timeout,
+    )
+
+
+def time_file_matches(
+    compiled: Pattern[bytes],
+    path: Path,
+    timeout: float | None = None,
+) -> tuple[float, list[int]]:
+    """Times finding every match of the bytes pattern in the file, which is
+    memory mapped rather than read, as `time_matches` does.
+    """
+    if timeout is None or not isinstance(compiled, re.Pattern):
+        with map_file(path) as buffer:
+            return _time_finditer(compiled, buffer, 0, len(buffer))
+
+    return _run_with_timeout(
+        _time_file_matches_in_child,
+        (compiled.pattern, compiled.flags, path),
+        compiled.pattern,
+        timeout,
+    )
+
+
+def map_file(path: Path) -> mmap.mmap:
+    """Maps the file into memory read-only, to be used as a context manager.
+    Files can't be mapped while empty, so they must have content.
+    """
+    with path.open("rb") as f:
+        # The mapping keeps its own handle, so the file can be closed.
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _run_with_timeout(
+    target: Callable[..., None],
+    args: tuple[Any, ...],
+    pattern: str | bytes,
+    timeout: float,
+) -> Any:
+    if isinstance(pattern, bytes):
+        pattern = pattern.decode(errors="replace")
+
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=target,
+        args=(sender, *args),
+        daemon=True,
+    )
+    process.start()
+    sender.close()
+    try:
+        if receiver.poll(timeout):
+            return receiver.recv()
+    except EOFError:
+        raise CommandException(
+            f"Searching for the pattern `{pattern}` failed."
+        )
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        receiver.close()
+
+    raise PatternTimeoutException(
+        f"Searching for the pattern `{pattern}` took longer than "
+        f"the {timeout}s timeout."
+    )
+
+
+def _search_in_child(
+    sender: Connection,
+    pattern: str,
+    flags: int,
+    content: str,
+    pos: int,
+    endpos: int,
+) -> None:
+    sender.send(
+        re.compile(pattern, flags).search(content, pos, endpos) is not None
+    )
+    sender.close()
+
+
+def _search_file_in_child(
+    sender: Connection,
+    pattern: bytes,
+    flags: int,
+    path: Path,
+) -> None:
+    with map_file(path) as buffer:
+        sender.send(re.compile(pattern, flags).search(buffer) is not None)
+    sender.close()
+
+
+def _time_matches_in_child(
+    sender: Connection,
+    pattern: str,
+    flags: int,
+    content: str,
+    pos: int,
+    endpos: int,
+) -> None:
+    sender.send(
+        _time_finditer(re.compile(pattern, flags), content, pos, endpos)
+    )
+    sender.close()
+
+
+def _time_file_matches_in_child(
+    sender: Connection,
+    pattern: bytes,
+    flags: int,
+    path: Path,
+) -> None:
+    with map_file(path) as buffer:
+        sender.send(
+            _time_finditer(re.compile(pattern, flags), buffer, 0, len(buffer))
+        )
+    sender.close()
+
+
+def _time_finditer(
+    compiled: Pattern,
+    content: Any,
+    pos: int,
+    endpos: int,
+) -> tuple[float, list[int]]:
+    timer = perf_counter()
+    sizes = [
+        match.end() - match.start()
+        for match in compiled.finditer(content, pos, endpos)
+    ]
+    return perf_counter() - timer, sizes
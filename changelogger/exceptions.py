@@ -12,3 +12,7 @@ class RollbackException(UpgradeException):
 
 class ValidationException(Exception):
     ...
+
+
+class PatternTimeoutException(ValidationException):
+    ...
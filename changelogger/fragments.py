@@ -0,0 +1,64 @@
+"""Unreleased notes stored as fragments, one file per note.
+
+With fragments enabled, adding a note writes a single small file under the
+fragments directory rather than re-rendering the changelog, so notes added
+on separate branches never conflict. The file is named after the section
+its note belongs to, and contains only the note itself. Fragments are merged
+with the changelog's unreleased notes when read, and compiled into the
+release on upgrade.
+"""
+import secrets
+import time
+from copy import deepcopy
+from pathlib import Path
+
+from changelogger.conf import settings
+from changelogger.exceptions import CommandException
+from changelogger.models.domain_models import ReleaseNotes
+
+FRAGMENT_SUFFIX = ".md"
+
+
+def paths() -> list[Path]:
+    """All fragments, in the order they were added."""
+    if not settings.FRAGMENTS_DIR.is_dir():
+        return []
+    return sorted(settings.FRAGMENTS_DIR.glob(f"*{FRAGMENT_SUFFIX}"))
+
+
+def write(release_notes: ReleaseNotes) -> list[Path]:
+    """Writes a fragment for each of the release notes."""
+    settings.FRAGMENTS_DIR.mkdir(parents=True, exist_ok=True)
+
+    written = []
+    for section in ReleaseNotes.sections():
+        for note in release_notes[section]:
+            # The timestamp keeps fragments in the order they were added,
+            # and the token keeps names unique across branches.
+            name = f"{time.time_ns()}-{secrets.token_hex(4)}.{section}"
+            path = settings.FRAGMENTS_DIR.joinpath(name + FRAGMENT_SUFFIX)
+            path.write_text(f"{note}\n")
+            written.append(path)
+    return written
+
+
+def merge(release_notes: ReleaseNotes, fragments: list[Path]) -> ReleaseNotes:
+    """The release notes, followed by the notes of each fragment."""
+    merged = deepcopy(release_notes)
+    sections = ReleaseNotes.sections()
+    for path in fragments:
+        section = path.stem.rpartition(".")[2]
+        if section not in sections:
+            raise CommandException(
+                f"Unknown section `{section}` for fragment {path}; expected "
+                f"one of {', '.join(sections)}."
+            )
+        if note := path.read_text().strip():
+            merged[section].append(note)
+    return merged
+
+
+def remove(fragments: list[Path]) -> None:
+    """Removes the fragments once they've been compiled into a release."""
+    for path in fragments:
+        path.unlink(missing_ok=True)
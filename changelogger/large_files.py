@@ -0,0 +1,180 @@
+"""Searching and updating versioned files too large to read into memory.
+
+Files larger than the `large_file_size` setting are memory mapped and
+searched with bytes patterns, so only the pages a search touches are loaded.
+They're updated by writing a new file beside the original, copying the
+unchanged byte ranges between matches in bounded chunks, so peak memory
+doesn't grow with the size of the file. The new file is then staged to
+replace the original.
+"""
+import os
+import tempfile
+from contextlib import nullcontext
+from pathlib import Path
+from re import Match
+from typing import IO, Any, Callable, Pattern
+
+from changelogger import engines, literals, metrics, profiling, templating
+from changelogger.conf import settings
+from changelogger.conf.models import VersionedFile
+from changelogger.models.domain_models import ChangelogUpdate
+from changelogger.utils import cached_compile
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class TextMatch:
+    """A bytes match which decodes its groups, so templates see the same
+    match for a large file as they would for any other.
+    """
+
+    def __init__(self, match: Match[bytes]) -> None:
+        self._match = match
+
+    def group(self, *groups: int | str) -> Any:
+        result = self._match.group(*groups)
+        if isinstance(result, tuple):
+            return tuple(map(_decode, result))
+        return _decode(result)
+
+    def groups(self, default: Any = None) -> tuple[Any, ...]:
+        return tuple(map(_decode, self._match.groups(default)))
+
+    def groupdict(self, default: Any = None) -> dict[str, Any]:
+        return {
+            name: _decode(value)
+            for name, value in self._match.groupdict(default).items()
+        }
+
+    def __getitem__(self, group: int | str) -> Any:
+        return self.group(group)
+
+    def __getattr__(self, name: str) -> Any:
+        # Offsets such as start, end and span are in bytes.
+        return getattr(self._match, name)
+
+
+def is_large(path: Path) -> bool:
+    """Whether the file should be memory mapped rather than read. The
+    changelog is always read, as it's parsed as text.
+    """
+    if path == settings.CHANGELOG_PATH:
+        return False
+    try:
+        return path.stat().st_size > settings.LARGE_FILE_SIZE
+    except OSError:
+        return False
+
+
+def compile_pattern(file: VersionedFile, pattern: str) -> Pattern[bytes]:
+    """Compiles the rendered pattern as a UTF-8 bytes pattern, with the
+    file's flags and engine.
+    """
+    if file.is_literal:
+        return literals.compile(  # type: ignore[return-value]
+            pattern.encode(),
+            file.regex_flags,
+        )
+    return cached_compile(
+        pattern.encode(),
+        file.regex_flags,
+        file.engine or settings.REGEX_ENGINE,
+    )
+
+
+def search(
+    file: VersionedFile,
+    pattern: str,
+    timeout: float | None = None,
+) -> bool:
+    """Whether the rendered pattern is found in the memory mapped file."""
+    compiled = compile_pattern(file, pattern)
+    metrics.increment(metrics.FILE_READS)
+    with profiling.span("regex search", path=file.rel_path):
+        return engines.search_file(compiled, file.rel_path, timeout)
+
+
+def update(
+    path: Path,
+    files: list[VersionedFile],
+    update: ChangelogUpdate,
+) -> Path | None:
+    """Writes the file with each of the versioned files' patterns replaced,
+    in the order they're declared, to a new file beside it. The new file's
+    path is returned, unless no replacement changed the file.
+    """
+    temps: list[Path] = []
+    changed = False
+    try:
+        source = path
+        for file in files:
+            pattern = templating.render_pattern(file, update)
+            compiled = compile_pattern(file, pattern)
+            repl = templating.replacer(file, update)
+            target = _temp_path(path, ".tmp")
+            temps.append(target)
+            with profiling.span("file write", path=path):
+                changed |= _rewrite(source, target, compiled, repl)
+            if source != path:
+                source.unlink()
+            source = target
+    except BaseException:
+        for temp in temps:
+            temp.unlink(missing_ok=True)
+        raise
+
+    if not changed:
+        source.unlink()
+        return None
+    return source
+
+
+def _rewrite(
+    source: Path,
+    target: Path,
+    compiled: Pattern[bytes],
+    repl: Callable[[Any], str],
+) -> bool:
+    """Writes the source to the target with each match replaced, returning
+    whether any replacement differed from its match.
+    """
+    changed = False
+    metrics.increment(metrics.FILE_READS)
+    # Empty files can't be mapped, but patterns can still match them.
+    mapped = (
+        engines.map_file(source) if source.stat().st_size else nullcontext(b"")
+    )
+    with target.open("wb") as out, mapped as buffer:
+        position = 0
+        for match in compiled.finditer(buffer):
+            _copy(buffer, out, position, match.start())
+            replacement = repl(TextMatch(match)).encode()
+            changed = changed or replacement != match.group()
+            out.write(replacement)
+            position = match.end()
+        _copy(buffer, out, position, len(buffer))
+        metrics.increment(metrics.FILE_WRITES)
+        metrics.increment(metrics.BYTES_WRITTEN, out.tell())
+    return changed
+
+
+def _copy(buffer: Any, out: IO[bytes], start: int, end: int) -> None:
+    for offset in range(start, end, COPY_CHUNK_SIZE):
+        out.write(buffer[offset : min(offset + COPY_CHUNK_SIZE, end)])
+
+
+def _temp_path(path: Path, suffix: str) -> Path:
+    # Created beside the file, so it can be renamed over the original.
+    fd, name = tempfile.mkstemp(
+        prefix=f".{path.name}.",
+        suffix=suffix,
+        dir=path.parent,
+    )
+    os.close(fd)
+    return Path(name)
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return value.decode()
+    return value
@@ -0,0 +1,124 @@
+"""Literal versioned file patterns.
+
+Patterns of files with `match: literal` are found with substring searches
+rather than compiled as regular expressions, so they needn't be escaped and
+can't backtrack. They're compiled to objects with the parts of the `Pattern`
+interface which versioned files use, so they can be searched and rewritten
+like any other pattern.
+
+When many literals are checked against the same file, they're found in a
+single pass with an RE2 set, an automaton matching all of them at once,
+when google-re2 is installed.
+"""
+import re
+from typing import Any, AnyStr, Generic, Iterator, Sequence
+
+from changelogger import engines
+from changelogger.exceptions import CommandException
+
+# Below this many literals, searching for each in turn is faster than
+# building an automaton and matching it against the file.
+AUTOMATON_MIN_LITERALS = 8
+
+
+class LiteralMatch(Generic[AnyStr]):
+    """A match of a literal pattern, which has no groups other than the
+    whole match.
+    """
+
+    def __init__(self, string: Any, text: AnyStr, start: int) -> None:
+        self.string = string
+        self._text: AnyStr = text
+        self._start = start
+
+    def group(self, *groups: int) -> Any:
+        if any(group != 0 for group in groups):
+            raise IndexError("no such group")
+        if len(groups) > 1:
+            return (self._text,) * len(groups)
+        return self._text
+
+    def groups(self, default: Any = None) -> tuple[Any, ...]:
+        return ()
+
+    def groupdict(self, default: Any = None) -> dict[str, Any]:
+        return {}
+
+    def start(self, group: int = 0) -> int:
+        self.group(group)
+        return self._start
+
+    def end(self, group: int = 0) -> int:
+        self.group(group)
+        return self._start + len(self._text)
+
+    def span(self, group: int = 0) -> tuple[int, int]:
+        return self.start(group), self.end(group)
+
+    def __getitem__(self, group: int) -> AnyStr:
+        return self.group(group)
+
+
+class LiteralPattern(Generic[AnyStr]):
+    """A pattern matching its text exactly, with non-overlapping matches
+    found in the same order as a regular expression's.
+    """
+
+    def __init__(self, pattern: AnyStr, flags: int = 0) -> None:
+        self.pattern: AnyStr = pattern
+        self.flags = flags
+
+    def search(
+        self,
+        string: Any,
+        pos: int = 0,
+        endpos: int | None = None,
+    ) -> LiteralMatch[AnyStr] | None:
+        if endpos is None:
+            endpos = len(string)
+        index = string.find(self.pattern, pos, endpos)
+        if index < 0:
+            return None
+        return LiteralMatch(string, self.pattern, index)
+
+    def finditer(
+        self,
+        string: Any,
+        pos: int = 0,
+        endpos: int | None = None,
+    ) -> Iterator[LiteralMatch[AnyStr]]:
+        if endpos is None:
+            endpos = len(string)
+        # An empty pattern matches at every position, as it would as a regex.
+        step = len(self.pattern) or 1
+        while (match := self.search(string, pos, endpos)) is not None:
+            yield match
+            pos = match.start() + step
+
+
+def compile(pattern: AnyStr, flags: int = 0) -> LiteralPattern[AnyStr]:
+    """Compiles the literal pattern. Flags other than ignorecase have no
+    effect on literals, while ignorecase can't be honored by a substring
+    search.
+    """
+    if flags & re.IGNORECASE:
+        raise CommandException(
+            "The ignorecase flag isn't supported by literal patterns."
+        )
+    return LiteralPattern(pattern, flags)
+
+
+def find_all(literals: Sequence[AnyStr], string: Any) -> list[bool]:
+    """Whether each of the literals is found in the string, which may be
+    text, bytes or a memory mapped file matching the literals' type.
+    """
+    re2 = engines._re2()
+    if len(literals) < AUTOMATON_MIN_LITERALS or re2 is None:
+        return [string.find(literal) >= 0 for literal in literals]
+
+    automaton = re2.Set.SearchSet()
+    for literal in literals:
+        automaton.Add(re.escape(literal))
+    automaton.Compile()
+    found = set(automaton.Match(string))
+    return [i in found for i in range(len(literals))]
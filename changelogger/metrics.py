@@ -0,0 +1,65 @@
+"""Counters for the work done on hot paths, such as file reads, regex
+compiles and template compiles.
+
+Counters are always kept, since incrementing one is cheap. They can be
+dumped as JSON with the `--metrics` option or the `CHANGELOGGER_METRICS`
+environment variable, to track them across releases.
+"""
+import json
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+METRICS_ENV_VAR = "CHANGELOGGER_METRICS"
+
+CHANGELOG_READS = "changelog.reads"
+FILE_READS = "file.reads"
+FILE_WRITES = "file.writes"
+BYTES_READ = "file.bytes_read"
+BYTES_WRITTEN = "file.bytes_written"
+REGEX_COMPILES = "regex.compiles"
+REGEX_REUSES = "regex.reuses"
+JINJA_COMPILES = "jinja.compiles"
+JINJA_RENDERS = "jinja.renders"
+
+_counters: Counter[str] = Counter()
+_lock = threading.Lock()
+
+
+def increment(name: str, amount: int = 1) -> None:
+    # Versioned files are checked from several threads at once.
+    with _lock:
+        _counters[name] += amount
+
+
+def snapshot() -> dict[str, int]:
+    """The current value of every counter, sorted by name."""
+    with _lock:
+        return dict(sorted(_counters.items()))
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+
+
+def dump(path: Path, **extra: Any) -> None:
+    """Writes the counters as JSON, alongside any extra fields, to the path,
+    or to stderr if the path is `-`.
+    """
+    from changelogger.conf import settings
+
+    content = json.dumps(
+        dict(
+            version=settings.CHANGELOGGER_VERSION,
+            **extra,
+            counters=snapshot(),
+        ),
+        indent=2,
+    )
+    if str(path) == "-":
+        print(content, file=sys.stderr)
+    else:
+        path.write_text(content + "\n")
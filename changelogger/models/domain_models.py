@@ -1,11 +1,18 @@
+from dataclasses import dataclass, field, fields
 from enum import Enum
-from typing import Union
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Iterable, Union
 
 import semver
-from pydantic import BaseModel, validator
+from pydantic import validator
 
 from changelogger.conf import settings
 
+# Changelogs rarely have more distinct versions than this, while the bound
+# keeps long-running processes from interning versions without limit.
+PARSED_VERSIONS_MAXSIZE = 4096
+
 
 class BumpTarget(Enum):
     MAJOR = "major"
@@ -13,13 +20,19 @@ class BumpTarget(Enum):
     PATCH = "patch"
 
 
-class ReleaseNotes(BaseModel):
-    added: list[str] = []
-    changed: list[str] = []
-    deprecated: list[str] = []
-    removed: list[str] = []
-    fixed: list[str] = []
-    security: list[str] = []
+@dataclass(slots=True)
+class ReleaseNotes:
+    """The notes of a release, by section. Release notes are built for every
+    version looked up and every update rendered, so they're a slotted
+    dataclass rather than a validated model.
+    """
+
+    added: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    deprecated: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    fixed: list[str] = field(default_factory=list)
+    security: list[str] = field(default_factory=list)
 
     def __getitem__(self, attr: str) -> list[str]:
         return getattr(self, attr)
@@ -39,7 +52,7 @@ class ReleaseNotes(BaseModel):
 
     @classmethod
     def sections(cls) -> list[str]:
-        return list(cls.__fields__.keys())
+        return list(RELEASE_NOTES_SECTIONS)
 
     def markdown(self) -> str:
         return settings.TMPL_ENV.get_template(
@@ -48,8 +61,22 @@ class ReleaseNotes(BaseModel):
             sections=self.dict(),
         )
 
+    def dict(self) -> dict[str, list[str]]:
+        """The notes of each section, by section name."""
+        return {
+            section: getattr(self, section)
+            for section in RELEASE_NOTES_SECTIONS
+        }
+
+
+RELEASE_NOTES_SECTIONS = tuple(field.name for field in fields(ReleaseNotes))
+
 
 class VersionInfo(semver.VersionInfo):
+    """A semantic version, which is ordered by a tuple key computed once per
+    version rather than by semver's comparison methods.
+    """
+
     @classmethod
     def __get_validators__(cls):
         yield cls.validate
@@ -58,8 +85,116 @@ class VersionInfo(semver.VersionInfo):
     def validate(cls, v: Union[str, "VersionInfo"]) -> "VersionInfo":
         return isinstance(v, VersionInfo) and v or cls.parse(v)
 
-
-class ChangelogUpdate(BaseModel):
-    new_version: VersionInfo | None
-    old_version: VersionInfo | None
+    @classmethod
+    def parse(cls, version: str) -> "VersionInfo":
+        parsed = parse_version(version)
+        if parsed is None:
+            raise ValueError(f"{version} is not valid SemVer string")
+        return parsed
+
+    # Parsed versions have their sort keys computed as they're parsed, while
+    # those constructed directly compute theirs on first use.
+    __slots__ = ("_sort_key",)
+
+    @property
+    def sort_key(self) -> tuple:
+        key = getattr(self, "_sort_key", None)
+        if key is None:
+            key = self._sort_key = _sort_key(
+                self._major,
+                self._minor,
+                self._patch,
+                self._prerelease,
+            )
+        return key
+
+    def __lt__(self, other: Any) -> bool:
+        if isinstance(other, VersionInfo):
+            return self.sort_key < other.sort_key
+        return super().__lt__(other)
+
+    def __le__(self, other: Any) -> bool:
+        if isinstance(other, VersionInfo):
+            return self.sort_key <= other.sort_key
+        return super().__le__(other)
+
+    def __gt__(self, other: Any) -> bool:
+        if isinstance(other, VersionInfo):
+            return self.sort_key > other.sort_key
+        return super().__gt__(other)
+
+    def __ge__(self, other: Any) -> bool:
+        if isinstance(other, VersionInfo):
+            return self.sort_key >= other.sort_key
+        return super().__ge__(other)
+
+
+@lru_cache(maxsize=PARSED_VERSIONS_MAXSIZE)
+def parse_version(version: str) -> VersionInfo | None:
+    """Parses the version with a single match, or returns None if it isn't a
+    valid version. Parsed versions are interned, so each distinct version is
+    parsed, and its sort key computed, once.
+    """
+    match = VersionInfo._REGEX.fullmatch(version)
+    if match is None:
+        return None
+    major, minor, patch, prerelease, build = match.groups()
+    parsed = VersionInfo(int(major), int(minor), int(patch), prerelease, build)
+    parsed._sort_key = _sort_key(
+        parsed._major,
+        parsed._minor,
+        parsed._patch,
+        prerelease,
+    )
+    return parsed
+
+
+def _sort_key(
+    major: int,
+    minor: int,
+    patch: int,
+    prerelease: str | None,
+) -> tuple:
+    """Orders versions as semver does: by their numbers, with a prerelease
+    before its release. Prereleases are ordered by their dot separated
+    identifiers, with numeric identifiers compared as numbers and before
+    alphanumeric ones. Build metadata is ignored.
+    """
+    if not prerelease:
+        return (major, minor, patch, (1,))
+    return (
+        major,
+        minor,
+        patch,
+        (
+            0,
+            *[
+                (0, int(part)) if part.isdigit() else (1, part)
+                for part in prerelease.split(".")
+            ],
+        ),
+    )
+
+
+def sort_versions(versions: Iterable[VersionInfo]) -> list[VersionInfo]:
+    """Sorts the versions by their precomputed keys, a plain tuple sort."""
+    return sorted(versions, key=attrgetter("sort_key"))
+
+
+@dataclass(slots=True)
+class ChangelogUpdate:
+    new_version: VersionInfo | str | None
+    old_version: VersionInfo | str | None
     release_notes: ReleaseNotes
+
+    def __post_init__(self) -> None:
+        # Versions may be given as strings, as they are on the command line,
+        # but are always parsed by the time the update is used.
+        self.new_version = _coerce_version(self.new_version)
+        self.old_version = _coerce_version(self.old_version)
+
+
+def _coerce_version(version: Any) -> VersionInfo | None:
+    if version is None or isinstance(version, VersionInfo):
+        return version
+    return VersionInfo.parse(str(version))
@@ -0,0 +1,141 @@
+"""Timing spans for profiling where a command spends its time.
+
+Spans are only recorded once profiling is enabled, which the `--profile`
+option does; otherwise `span` does nothing beyond checking a flag. The
+recorded spans can be summarized as a table, and written as a Chrome
+trace-event file, which can be opened in `chrome://tracing` or Perfetto.
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Any, Iterator, NamedTuple
+
+
+class Span(NamedTuple):
+    name: str
+    start_ns: int
+    duration_ns: int
+    thread_id: int
+    args: dict[str, Any]
+
+
+_spans: list[Span] = []
+_enabled = False
+_enabled_at_ns = 0
+
+
+def enable() -> None:
+    """Starts recording spans."""
+    global _enabled, _enabled_at_ns
+    _spans.clear()
+    _enabled = True
+    _enabled_at_ns = perf_counter_ns()
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+@contextmanager
+def span(name: str, **args: Any) -> Iterator[None]:
+    """Records how long the block takes, if profiling is enabled. The args
+    are included in the trace, to tell spans of the same name apart.
+    """
+    if not _enabled:
+        yield
+        return
+
+    start_ns = perf_counter_ns()
+    try:
+        yield
+    finally:
+        # Appending to a list is atomic, so spans can be recorded from
+        # several threads at once.
+        _spans.append(
+            Span(
+                name,
+                start_ns,
+                perf_counter_ns() - start_ns,
+                threading.get_ident(),
+                {k: str(v) for k, v in args.items()},
+            )
+        )
+
+
+def spans() -> list[Span]:
+    return list(_spans)
+
+
+def summary() -> list[dict[str, Any]]:
+    """The count, total, mean and max duration of each span name, in
+    milliseconds, with the names taking the most time first.
+    """
+    durations: dict[str, list[int]] = {}
+    for recorded in _spans:
+        durations.setdefault(recorded.name, []).append(recorded.duration_ns)
+
+    rows = [
+        dict(
+            name=name,
+            count=len(times),
+            total_ms=sum(times) / 1e6,
+            mean_ms=sum(times) / len(times) / 1e6,
+            max_ms=max(times) / 1e6,
+        )
+        for name, times in durations.items()
+    ]
+    return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+
+def print_summary() -> None:
+    from rich.console import Console
+    from rich.table import Table
+
+    elapsed_ms = (perf_counter_ns() - _enabled_at_ns) / 1e6
+    table = Table(title=f"Profile ({elapsed_ms:.2f}ms elapsed)")
+    table.add_column("Span")
+    for column in ("Count", "Total (ms)", "Mean (ms)", "Max (ms)"):
+        table.add_column(column, justify="right")
+
+    for row in summary():
+        table.add_row(
+            row["name"],
+            str(row["count"]),
+            f"{row['total_ms']:.2f}",
+            f"{row['mean_ms']:.3f}",
+            f"{row['max_ms']:.3f}",
+        )
+
+    # Printed to stderr, to keep the command's own output intact.
+    Console(stderr=True).print(table)
+
+
+def write_trace(path: Path) -> None:
+    """Writes the spans as complete events in the Chrome trace-event
+    format, with timestamps in microseconds.
+    """
+    pid = os.getpid()
+    events = [
+        dict(
+            name=recorded.name,
+            cat="changelogger",
+            ph="X",
+            ts=(recorded.start_ns - _enabled_at_ns) / 1e3,
+            dur=recorded.duration_ns / 1e3,
+            pid=pid,
+            tid=recorded.thread_id,
+            args=recorded.args,
+        )
+        for recorded in _spans
+    ]
+    path.write_text(
+        json.dumps(dict(traceEvents=events, displayTimeUnit="ms")),
+    )
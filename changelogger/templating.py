@@ -1,21 +1,74 @@
 from datetime import date
-from functools import partial
+from functools import lru_cache, partial
 from re import Match
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable, Pattern
 
+from changelogger import literals, metrics, profiling
 from changelogger.conf import settings
 from changelogger.conf.models import VersionedFile
 from changelogger.models.domain_models import ChangelogUpdate
 from changelogger.utils import cached_compile
 
+if TYPE_CHECKING:
+    from jinja2 import Environment, Template
+
+TEMPLATE_CACHE_SIZE = 256
+
 
 def update(
     file: VersionedFile,
     update: ChangelogUpdate,
     content: str,
+    span: tuple[int, int] | None = None,
 ) -> str:
-    """Replaces the versioned files rendered pattern in the supplied content."""
+    """Replaces the versioned files rendered pattern in the supplied content,
+    only matching within the span of the content if one is provided.
+    """
+    return "".join(rewrite(file, update, content, span))
+
+
+def rewrite(
+    file: VersionedFile,
+    update: ChangelogUpdate,
+    content: str,
+    span: tuple[int, int] | None = None,
+) -> list[str]:
+    """Like `update`, but returns the updated content as segments, alternating
+    between the unchanged slices of the content and the rendered
+    replacements, so they can be written without joining them first.
+    """
+    variables = _get_variables(file, update)
+    repl = replacer(file, update, variables)
+    with profiling.span("pattern render", path=file.rel_path):
+        pattern = render_jinja(file.pattern, variables)
+    compiled = compile_pattern(file, pattern)
+
+    start, end = span or (0, len(content))
+    segments = [content[:start]] if start else []
+    with profiling.span("regex search", path=file.rel_path):
+        # Matches are found in the same order and with the same semantics
+        # as re.sub, which would also match from start to end.
+        position = start
+        for match in compiled.finditer(content, start, end):
+            segments.append(content[position : match.start()])
+            segments.append(repl(match))
+            position = match.end()
+    segments.append(content[position:])
+    return segments
+
+
+def replacer(
+    file: VersionedFile,
+    update: ChangelogUpdate,
+    variables: dict[str, Any] | None = None,
+) -> Callable[[Match], str]:
+    """The versioned file's replacement for a match of its pattern, rendered
+    from its template with the match in its variables.
 
+    Replacements are rendered once per distinct match, by its text and
+    groups, so a pattern matching the same text throughout a file renders
+    its template once.
+    """
     render = None
     if file.template:
         render = partial(render_template, str(file.template))
@@ -24,32 +77,76 @@ def update(
 
     assert render, "No valid jinja template found."
 
-    var_getter = partial(_get_variables, file, update)
-    pattern = render_jinja(file.pattern, var_getter())
+    if variables is None:
+        variables = _get_variables(file, update)
+    rendered: dict[tuple[Any, ...], str] = {}
+
+    def repl(match: Match) -> str:
+        key = (match.group(), *match.groups())
+        if (replacement := rendered.get(key)) is None:
+            replacement = rendered[key] = render({**variables, "match": match})
+        return replacement
 
-    # re.sub can take a callable as the replacement argument rather than a
-    # string. This callable accepts a match and returns a string. For each
-    # match which is found, re.sub will call repl with the match, and
-    # replace the found pattern with the output string of the user supplied
-    # repl function.
-    repl = lambda m: render(var_getter(m))
-    return cached_compile(pattern).sub(repl, content)
+    return repl
 
 
 def render_pattern(
     file: VersionedFile,
     update: ChangelogUpdate,
 ) -> str:
-    variables = _get_variables(file, update)
-    return render_jinja(file.pattern, variables)
+    with profiling.span("pattern render", path=file.rel_path):
+        variables = _get_variables(file, update)
+        return render_jinja(file.pattern, variables)
+
+
+def compile_pattern(file: VersionedFile, pattern: str) -> Pattern:
+    """Compiles the rendered pattern with the file's flags and engine."""
+    if file.is_literal:
+        # Literals provide the parts of Pattern which versioned files use.
+        return literals.compile(  # type: ignore[return-value]
+            pattern,
+            file.regex_flags,
+        )
+    return cached_compile(
+        pattern,
+        file.regex_flags,
+        file.engine or settings.REGEX_ENGINE,
+    )
 
 
 def render_jinja(tmpl_str: str, variables: dict[str, Any]) -> str:
-    return settings.TMPL_ENV.from_string(tmpl_str).render(**variables)
+    metrics.increment(metrics.JINJA_RENDERS)
+    return _compile_jinja(settings.TMPL_ENV, tmpl_str).render(**variables)
 
 
 def render_template(template: str, variables: dict[str, Any]) -> str:
-    return settings.TMPL_ENV.get_template(template).render(**variables)
+    metrics.increment(metrics.JINJA_RENDERS)
+    return _load_template(settings.TMPL_ENV, template).render(**variables)
+
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    """The hits, misses and size of the compiled template caches."""
+    return {
+        name: cache_info._asdict()
+        for name, cache_info in (
+            ("jinja", _compile_jinja.cache_info()),
+            ("template", _load_template.cache_info()),
+        )
+    }
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _compile_jinja(env: "Environment", tmpl_str: str) -> "Template":
+    metrics.increment(metrics.JINJA_COMPILES)
+    with profiling.span("template compile"):
+        return env.from_string(tmpl_str)
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _load_template(env: "Environment", template: str) -> "Template":
+    metrics.increment(metrics.JINJA_COMPILES)
+    with profiling.span("template compile", template=template):
+        return env.get_template(template)
 
 
 def _get_variables(
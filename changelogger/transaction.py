@@ -0,0 +1,312 @@
+"""Atomic upgrades of versioned files.
+
+Each updated file is staged beside the original, which is left untouched
+until every file has been staged. The staged files are then flushed to disk
+together and renamed over the originals. Before the first rename, a journal
+of the files is written to the cache directory, so an upgrade interrupted
+part way through can be finished by the `recover` command, while one
+interrupted while staging is undone by removing its staged files. A rollback
+is journaled before it begins, so one which fails part way through is
+finished, undoing the upgrade, by `recover` instead.
+
+Originals are snapshotted to a temporary directory under the cache directory
+before they're replaced, as hard links where possible and as streamed copies
+otherwise, so a failed commit can be rolled back without holding any file's
+content in memory. The journal and snapshots aren't cache entries, and the
+cache can't be cleared while they're needed.
+"""
+import errno
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+from changelogger import profiling
+from changelogger.conf import settings
+from changelogger.exceptions import UpgradeException
+from changelogger.utils import make_cache_dir, write_segments
+
+JOURNAL_NAME = "upgrade-journal.json"
+SNAPSHOTS_PREFIX = "snapshots-"
+STAGED_SUFFIX = ".changelogger-staged"
+
+STAGING = "staging"
+COMMITTING = "committing"
+ROLLING_BACK = "rolling back"
+
+
+class Recovery(NamedTuple):
+    finished: bool
+    paths: list[Path]
+
+
+class Transaction:
+    """Stages the updated files, and commits them all by renaming the staged
+    files over the originals. Files may be staged and snapshotted from
+    several threads at once.
+    """
+
+    def __init__(self) -> None:
+        self.paths: list[Path] = []
+        self.staged: list[Path] = []
+        self.committed: list[Path] = []
+        self.snapshots: dict[Path, Path] = {}
+        self.snapshot_dir: Path | None = None
+        self._lock = threading.Lock()
+
+    def begin(self, paths: Iterable[Path]) -> None:
+        """Journals the paths which may be staged, refusing to begin while
+        an earlier upgrade is yet to be recovered.
+        """
+        if journal_path().exists():
+            raise UpgradeException(
+                "An earlier upgrade was interrupted. Run `changelogger "
+                "recover` to finish or undo it before upgrading again."
+            )
+        # Symlinked files are updated through their targets, so the links
+        # aren't replaced by regular files.
+        self.paths = [path.resolve() for path in paths]
+        _write_journal(STAGING, self.paths)
+
+    def stage(self, path: Path, segments: Iterable[str]) -> None:
+        """Writes the file's updated content beside it."""
+        path = path.resolve()
+        staged = staged_path(path)
+        try:
+            with profiling.span("file write", path=path):
+                write_segments(staged, segments)
+            self._add(path, staged)
+        except BaseException:
+            # Not yet staged, so `end` wouldn't remove what was written.
+            staged.unlink(missing_ok=True)
+            raise
+
+    def stage_file(self, path: Path, source: Path) -> None:
+        """Stages an already written file as the file's updated content."""
+        path = path.resolve()
+        staged = staged_path(path)
+        os.replace(source, staged)
+        try:
+            self._add(path, staged)
+        except BaseException:
+            staged.unlink(missing_ok=True)
+            raise
+
+    def snapshot(self, path: Path) -> None:
+        """Snapshots the original, so it can be restored once it's been
+        replaced.
+        """
+        path = path.resolve()
+        with self._lock:
+            if self.snapshot_dir is None:
+                self.snapshot_dir = Path(
+                    tempfile.mkdtemp(
+                        prefix=SNAPSHOTS_PREFIX,
+                        dir=settings.CACHE_DIR,
+                    )
+                )
+                _write_journal(STAGING, self.paths, self.snapshot_dir)
+
+            # Numbered, as files in different directories may share a name.
+            snapshot = self.snapshot_dir.joinpath(
+                f"{len(self.snapshots)}-{path.name}"
+            )
+            self.snapshots[path] = snapshot
+
+        with profiling.span("file snapshot", path=path):
+            _link_or_copy(path, snapshot)
+
+    def commit(self, jobs: int = 1) -> None:
+        """Flushes every staged file to disk, up to `jobs` at a time, then
+        renames each over its original. Files are recorded as committed as
+        they're renamed, so those can be restored if a later rename fails.
+        """
+        # Committed in the order the paths were given, however the files
+        # were staged.
+        order = {path: i for i, path in enumerate(self.paths)}
+        self.staged.sort(key=order.__getitem__)
+
+        with profiling.span("file sync"):
+            staged = map(staged_path, self.staged)
+            if jobs > 1 and len(self.staged) > 1:
+                with ThreadPoolExecutor(max_workers=jobs) as executor:
+                    list(executor.map(_fsync, staged))
+            else:
+                for path in staged:
+                    _fsync(path)
+            _write_journal(COMMITTING, self.staged, self.snapshot_dir)
+
+        for path in self.staged:
+            os.replace(staged_path(path), path)
+            self.committed.append(path)
+
+        with profiling.span("file sync"):
+            _fsync_dirs(self.staged)
+
+    def rollback(self) -> None:
+        """Restores the committed files from their snapshots, in the reverse
+        of the order they were committed.
+        """
+        restores = [
+            (path, self.snapshots[path]) for path in reversed(self.committed)
+        ]
+        with profiling.span("rollback"):
+            if restores:
+                _write_journal(
+                    ROLLING_BACK,
+                    self.staged,
+                    self.snapshot_dir,
+                    restores,
+                )
+            _restore_all(restores)
+
+    def end(self) -> None:
+        """Removes any staged files which weren't committed, the snapshots
+        and the journal.
+        """
+        for path in self.staged[len(self.committed) :]:
+            staged_path(path).unlink(missing_ok=True)
+        if self.snapshot_dir is not None:
+            shutil.rmtree(self.snapshot_dir, ignore_errors=True)
+        journal_path().unlink(missing_ok=True)
+
+    def _add(self, path: Path, staged: Path) -> None:
+        shutil.copymode(path, staged)
+        with self._lock:
+            self.staged.append(path)
+
+
+def recover() -> Recovery | None:
+    """Finishes an interrupted upgrade which had begun committing, or undoes
+    one which hadn't, or which was being rolled back, returning what was
+    done if there was one.
+    """
+    try:
+        journal = json.loads(journal_path().read_text())
+    except FileNotFoundError:
+        return None
+
+    paths = [Path(path) for path in journal["paths"]]
+    finished = journal["state"] == COMMITTING
+    if journal["state"] == ROLLING_BACK:
+        _restore_all(
+            [
+                (Path(path), Path(snapshot))
+                for path, snapshot in journal["restores"]
+            ]
+        )
+    for path in paths:
+        staged = staged_path(path)
+        if finished and staged.exists():
+            os.replace(staged, path)
+        else:
+            staged.unlink(missing_ok=True)
+    _fsync_dirs(paths)
+
+    # Only removed once every file is finished or restored, as the
+    # snapshots are the only copies of the originals.
+    if journal.get("snapshots"):
+        shutil.rmtree(journal["snapshots"], ignore_errors=True)
+    journal_path().unlink()
+    return Recovery(finished, paths)
+
+
+def journal_path() -> Path:
+    return settings.CACHE_DIR.joinpath(JOURNAL_NAME)
+
+
+def is_upgrade_file(rel_path: Path) -> bool:
+    """Whether the path, relative to the cache directory, is an upgrade's
+    journal or one of its snapshots, rather than a cache entry.
+    """
+    name = rel_path.parts[0] if rel_path.parts else ""
+    return name in (
+        JOURNAL_NAME,
+        staged_path(Path(JOURNAL_NAME)).name,
+    ) or name.startswith(SNAPSHOTS_PREFIX)
+
+
+def staged_path(path: Path) -> Path:
+    # Beside the original, so it can be renamed over it.
+    return path.with_name(f".{path.name}{STAGED_SUFFIX}")
+
+
+def _write_journal(
+    state: str,
+    paths: list[Path],
+    snapshot_dir: Path | None = None,
+    restores: list[tuple[Path, Path]] | None = None,
+) -> None:
+    make_cache_dir(settings.CACHE_DIR)
+    journal = journal_path()
+    staged = staged_path(journal)
+    staged.write_text(
+        json.dumps(
+            dict(
+                state=state,
+                paths=[str(path) for path in paths],
+                snapshots=str(snapshot_dir) if snapshot_dir else None,
+                restores=[
+                    [str(path), str(snapshot)]
+                    for path, snapshot in restores or []
+                ],
+            )
+        )
+    )
+    _fsync(staged)
+    os.replace(staged, journal)
+    _fsync_dirs([journal])
+
+
+def _link_or_copy(path: Path, target: Path) -> None:
+    # The original is replaced by renaming, never written in place, so a
+    # hard link keeps its content intact without copying it.
+    try:
+        os.link(path, target)
+    except OSError:
+        shutil.copy2(path, target)
+
+
+def _restore_all(restores: list[tuple[Path, Path]]) -> None:
+    """Restores each path from its snapshot, skipping those already
+    restored by renaming the snapshot back.
+    """
+    for path, snapshot in restores:
+        if snapshot.exists():
+            _restore(snapshot, path)
+    _fsync_dirs([path for path, _ in restores])
+
+
+def _restore(snapshot: Path, path: Path) -> None:
+    try:
+        os.replace(snapshot, path)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+        # A copied snapshot may be on another device to the original, so
+        # it's copied back beside it and renamed over it from there.
+        staged = staged_path(path)
+        shutil.copy2(snapshot, staged)
+        _fsync(staged)
+        os.replace(staged, path)
+
+
+def _fsync(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_dirs(paths: list[Path]) -> None:
+    """Flushes the renames within each of the paths' directories."""
+    # Directories can't be opened for syncing on Windows.
+    if os.name == "nt":
+        return
+    for directory in {path.absolute().parent for path in paths}:
+        _fsync(directory)
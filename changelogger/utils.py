@@ -1,10 +1,133 @@
+import locale
+import os
 import re
-from functools import cache
-from typing import Pattern
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import AnyStr, Iterable, Pattern
+
+from changelogger import engines, metrics
+from changelogger.conf import settings
 
 MODE_READ_AND_WRITE = "r+"
 
+REGEX_CACHE_SIZE = 256
+
+# Patterns registered at import are kept for the life of the process, while
+# those compiled on demand are bounded, evicting the least recently used.
+_registered: dict[tuple[str | bytes, int], Pattern] = {}
+_compiled: OrderedDict[tuple[str | bytes, int, str], Pattern] = OrderedDict()
+_compiled_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+def register_pattern(pattern: str, flags: int = 0) -> Pattern:
+    """Compiles a static pattern once, keeping it for the life of the
+    process.
+    """
+    key = (pattern, flags)
+    if key not in _registered:
+        _registered[key] = re.compile(pattern, flags)
+    return _registered[key]
+
+
+def cached_compile(
+    pattern: AnyStr,
+    flags: int = 0,
+    engine: str = engines.RE,
+) -> Pattern[AnyStr]:
+    global _hits, _misses
+
+    if engine == engines.RE and (
+        compiled := _registered.get((pattern, flags))
+    ):
+        metrics.increment(metrics.REGEX_REUSES)
+        return compiled
+
+    key = (pattern, flags, engine)
+    # Versioned files are checked from several threads at once.
+    with _compiled_lock:
+        if (compiled := _compiled.get(key)) is not None:
+            _compiled.move_to_end(key)
+            _hits += 1
+            metrics.increment(metrics.REGEX_REUSES)
+            return compiled
+
+        _misses += 1
+        metrics.increment(metrics.REGEX_COMPILES)
+        compiled = _compiled[key] = engines.compile(pattern, flags, engine)
+        while len(_compiled) > REGEX_CACHE_SIZE:
+            _compiled.popitem(last=False)
+        return compiled
+
+
+def regex_cache_stats() -> dict[str, int]:
+    """The hits, misses and size of the compiled regex cache, alongside the
+    number of registered patterns.
+    """
+    with _compiled_lock:
+        return dict(
+            hits=_hits,
+            misses=_misses,
+            maxsize=REGEX_CACHE_SIZE,
+            currsize=len(_compiled),
+            registered=len(_registered),
+        )
+
+
+def read_bytes(path: Path) -> bytes:
+    """Reads the file, counting the read and its size."""
+    data = path.read_bytes()
+    metrics.increment(metrics.FILE_READS)
+    metrics.increment(metrics.BYTES_READ, len(data))
+    if path == settings.CHANGELOG_PATH:
+        metrics.increment(metrics.CHANGELOG_READS)
+    return data
+
+
+def decode_text(data: bytes) -> str:
+    """Decodes the file's content as `Path.read_text` would, in the locale's
+    encoding and with universal newlines.
+    """
+    content = data.decode(locale.getpreferredencoding(False))
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+
+def read_text(path: Path) -> str:
+    """Reads the file, counting the read and its size."""
+    return decode_text(read_bytes(path))
+
+
+def write_text(path: Path, content: str) -> None:
+    """Writes the file, counting the write and its size."""
+    write_segments(path, [content])
+
+
+def write_segments(path: Path, segments: Iterable[str]) -> None:
+    """Writes the segments to the file in turn, without joining them into
+    one string first, counting the write and its size.
+    """
+    with path.open("w") as f:
+        f.writelines(segments)
+        f.flush()
+        size = os.fstat(f.fileno()).st_size
+    metrics.increment(metrics.FILE_WRITES)
+    metrics.increment(metrics.BYTES_WRITTEN, size)
+
+
+CACHE_GITIGNORE = "*\n"
+
 
-@cache
-def cached_compile(pattern: str) -> Pattern:
-    return re.compile(pattern)
+def make_cache_dir(cache_dir: Path) -> None:
+    """Creates the cache directory, keeping it out of version control
+    without requiring users to update their own ignore files. A directory
+    which already exists is left as it is, as it may hold the user's files.
+    """
+    try:
+        cache_dir.mkdir(parents=True)
+    except FileExistsError:
+        return
+    cache_dir.joinpath(".gitignore").write_text(CACHE_GITIGNORE)
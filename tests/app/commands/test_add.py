@@ -3,6 +3,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from changelogger.app.commands.add import add
+from changelogger.models.domain_models import ReleaseNotes
 
 
 class TestUnreleasedAddCommand:
@@ -61,6 +62,7 @@ class TestUnreleasedAddCommand:
         mock_prompt_unreleased_changelog: MagicMock,
     ):
         mock_changelog.get_all_versions.side_effect = (self.VERSIONS,)
+        mock_changelog.get_release_notes.return_value = ReleaseNotes()
         mock_prompt_unreleased_changelog.side_effect = lambda x: x
         add(**options)
         mock_prompt_unreleased_changelog.assert_not_called()
@@ -74,3 +76,63 @@ class TestUnreleasedAddCommand:
         ]
         for option, expected in options.items():
             assert actual_update.release_notes[option] == expected
+
+
+class TestAddFragments:
+    @pytest.fixture
+    def mock_settings(self):
+        with patch("changelogger.app.commands.add.settings") as mock:
+            mock.FRAGMENTS = True
+            yield mock
+
+    @pytest.fixture
+    def mock_changelog(self):
+        with patch("changelogger.app.commands.add.changelog") as mock:
+            yield mock
+
+    @pytest.fixture
+    def mock_fragments(self):
+        with patch("changelogger.app.commands.add.fragments") as mock:
+            yield mock
+
+    def test_add_writes_fragments(
+        self,
+        mock_settings: MagicMock,
+        mock_changelog: MagicMock,
+        mock_fragments: MagicMock,
+    ):
+        add(
+            added=["something"],
+            changed=[],
+            deprecated=[],
+            removed=[],
+            fixed=["other"],
+            security=[],
+        )
+
+        mock_fragments.write.assert_called_once_with(
+            ReleaseNotes(added=["something"], fixed=["other"]),
+        )
+        mock_changelog.get_all_versions.assert_not_called()
+        mock_changelog.update_versioned_files.assert_not_called()
+
+    def test_add_prompts_for_fragments(
+        self,
+        mock_settings: MagicMock,
+        mock_changelog: MagicMock,
+        mock_fragments: MagicMock,
+    ):
+        def prompt(update):
+            update.release_notes.added.append("prompted")
+            return update
+
+        with patch(
+            "changelogger.app.commands.add.prompt_unreleased_changelog",
+            side_effect=prompt,
+        ):
+            add(*TestUnreleasedAddCommand.EMPTY_OPTIONS)
+
+        mock_fragments.write.assert_called_once_with(
+            ReleaseNotes(added=["prompted"]),
+        )
+        mock_changelog.get_all_versions.assert_not_called()
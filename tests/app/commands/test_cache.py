@@ -0,0 +1,59 @@
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from changelogger.app.commands.cache import CacheAction, cache
+
+
+class TestCacheCommand:
+    @pytest.fixture
+    def mock_changelogger_cache(self):
+        with patch(
+            "changelogger.app.commands.cache.changelogger_cache"
+        ) as mock:
+            yield mock
+
+    @pytest.fixture
+    def mock_changelog(self):
+        with patch("changelogger.app.commands.cache.changelog") as mock:
+            yield mock
+
+    @pytest.fixture
+    def mock_print(self):
+        with patch("changelogger.app.commands.cache.print") as mock:
+            yield mock
+
+    def test_cache_clear(
+        self,
+        mock_changelogger_cache: MagicMock,
+        mock_print: MagicMock,
+    ) -> None:
+        cache(CacheAction.CLEAR)
+        mock_changelogger_cache.clear.assert_called_once()
+
+    def test_cache_warm(
+        self,
+        mock_changelog: MagicMock,
+        mock_print: MagicMock,
+    ) -> None:
+        cache(CacheAction.WARM)
+        mock_changelog.get_changelog_index.assert_called_once()
+
+    def test_cache_stats(
+        self,
+        tmp_path: Path,
+        mock_changelogger_cache: MagicMock,
+        mock_print: MagicMock,
+    ) -> None:
+        entry = tmp_path.joinpath("changelog.json")
+        entry.write_text("{}")
+        mock_changelogger_cache.entries.return_value = [entry]
+
+        with patch("changelogger.app.commands.cache.settings") as mock:
+            mock.CACHE_DIR = tmp_path
+            cache(CacheAction.STATS)
+
+        printed = " ".join(str(c.args[0]) for c in mock_print.call_args_list)
+        assert "Entries:[/bold] 1 (2 bytes)" in printed
+        assert "changelog.json" in printed
@@ -1,19 +1,32 @@
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 from click.exceptions import Exit
 
+from changelogger import changelog, literals
 from changelogger.app.commands.check import (
     _check_changelog,
     _check_versioned_file,
     _check_versioned_files,
+    _profile_patterns,
     check,
 )
-from changelogger.exceptions import ValidationException
+from changelogger.conf.models import MatchMode, VersionedFile
+from changelogger.exceptions import (
+    PatternTimeoutException,
+    ValidationException,
+)
 from changelogger.models.domain_models import ReleaseNotes, VersionInfo
 
 
 class CheckCommandFixtures:
+    @pytest.fixture(autouse=True)
+    def mock_large_files(self):
+        with patch("changelogger.app.commands.check.large_files") as mock:
+            mock.is_large.return_value = False
+            yield mock
+
     @pytest.fixture
     def mock_check_changelog(self):
         with patch("changelogger.app.commands.check._check_changelog") as mock:
@@ -44,8 +57,8 @@ class CheckCommandFixtures:
             yield mock
 
     @pytest.fixture
-    def mock_cached_compile(self):
-        with patch("changelogger.app.commands.check.cached_compile") as mock:
+    def mock_engines(self):
+        with patch("changelogger.app.commands.check.engines") as mock:
             yield mock
 
     @pytest.fixture
@@ -77,7 +90,7 @@ class TestCheckCommand(CheckCommandFixtures):
         mock_versioned_files: MagicMock,
         mock_print: MagicMock,
     ) -> None:
-        check(files=[])
+        check(files=[], profile_patterns=False)
         mock_print.assert_called_once()
         assert "Versioned files are valid!" in mock_print.call_args.args[0]
 
@@ -89,7 +102,7 @@ class TestCheckCommand(CheckCommandFixtures):
     ) -> None:
         exc_note = "Some validation exception"
         mock_check_versioned_files.side_effect = ValidationException(exc_note)
-        check(sys_exit=False, files=[])
+        check(sys_exit=False, files=[], profile_patterns=False)
         mock_print.assert_called_once()
         assert exc_note in mock_print.call_args.args[0]
 
@@ -103,7 +116,7 @@ class TestCheckCommand(CheckCommandFixtures):
         mock_check_versioned_files.side_effect = ValidationException(exc_note)
 
         with pytest.raises(Exit):
-            check(sys_exit=True, files=[])
+            check(sys_exit=True, files=[], profile_patterns=False)
 
         mock_print.assert_called_once()
         assert exc_note in mock_print.call_args.args[0]
@@ -122,123 +135,256 @@ class TestCheckCommand(CheckCommandFixtures):
             versioned_files
         )
 
+    def test_check_versioned_files_reads_each_path_once(
+        self,
+        mock_progress: MagicMock,
+        mock_changelog: MagicMock,
+        mock_check_versioned_file: MagicMock,
+    ) -> None:
+        mock_changelog.get_latest_version.side_effect = (VersionInfo(1),)
+        mock_changelog.get_release_notes.side_effect = (ReleaseNotes(),)
+        path = MagicMock()
+        path.read_bytes.return_value = b"content"
+        versioned_files = [MagicMock(rel_path=path) for _ in range(3)]
+        _check_versioned_files(versioned_files, jobs=2)
+
+        path.read_bytes.assert_called_once()
+        assert len(mock_check_versioned_file.call_args_list) == 3
+        for call in mock_check_versioned_file.call_args_list:
+            assert call.args[2] == "content"
+
+    def test_check_versioned_files_reports_all_errors_in_order(
+        self,
+        mock_progress: MagicMock,
+        mock_changelog: MagicMock,
+        mock_check_versioned_file: MagicMock,
+    ) -> None:
+        mock_changelog.get_latest_version.side_effect = (VersionInfo(1),)
+        mock_changelog.get_release_notes.side_effect = (ReleaseNotes(),)
+        versioned_files = [
+            MagicMock(rel_path=Path(f"file-{i}"), pattern=f"pattern-{i}")
+            for i in range(20)
+        ]
+
+        def check_file(file, *_):
+            if int(file.pattern.split("-")[1]) % 2:
+                raise ValidationException(file.pattern)
+
+        mock_check_versioned_file.side_effect = check_file
+        with (
+            patch.object(Path, "read_bytes", return_value=b""),
+            pytest.raises(ValidationException) as exc_info,
+        ):
+            _check_versioned_files(versioned_files, jobs=8)
+
+        assert exc_info.value.args[0].split("\n\n") == [
+            f"pattern-{i}" for i in range(1, 20, 2)
+        ]
+
+    @pytest.mark.parametrize(
+        "problems,exc_note",
+        [
+            (
+                [changelog.ChangelogProblem(4, "Some problem.")],
+                "line 4: Some problem.",
+            ),
+            ([], "Failed to read the changelog: oops"),
+        ],
+    )
+    def test_check_versioned_files_unreadable_changelog(
+        self,
+        problems: list,
+        exc_note: str,
+        mock_progress: MagicMock,
+        mock_changelog: MagicMock,
+        mock_check_versioned_file: MagicMock,
+    ) -> None:
+        mock_changelog.get_latest_version.side_effect = Exception("oops")
+        mock_changelog.validate_changelog.return_value = problems
+
+        with pytest.raises(ValidationException) as exc_info:
+            _check_versioned_files([MagicMock()])
+
+        assert exc_note in exc_info.value.args[0]
+        mock_check_versioned_file.assert_not_called()
+
     def test_check_versioned_file_pattern_found(
         self,
         mock_templating: MagicMock,
-        mock_cached_compile: MagicMock,
+        mock_engines: MagicMock,
     ) -> None:
         file, update = MagicMock(), MagicMock()
-        _check_versioned_file(file, update)
+        _check_versioned_file(file, update, "content")
         mock_templating.render_pattern.assert_called_once_with(file, update)
-        mock_cached_compile.assert_called()
+        mock_templating.compile_pattern.assert_called_once_with(
+            file,
+            mock_templating.render_pattern(),
+        )
+        mock_engines.search.assert_called_once_with(
+            mock_templating.compile_pattern(),
+            "content",
+            0,
+            len("content"),
+            timeout=file.timeout,
+        )
 
     def test_check_versioned_file_validation_error(
         self,
         mock_templating: MagicMock,
-        mock_cached_compile: MagicMock,
+        mock_engines: MagicMock,
     ) -> None:
-        mock_search = mock_cached_compile().search
-        mock_search.side_effect = (None,)
+        mock_engines.search.side_effect = (False,)
         file, update = MagicMock(), MagicMock()
 
         with pytest.raises(ValidationException):
             _check_versioned_file(file, update)
 
         mock_templating.render_pattern.assert_called_once_with(file, update)
-        mock_cached_compile.assert_called()
+        mock_engines.search.assert_called_once()
 
-    @pytest.mark.parametrize(
-        "point_of_failure,exc_note",
-        enumerate(
-            [
-                "Expected there to be at least 1 version; None found.",
-                "Failed to validate notes for version",
-                "Could not find the link for version",
-                "Link is incorrect for version",
-                "Could not find the link for unreleased changes.",
-                "Link is incorrect for the unreleased changes.",
-                "Could not find the link for version",
-            ]
-        ),
-    )
-    def test_check_changelog_point_of_failure(
+    def test_check_versioned_files_large_file(
         self,
-        point_of_failure: int,
-        exc_note: str,
+        mock_progress: MagicMock,
         mock_changelog: MagicMock,
-    ):
-        validation_stepper(mock_changelog, point_of_failure)
-        with pytest.raises(ValidationException) as exc_info:
-            _check_changelog(MagicMock())
-
-        assert exc_note in exc_info.value.args[0]
-
-    def test_check_changelog_valid(
+        mock_large_files: MagicMock,
+    ) -> None:
+        mock_changelog.get_latest_version.side_effect = (VersionInfo(1),)
+        mock_changelog.get_release_notes.side_effect = (ReleaseNotes(),)
+        mock_large_files.is_large.return_value = True
+        mock_large_files.search.side_effect = (True, False)
+        versioned_files = [
+            VersionedFile(rel_path=Path("big.txt"), pattern="found"),
+            VersionedFile(rel_path=Path("big.txt"), pattern="missing"),
+        ]
+
+        with patch("changelogger.app.commands.check.read_text") as mock_read:
+            with pytest.raises(ValidationException) as exc_info:
+                _check_versioned_files(versioned_files)
+
+        assert "`[bright_blue]missing[/bright_blue]`" in str(exc_info.value)
+        assert mock_large_files.search.call_count == 2
+        mock_read.assert_not_called()
+
+    def test_check_versioned_files_literals_in_one_pass(
         self,
+        mock_progress: MagicMock,
         mock_changelog: MagicMock,
-    ):
-        validation_stepper(mock_changelog, 7)
-        _check_changelog(MagicMock())
-
-
-def validation_stepper(mock_changelog: MagicMock, pof: int):
-    # Point of Failure 0
-    if pof < 1:
-        mock_changelog.get_all_versions.side_effect = ([],)
-        return
-
-    versions = ["0.2.0", "0.1.0"]
-    mock_changelog.get_all_versions.side_effect = (versions,)
-
-    # Point of Failure 1
-    if pof < 2:
-        mock_changelog.get_release_notes.side_effect = Exception()
-        return
-
-    release_notes = ReleaseNotes(added=["added something"])
-    mock_changelog.get_release_notes.side_effect = lambda *_: release_notes
-
-    sorted_versions = sorted(versions)
-    mock_changelog.get_sorted_versions.side_effect = (sorted_versions,)
-
-    # Point of Failure 2
-    if pof < 3:
-        mock_changelog.get_all_links.side_effect = (dict(),)
-        return
-
-    # Point of Failure 3
-    if pof < 4:
-        all_links = {
-            version: f"https://example.com/" for version in sorted_versions
-        }
-        mock_changelog.get_all_links.side_effect = (all_links,)
+    ) -> None:
+        mock_changelog.get_latest_version.side_effect = (VersionInfo(1),)
+        mock_changelog.get_release_notes.side_effect = (ReleaseNotes(),)
+        count = literals.AUTOMATON_MIN_LITERALS
+        versioned_files = [
+            VersionedFile(
+                rel_path=Path("deps.txt"),
+                pattern=f"pkg{i} = {{{{ old_version }}}}",
+                match=MatchMode.LITERAL,
+            )
+            for i in range(count + 1)
+        ]
+        content = "".join(f"pkg{i} = 1.0.0\n" for i in range(count))
+
+        with (
+            patch(
+                "changelogger.app.commands.check.read_text",
+                return_value=content,
+            ),
+            patch.object(
+                literals,
+                "find_all",
+                wraps=literals.find_all,
+            ) as mock_find_all,
+            patch(
+                "changelogger.app.commands.check._search",
+            ) as mock_search,
+            pytest.raises(ValidationException) as exc_info,
+        ):
+            _check_versioned_files(versioned_files)
+
+        mock_find_all.assert_called_once()
+        mock_search.assert_not_called()
+        assert f"pkg{count} = 1.0.0" in str(exc_info.value)
+        assert "pkg0 = 1.0.0" not in str(exc_info.value)
+
+    def test_check_versioned_file_timeout(self) -> None:
+        file = VersionedFile(
+            rel_path=Path("big.txt"),
+            pattern="(a+)+$",
+            timeout=0.2,
+        )
 
-        return
+        with pytest.raises(PatternTimeoutException) as exc_info:
+            _check_versioned_file(file, MagicMock(), "a" * 40 + "b")
 
-    all_links = {
-        version: f"https://example.com/{old_version}...{version}"
-        for old_version, version in zip(sorted_versions, sorted_versions[1:])
-    }
+        assert 'Timed out checking "big.txt"' in str(exc_info.value)
 
-    # Point of Failure 4
-    if pof < 5:
-        mock_changelog.get_all_links.side_effect = (all_links,)
-        return
+    def test_check_profile_patterns(
+        self,
+        mock_check_versioned_files: MagicMock,
+        mock_versioned_files: MagicMock,
+    ) -> None:
+        with patch(
+            "changelogger.app.commands.check._profile_patterns",
+            return_value=True,
+        ) as mock_profile_patterns:
+            check(sys_exit=False, files=[], profile_patterns=True)
 
-    all_links["Unreleased"] = "https://example.com/"
+            with pytest.raises(Exit):
+                check(sys_exit=True, files=[], profile_patterns=True)
 
-    # Point of Failure 5
-    if pof < 6:
-        mock_changelog.get_all_links.side_effect = (all_links,)
-        return
+        assert mock_profile_patterns.call_count == 2
+        mock_check_versioned_files.assert_not_called()
 
-    all_links["Unreleased"] = f"https://example.com/{versions[0]}...HEAD"
+    def test_profile_patterns(
+        self,
+        tmp_path: Path,
+        mock_print: MagicMock,
+        mock_changelog: MagicMock,
+    ) -> None:
+        mock_changelog.get_latest_version.return_value = VersionInfo(1)
+        mock_changelog.get_release_notes.return_value = ReleaseNotes()
+        path = tmp_path.joinpath("version.py")
+        path.write_text('version = "1.0.0"\n')
+        versioned_files = [
+            VersionedFile(
+                rel_path=path,
+                pattern=r'version = "{{ old_version }}"',
+            ),
+            VersionedFile(rel_path=path, pattern=r"(\d+)+\."),
+        ]
+
+        with patch("changelogger.app.commands.check.read_text") as mock_read:
+            mock_read.side_effect = lambda path: path.read_text()
+            assert _profile_patterns(versioned_files)
+
+        mock_read.assert_called_once_with(path)
+        table = mock_print.call_args.args[0]
+        assert table.row_count == 2
+        assert list(table.columns[4].cells) == ["1", "2"]
+        assert "Nested" in list(table.columns[6].cells)[1]
+
+    def test_check_changelog_problems(
+        self,
+        mock_changelog: MagicMock,
+    ):
+        mock_changelog.validate_changelog.return_value = [
+            changelog.ChangelogProblem(4, "Some problem."),
+            changelog.ChangelogProblem(8, "Another problem."),
+        ]
+        advance = MagicMock()
+        with pytest.raises(ValidationException) as exc_info:
+            _check_changelog(advance)
 
-    # Point of Failure 6
-    if pof < 7:
-        mock_changelog.get_all_links.side_effect = (all_links,)
-        return
+        advance.assert_called_once()
+        message = exc_info.value.args[0]
+        assert "Found 2 problem(s)" in message
+        assert "line 4: Some problem." in message
+        assert "line 8: Another problem." in message
 
-    # No point of failure (7+)
-    all_links[sorted_versions[0]] = "https://example.com/commit/abc123"
-    mock_changelog.get_all_links.side_effect = (all_links,)
+    def test_check_changelog_valid(
+        self,
+        mock_changelog: MagicMock,
+    ):
+        mock_changelog.validate_changelog.return_value = []
+        advance = MagicMock()
+        _check_changelog(advance)
+        advance.assert_called_once()
@@ -31,7 +31,7 @@ class TestManageVersionsCommand:
 
         files: list[str] = []
 
-        precommit(files)
+        precommit(files, jobs=1)
         mock_check.assert_not_called()
 
     def test_precommit_files_found(
@@ -45,8 +45,29 @@ class TestManageVersionsCommand:
 
         files = [str(mock_file.rel_path)]
 
-        precommit(files)
+        precommit(files, jobs=4)
         mock_check.assert_called_once_with(
             sys_exit=True,
             files=files,
+            jobs=4,
+            profile_patterns=False,
         )
+
+    def test_precommit_runs_check(self, mock_settings: MagicMock) -> None:
+        mock_file = MagicMock()
+        mock_file.rel_path = Path("some_path.md")
+        mock_settings.VERSIONED_FILES = [mock_file]
+
+        with patch(
+            "changelogger.app.commands.check.settings", mock_settings
+        ), patch(
+            "changelogger.app.commands.check._check_versioned_files"
+        ) as mock_check_versioned_files, patch(
+            "changelogger.app.commands.check._profile_patterns"
+        ) as mock_profile_patterns, patch(
+            "changelogger.app.commands.check.print"
+        ):
+            precommit([str(mock_file.rel_path)], jobs=1)
+
+        mock_check_versioned_files.assert_called_once_with([mock_file], 1)
+        mock_profile_patterns.assert_not_called()
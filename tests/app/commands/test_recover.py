@@ -0,0 +1,48 @@
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from changelogger.app.commands.recover import recover
+from changelogger.transaction import Recovery
+
+
+class TestRecoverCommand:
+    @pytest.fixture
+    def mock_transaction(self):
+        with patch("changelogger.app.commands.recover.transaction") as mock:
+            yield mock
+
+    @pytest.fixture
+    def mock_print(self):
+        with patch("changelogger.app.commands.recover.print") as mock:
+            yield mock
+
+    def test_recover_nothing(
+        self,
+        mock_transaction: MagicMock,
+        mock_print: MagicMock,
+    ) -> None:
+        mock_transaction.recover.return_value = None
+        recover()
+        mock_print.assert_called_once_with("No interrupted upgrade found.")
+
+    @pytest.mark.parametrize(
+        "finished,action",
+        [(True, "Finished"), (False, "Undid")],
+    )
+    def test_recover(
+        self,
+        mock_transaction: MagicMock,
+        mock_print: MagicMock,
+        finished: bool,
+        action: str,
+    ) -> None:
+        mock_transaction.recover.return_value = Recovery(
+            finished, [Path("file.txt")]
+        )
+        recover()
+
+        printed = [str(c.args[0]) for c in mock_print.call_args_list]
+        assert printed[0].startswith(action)
+        assert "file.txt" in printed[1]
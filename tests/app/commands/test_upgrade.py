@@ -3,10 +3,12 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from changelogger.app.commands.upgrade import upgrade
+from changelogger.exceptions import UpgradeException
 from changelogger.models.domain_models import (
     BumpTarget,
     ChangelogUpdate,
     ReleaseNotes,
+    VersionInfo,
 )
 
 
@@ -80,6 +82,7 @@ class TestManageUpgradeCommand:
             version_to_bump,
             prompt_changelog=prompt_changelog,
             confirm=confirm,
+            jobs=1,
         )
 
         if prompt_changelog:
@@ -96,3 +99,82 @@ class TestManageUpgradeCommand:
         assert markdown in markup
 
         mock_changelog.update_versioned_files.assert_called()
+
+    @pytest.fixture
+    def mock_fragments(self):
+        with patch("changelogger.app.commands.upgrade.fragments") as mock:
+            yield mock
+
+    @pytest.fixture
+    def mock_settings(self):
+        with patch("changelogger.app.commands.upgrade.settings") as mock:
+            mock.FRAGMENTS = True
+            yield mock
+
+    @pytest.mark.parametrize("fails", [True, False])
+    def test_upgrade_compiles_fragments(
+        self,
+        fails: bool,
+        mock_changelog: MagicMock,
+        mock_print: MagicMock,
+        mock_fragments: MagicMock,
+        mock_settings: MagicMock,
+    ):
+        fragment_paths = [MagicMock()]
+        merged = ReleaseNotes(added=["from a fragment"])
+        mock_changelog.get_latest_version.side_effect = (
+            VersionInfo.parse("0.1.0"),
+        )
+        mock_changelog.get_release_notes.side_effect = (ReleaseNotes(),)
+        mock_fragments.paths.side_effect = (fragment_paths,)
+        mock_fragments.merge.side_effect = (merged,)
+        if fails:
+            mock_changelog.update_versioned_files.side_effect = (
+                UpgradeException("failed")
+            )
+
+        upgrade(
+            BumpTarget.PATCH,
+            prompt_changelog=False,
+            confirm=False,
+            jobs=1,
+        )
+
+        mock_fragments.merge.assert_called_once_with(
+            ReleaseNotes(),
+            fragment_paths,
+        )
+        (update, _, _), __ = mock_changelog.update_versioned_files.call_args
+        assert update.release_notes == merged
+        if fails:
+            mock_fragments.remove.assert_not_called()
+        else:
+            mock_fragments.remove.assert_called_once_with(fragment_paths)
+
+    def test_upgrade_jobs(
+        self,
+        mock_changelog: MagicMock,
+        mock_print: MagicMock,
+        mock_fragments: MagicMock,
+        mock_settings: MagicMock,
+    ):
+        mock_changelog.get_latest_version.side_effect = (
+            VersionInfo.parse("0.1.0"),
+        )
+        mock_changelog.get_release_notes.side_effect = (ReleaseNotes(),)
+        mock_settings.FRAGMENTS = False
+
+        upgrade(
+            BumpTarget.PATCH,
+            prompt_changelog=False,
+            confirm=False,
+            jobs=4,
+        )
+
+        (
+            _,
+            versioned_files,
+            jobs,
+        ), __ = mock_changelog.update_versioned_files.call_args
+        assert versioned_files == mock_settings.VERSIONED_FILES
+        assert jobs == 4
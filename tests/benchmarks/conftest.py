@@ -0,0 +1,118 @@
+import json
+import re
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Iterator
+
+import pytest
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+
+DEFAULT_BUDGET = 2.0
+
+
+def _calibrate() -> float:
+    """Times a fixed workload, so timings from machines of different speeds
+    can be compared with the baselines.
+    """
+    pattern = re.compile(r"(\d+)\.(\d+)\.(\d+)")
+
+    def workload() -> None:
+        for i in range(20_000):
+            pattern.match(f"{i}.{i}.{i}")
+        sorted(str(i) for i in range(100_000))
+
+    return min(_time(workload) for _ in range(5))
+
+
+def _time(func: Callable[[], object]) -> float:
+    start = perf_counter()
+    func()
+    return perf_counter() - start
+
+
+class Benchmark:
+    """Times named metrics and compares them with their baselines, scaled by
+    how this machine's speed compares with the one the baselines came from.
+    """
+
+    def __init__(self, baselines: dict, update: bool) -> None:
+        self.baselines = baselines
+        self.update = update
+        self.calibration = _calibrate()
+        self.timings: dict[str, float] = {}
+
+    def __call__(
+        self,
+        name: str,
+        func: Callable[[], object],
+        setup: Callable[[], object] | None = None,
+        repeat: int = 5,
+    ) -> float:
+        """Records the fastest of the repeated runs of the function, with the
+        setup run before each untimed.
+        """
+        timings = []
+        for _ in range(repeat):
+            if setup:
+                setup()
+            timings.append(_time(func))
+        timing = self.timings[name] = min(timings)
+
+        if not self.update:
+            self.check(name, timing)
+        return timing
+
+    def check(self, name: str, timing: float) -> None:
+        metrics = self.baselines.get("metrics", {})
+        if name not in metrics:
+            pytest.fail(
+                f"No baseline for `{name}`; run with --benchmark-update "
+                "to record it."
+            )
+
+        scale = self.calibration / self.baselines["calibration"]
+        budget = self.baselines.get("budgets", {}).get(
+            name,
+            self.baselines.get("budget", DEFAULT_BUDGET),
+        )
+        limit = metrics[name] * scale * budget
+        assert timing <= limit, (
+            f"`{name}` took {timing * 1000:.2f}ms, exceeding its budget of "
+            f"{limit * 1000:.2f}ms ({budget}x the "
+            f"{metrics[name] * scale * 1000:.2f}ms baseline)."
+        )
+
+    def dump(self) -> None:
+        baselines = dict(
+            self.baselines,
+            calibration=round(self.calibration, 6),
+            metrics=dict(
+                sorted(
+                    {
+                        **self.baselines.get("metrics", {}),
+                        **{
+                            name: round(timing, 6)
+                            for name, timing in self.timings.items()
+                        },
+                    }.items()
+                )
+            ),
+        )
+        BASELINES_PATH.write_text(json.dumps(baselines, indent=2) + "\n")
+
+
+@pytest.fixture(scope="session")
+def benchmark(request: pytest.FixtureRequest) -> Iterator[Benchmark]:
+    update = request.config.getoption("--benchmark-update")
+    baselines = (
+        json.loads(BASELINES_PATH.read_text())
+        if BASELINES_PATH.exists()
+        else {"budget": DEFAULT_BUDGET}
+    )
+
+    bench = Benchmark(baselines, update)
+    yield bench
+
+    if update:
+        bench.dump()
@@ -0,0 +1,100 @@
+"""Generators for synthetic changelogs and versioned files, used to measure
+how changelogger scales with the size of a project.
+"""
+from pathlib import Path
+
+from changelogger.conf.models import VersionedFile
+
+REPO = "example/project"
+FIRST_COMMIT = "abc123"
+
+
+def synthetic_versions(num_versions: int) -> list[str]:
+    """Versions from newest to oldest, as they appear in a changelog."""
+    return [f"{v // 100}.{v % 100}.0" for v in reversed(range(num_versions))]
+
+
+PRERELEASES = ["alpha", "alpha.1", "beta.2", "beta.11", "rc.1+build.7"]
+
+
+def synthetic_prerelease_versions(num_versions: int) -> list[str]:
+    """Versions from newest to oldest, most of them prereleases."""
+    return [
+        f"{v // 600}.{v // 6 % 100}.0"
+        + ("" if v % 6 == 5 else f"-{PRERELEASES[v % 6]}")
+        for v in reversed(range(num_versions))
+    ]
+
+
+def synthetic_changelog(num_versions: int) -> str:
+    versions = synthetic_versions(num_versions)
+
+    release_notes = ["### [Unreleased]\n\n#### Added\n- Unreleased feature\n"]
+    for version in versions:
+        release_notes.append(
+            f"### [{version}] - 2023-01-01\n\n"
+            f"#### Added\n- Feature for {version}\n"
+        )
+
+    links = [f"[Unreleased]: https://example.com/{versions[0]}...HEAD"]
+    for version, prev_version in zip(versions, versions[1:]):
+        links.append(
+            f"[{version}]: https://example.com/{prev_version}...{version}"
+        )
+    links.append(
+        f"[{versions[-1]}]: https://example.com/{FIRST_COMMIT}...{versions[-1]}"
+    )
+
+    return (
+        "# Changelog\n"
+        "<!-- BEGIN RELEASE NOTES -->\n"
+        + "\n".join(release_notes)
+        + "<!-- END RELEASE NOTES -->\n"
+        "<!-- BEGIN LINKS -->\n" + "\n".join(links) + "\n<!-- END LINKS -->\n"
+    )
+
+
+def synthetic_project(
+    root: Path,
+    num_versions: int,
+    num_versioned_files: int,
+) -> list[VersionedFile]:
+    """Writes a changelog and versioned files to the root, returning every
+    versioned file an upgrade would update, the changelog included.
+    """
+    latest_version = synthetic_versions(num_versions)[0]
+    root.joinpath("CHANGELOG.md").write_text(
+        synthetic_changelog(num_versions),
+    )
+
+    versioned_files = []
+    for i in range(num_versioned_files):
+        path = root.joinpath(f"versioned_{i}.toml")
+        path.write_text(
+            f'[package]\nname = "package-{i}"\n'
+            f'version = "{latest_version}"\n',
+        )
+        versioned_files.append(
+            VersionedFile(
+                rel_path=path,
+                pattern='version = "{{ old_version }}"',
+                jinja='version = "{{ new_version }}"',
+            )
+        )
+
+    git_context = dict(git=dict(repo=REPO, first_commit=FIRST_COMMIT))
+    return [
+        *versioned_files,
+        VersionedFile(
+            rel_path=root.joinpath("CHANGELOG.md"),
+            pattern=r"### \[Unreleased\]([\s\S]*)### \[{{ old_version }}]",
+            template=Path("overview.jinja2"),
+            context=git_context,
+        ),
+        VersionedFile(
+            rel_path=root.joinpath("CHANGELOG.md"),
+            pattern=r"\[Unreleased\]:.*\n",
+            template=Path("links.jinja2"),
+            context=git_context,
+        ),
+    ]
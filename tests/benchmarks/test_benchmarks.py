@@ -0,0 +1,250 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from time import perf_counter
+from unittest.mock import patch
+
+import pytest
+import yaml  # type: ignore
+
+from changelogger import cache, changelog, templating
+from changelogger.app.commands.check import _check_changelog
+from changelogger.conf import settings
+from changelogger.conf.models import VersionedFile
+from changelogger.models.domain_models import (
+    ChangelogUpdate,
+    VersionInfo,
+    parse_version,
+    sort_versions,
+)
+from tests.benchmarks.conftest import Benchmark
+from tests.benchmarks.generate import (
+    FIRST_COMMIT,
+    REPO,
+    synthetic_changelog,
+    synthetic_prerelease_versions,
+    synthetic_project,
+)
+
+pytestmark = pytest.mark.benchmark
+
+SIZES = [100, 1_000, 10_000, 100_000]
+
+NUM_VERSIONED_FILES = 10
+
+ROOT_DIR = Path(__file__).parents[2]
+
+
+class Project:
+    def __init__(self, root: Path, num_versions: int) -> None:
+        self.root = root
+        self.versioned_files = synthetic_project(
+            root,
+            num_versions,
+            NUM_VERSIONED_FILES,
+        )
+        self.contents = {
+            file.rel_path: file.rel_path.read_text()
+            for file in self.versioned_files
+        }
+
+    def restore(self) -> None:
+        for path, content in self.contents.items():
+            path.write_text(content)
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=str)
+def project(request, tmp_path_factory: pytest.TempPathFactory):
+    num_versions = request.param
+    root = tmp_path_factory.mktemp(f"project-{num_versions}")
+    project = Project(root, num_versions)
+
+    with patch.multiple(
+        settings,
+        CHANGELOG_PATH=root.joinpath("CHANGELOG.md"),
+        CACHE_DIR=root.joinpath(".changelogger", "cache"),
+    ):
+        yield project
+    changelog._load_changelog_index.cache_clear()
+
+
+def _cold() -> None:
+    """Forgets the changelog, so it's read and parsed again."""
+    changelog._load_changelog_index.cache_clear()
+    cache.clear()
+
+
+def test_get_all_versions(project: Project, benchmark: Benchmark):
+    benchmark(
+        f"get_all_versions[{len(changelog.get_all_versions())}]",
+        changelog.get_all_versions,
+        setup=_cold,
+    )
+
+
+def test_get_release_notes(project: Project, benchmark: Benchmark):
+    versions = changelog.get_all_versions()
+    benchmark(
+        f"get_release_notes[{len(versions)}]",
+        lambda: changelog.get_release_notes(versions[-1], None),
+        setup=_cold,
+    )
+
+
+def test_get_every_release_notes(project: Project, benchmark: Benchmark):
+    versions = changelog.get_all_versions()
+    benchmark(
+        f"get_every_release_notes[{len(versions)}]",
+        lambda: [
+            changelog.get_release_notes(version, None) for version in versions
+        ],
+    )
+
+
+def test_template_variables(project: Project, benchmark: Benchmark):
+    versions = changelog.get_all_versions()
+    update = ChangelogUpdate(
+        old_version=versions[0],
+        new_version=versions[0].bump_patch(),
+        release_notes=changelog.get_release_notes("Unreleased", versions[0]),
+    )
+    file = project.versioned_files[0]
+    benchmark(
+        f"template_variables[{len(versions)}]",
+        lambda: [templating._get_variables(file, update) for _ in versions],
+    )
+
+
+def test_sort_versions(project: Project, benchmark: Benchmark):
+    num_versions = len(changelog.get_all_versions())
+    versions = synthetic_prerelease_versions(num_versions)
+
+    benchmark(
+        f"sort_versions[{num_versions}]",
+        lambda: sort_versions(map(VersionInfo.parse, versions)),
+        setup=parse_version.cache_clear,
+    )
+
+
+def test_check_changelog(project: Project, benchmark: Benchmark):
+    num_versions = len(changelog.get_all_versions())
+    benchmark(
+        f"check_changelog[{num_versions}]",
+        lambda: _check_changelog(lambda: None),
+        setup=_cold,
+    )
+
+
+def test_check_changelog_is_linear(tmp_path: Path):
+    def time_check(num_versions: int) -> float:
+        path = tmp_path.joinpath(f"CHANGELOG-{num_versions}.md")
+        path.write_text(synthetic_changelog(num_versions))
+        with patch.multiple(
+            settings,
+            CHANGELOG_PATH=path,
+            CACHE_DIR=tmp_path.joinpath(".changelogger", "cache"),
+        ):
+            _cold()
+            start = perf_counter()
+            _check_changelog(lambda: None)
+            return perf_counter() - start
+
+    small, large = time_check(2_000), time_check(20_000)
+    changelog._load_changelog_index.cache_clear()
+
+    # Ten times the versions should take roughly ten times as long; a
+    # quadratic check would take around a hundred times as long.
+    assert large < small * 30
+
+
+def test_update_versioned_files(project: Project, benchmark: Benchmark):
+    versions = changelog.get_all_versions()
+    old_version = versions[0]
+    update = ChangelogUpdate(
+        old_version=old_version,
+        new_version=VersionInfo.parse(str(old_version)).bump_patch(),
+        release_notes=changelog.get_release_notes("Unreleased", old_version),
+    )
+
+    def setup() -> None:
+        project.restore()
+        _cold()
+
+    benchmark(
+        f"update_versioned_files[{len(versions)}]",
+        lambda: changelog.update_versioned_files(
+            update,
+            project.versioned_files,
+        ),
+        setup=setup,
+    )
+    project.restore()
+
+
+@pytest.fixture(scope="module")
+def cli_project(project: Project) -> Project:
+    """The project as a git repository configured for changelogger."""
+
+    def git(*args: str) -> None:
+        subprocess.run(
+            ["git", *args],
+            cwd=project.root,
+            check=True,
+            capture_output=True,
+        )
+
+    versioned_files = [
+        VersionedFile(
+            rel_path=file.rel_path.relative_to(project.root),
+            pattern=file.pattern,
+            jinja=file.jinja,
+        ).simple_dict()
+        for file in project.versioned_files
+        if file.jinja
+    ]
+    project.root.joinpath(".changelogger.yml").write_text(
+        yaml.safe_dump(
+            dict(
+                changelog=dict(first_commit=FIRST_COMMIT),
+                versioned_files=versioned_files,
+            )
+        )
+    )
+    git("init", "--quiet")
+    git("remote", "add", "origin", f"https://github.com/{REPO}.git")
+    return project
+
+
+@pytest.mark.parametrize(
+    "name,args",
+    [
+        ("versions", ["versions", "--latest"]),
+        ("notes", ["notes", "--no-pretty"]),
+        ("check", ["check"]),
+    ],
+)
+def test_cli(
+    name: str,
+    args: list[str],
+    cli_project: Project,
+    benchmark: Benchmark,
+):
+    env = dict(os.environ, PYTHONPATH=str(ROOT_DIR))
+
+    def run() -> None:
+        subprocess.run(
+            [sys.executable, "-m", "changelogger", *args],
+            cwd=cli_project.root,
+            env=env,
+            check=True,
+            capture_output=True,
+        )
+
+    num_versions = len(changelog.get_all_versions())
+    benchmark(
+        f"cli_{name}[{num_versions}]",
+        run,
+        setup=lambda: cache.clear(),
+        repeat=3,
+    )
@@ -0,0 +1,70 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from changelogger.conf import git
+
+HEAD = "f" * 40
+ROOT = "a" * 40
+
+
+@pytest.fixture
+def mock_repo():
+    repo = MagicMock()
+    repo.head.commit.hexsha = HEAD
+    repo.git.rev_list.return_value = f"{'b' * 40}\n{ROOT}\n"
+    with patch("git.repo.Repo", return_value=repo):
+        yield repo
+
+
+@pytest.fixture
+def mock_cache():
+    with patch("changelogger.conf.git.cache") as mock_cache:
+        mock_cache.read.return_value = None
+        yield mock_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_ctx():
+    git.get_ctx.cache_clear()
+    yield
+    git.get_ctx.cache_clear()
+
+
+def test_first_commit_lists_only_root_commits(mock_repo, mock_cache):
+    ctx = git._Git().get_ctx()
+
+    assert ctx["first_commit"] == ROOT[:10]
+    mock_repo.git.rev_list.assert_called_once_with("--max-parents=0", HEAD)
+    mock_repo.iter_commits.assert_not_called()
+    mock_cache.write.assert_called_once_with(
+        git.FIRST_COMMIT_CACHE_NAME,
+        dict(head=HEAD),
+        ROOT[:10],
+    )
+
+
+def test_first_commit_is_read_from_cache(mock_repo, mock_cache):
+    mock_cache.read.return_value = "cachedsha1"
+
+    ctx = git._Git().get_ctx()
+
+    assert ctx["first_commit"] == "cachedsha1"
+    mock_cache.read.assert_called_once_with(
+        git.FIRST_COMMIT_CACHE_NAME,
+        dict(head=HEAD),
+    )
+    mock_repo.git.rev_list.assert_not_called()
+
+
+def test_first_commit_override_skips_lookup(mock_repo, mock_cache):
+    ctx = git.get_ctx("overridden")
+
+    assert ctx["first_commit"] == "overridden"
+    mock_repo.git.rev_list.assert_not_called()
+    mock_cache.read.assert_not_called()
+
+
+def test_get_ctx_is_memoized(mock_repo, mock_cache):
+    assert git.get_ctx() is git.get_ctx()
+    mock_repo.git.rev_list.assert_called_once()
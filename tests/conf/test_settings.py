@@ -0,0 +1,83 @@
+import subprocess
+import sys
+from pathlib import Path
+from textwrap import dedent
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import changelogger
+from changelogger.conf import settings
+
+
+class TestSettings:
+    STARTUP_SCRIPT = dedent(
+        """
+        import sys
+
+        from typer.testing import CliRunner
+
+        from changelogger.app import app
+        from changelogger.conf import settings
+
+        result = CliRunner().invoke(app, sys.argv[1:])
+        assert result.exit_code == 0, result.output
+
+        print(" ".join(
+            name
+            for name in ("VERSIONED_FILES", "TMPL_ENV")
+            if name in vars(settings)
+        ))
+        print("git" in sys.modules)
+        """
+    )
+
+    @pytest.fixture
+    def lazy_setting(self):
+        name = "SOME_LAZY_SETTING"
+        loader = MagicMock()
+        with patch.dict(settings._LAZY_SETTINGS, {name: loader}):
+            yield name, loader
+        vars(settings).pop(name, None)
+
+    def test_lazy_setting_evaluated_once(self, lazy_setting):
+        name, loader = lazy_setting
+        assert name not in vars(settings)
+
+        assert getattr(settings, name) == loader.return_value
+        assert getattr(settings, name) == loader.return_value
+
+        assert name in vars(settings)
+        loader.assert_called_once()
+
+    def test_unknown_setting_raises(self):
+        with pytest.raises(AttributeError):
+            settings.NOT_A_SETTING
+
+    @pytest.mark.parametrize(
+        "args",
+        [["--version"], ["versions", "--latest"]],
+    )
+    def test_startup_skips_expensive_settings(
+        self,
+        args: list[str],
+        tmp_path: Path,
+    ):
+        tmp_path.joinpath(".git").mkdir()
+        tmp_path.joinpath("CHANGELOG.md").write_text(
+            Path("CHANGELOG.md").read_text(),
+        )
+        package_root = Path(changelogger.__file__).parent.parent
+
+        result = subprocess.run(
+            [sys.executable, "-c", self.STARTUP_SCRIPT, *args],
+            cwd=tmp_path,
+            env=dict(PYTHONPATH=str(package_root)),
+            capture_output=True,
+            text=True,
+        )
+
+        assert result.returncode == 0, result.stderr
+        evaluated, git_imported = result.stdout.splitlines()
+        assert evaluated == ""
+        assert git_imported == "False"
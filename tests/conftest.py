@@ -0,0 +1,37 @@
+import pytest
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("benchmarks")
+    group.addoption(
+        "--benchmark",
+        action="store_true",
+        help="Run the benchmarks, failing any which exceed their budget.",
+    )
+    group.addoption(
+        "--benchmark-update",
+        action="store_true",
+        help="Run the benchmarks and store their timings as the baselines.",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        "benchmark: timed against a stored baseline; run with --benchmark.",
+    )
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config,
+    items: list[pytest.Item],
+) -> None:
+    if config.getoption("--benchmark") or config.getoption(
+        "--benchmark-update"
+    ):
+        return
+
+    skip = pytest.mark.skip(reason="Benchmarks only run with --benchmark.")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,134 @@
+from functools import cmp_to_key
+from random import Random
+
+import pytest
+import semver
+
+from changelogger.models.domain_models import (
+    ChangelogUpdate,
+    ReleaseNotes,
+    VersionInfo,
+    parse_version,
+    sort_versions,
+)
+
+VERSIONS = [
+    "0.1.0",
+    "1.0.0-0",
+    "1.0.0-0.3.7",
+    "1.0.0-1",
+    "1.0.0-10",
+    "1.0.0-alpha",
+    "1.0.0-alpha.1",
+    "1.0.0-alpha.beta",
+    "1.0.0-alpha.2",
+    "1.0.0-alpha.10",
+    "1.0.0-beta",
+    "1.0.0-beta.2",
+    "1.0.0-beta.11",
+    "1.0.0-rc.1",
+    "1.0.0-x.7.z.92",
+    "1.0.0",
+    "1.0.0+build.1",
+    "1.0.1",
+    "1.2.0",
+    "1.10.0",
+    "2.0.0-rc.1+build.123",
+    "10.0.0",
+]
+
+
+class TestVersionInfo:
+    def test_parse_interned(self):
+        version = VersionInfo.parse("1.2.3-rc.1+build.4")
+
+        assert VersionInfo.parse("1.2.3-rc.1+build.4") is version
+        assert version.to_tuple() == (1, 2, 3, "rc.1", "build.4")
+
+    def test_parse_invalid_raises(self):
+        with pytest.raises(ValueError):
+            VersionInfo.parse("1.2")
+
+    @pytest.mark.parametrize("version", ["1.2", "v1.2.3", "1.2.3\n", ""])
+    def test_parse_version_invalid(self, version: str):
+        assert parse_version(version) is None
+
+    def test_sort_versions_matches_semver(self):
+        versions = [VersionInfo.parse(version) for version in VERSIONS]
+        Random(0).shuffle(versions)
+
+        expected = sorted(
+            versions,
+            key=cmp_to_key(semver.VersionInfo.compare),
+        )
+
+        assert sort_versions(versions) == expected
+        assert sorted(versions) == expected
+        assert [str(version) for version in expected[:3]] == VERSIONS[:3]
+
+    def test_build_metadata_ignored(self):
+        version = VersionInfo.parse("1.0.0")
+        with_build = VersionInfo.parse("1.0.0+build.1")
+
+        assert version.sort_key == with_build.sort_key
+        assert not version < with_build
+        assert version <= with_build
+
+    def test_compare_with_string(self):
+        version = VersionInfo.parse("1.0.0-rc.1")
+
+        assert version < "1.0.0"
+        assert version >= "1.0.0-beta"
+
+    def test_constructed_sort_key(self):
+        assert VersionInfo(1, 0, 0, "alpha.1").sort_key == (
+            VersionInfo.parse("1.0.0-alpha.1").sort_key
+        )
+
+
+class TestReleaseNotes:
+    def test_sections(self):
+        assert ReleaseNotes.sections() == [
+            "added",
+            "changed",
+            "deprecated",
+            "removed",
+            "fixed",
+            "security",
+        ]
+
+    def test_dict(self):
+        release_notes = ReleaseNotes(added=["a"], fixed=["b"])
+
+        assert release_notes.dict() == dict(
+            added=["a"],
+            changed=[],
+            deprecated=[],
+            removed=[],
+            fixed=["b"],
+            security=[],
+        )
+
+    def test_sections_not_shared(self):
+        release_notes = ReleaseNotes()
+        release_notes["added"].append("a")
+
+        assert ReleaseNotes() == ReleaseNotes(added=[])
+        assert not ReleaseNotes()
+        assert release_notes
+
+    def test_slotted(self):
+        with pytest.raises(AttributeError):
+            ReleaseNotes().other = []  # type: ignore[attr-defined]
+
+
+class TestChangelogUpdate:
+    def test_versions_parsed(self):
+        update = ChangelogUpdate(
+            new_version="1.1.0",  # type: ignore[arg-type]
+            old_version=None,
+            release_notes=ReleaseNotes(),
+        )
+
+        assert update.new_version is VersionInfo.parse("1.1.0")
+        assert update.old_version is None
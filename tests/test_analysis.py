@@ -0,0 +1,168 @@
+import re
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from changelogger import analysis
+from changelogger.conf.models import RegexEngine, VersionedFile
+from changelogger.models.domain_models import (
+    ChangelogUpdate,
+    ReleaseNotes,
+    VersionInfo,
+)
+
+
+@pytest.fixture
+def update() -> ChangelogUpdate:
+    return ChangelogUpdate(
+        new_version=VersionInfo(1, 1),
+        old_version=VersionInfo(1),
+        release_notes=ReleaseNotes(),
+    )
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        r"(a+)+$",
+        r"(?:a|b+)*c",
+        r"(\w*?)*-",
+    ],
+)
+def test_risky_quantifiers_nested(pattern: str):
+    warnings = analysis.risky_quantifiers(pattern)
+
+    assert len(warnings) == 1
+    assert "Nested" in warnings[0]
+
+
+@pytest.mark.parametrize(
+    "pattern,flags",
+    [
+        (r"### \[Unreleased\]([\s\S]*)### \[1.0.0\]", 0),
+        (r"a(.*)b", re.DOTALL),
+        (r"(?s)a(?:.*)b", 0),
+    ],
+)
+def test_risky_quantifiers_greedy(pattern: str, flags: int):
+    warnings = analysis.risky_quantifiers(pattern, flags)
+
+    assert len(warnings) == 1
+    assert "Greedy" in warnings[0]
+    assert not analysis.risky_quantifiers(pattern, flags, bounded=True)
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        r'version = "1\.0\.0"',
+        r"a(.*)b",
+        r"a[\s\S]*",
+        r"a[\s\S]*?b",
+        r"(a{1,3})+",
+        r"[(",
+    ],
+)
+def test_risky_quantifiers_safe(pattern: str):
+    assert not analysis.risky_quantifiers(pattern)
+
+
+def test_profile_pattern(update: ChangelogUpdate):
+    file = VersionedFile(
+        rel_path=Path("version.py"),
+        pattern=r'version = "{{ old_version }}"',
+    )
+    content = 'version = "1.0.0"\nversion = "1.0.0"\n'
+
+    profile = analysis.profile_pattern(file, update, content)
+
+    assert profile.pattern == 'version = "1.0.0"'
+    assert profile.engine == "re"
+    assert profile.matches == 2
+    assert profile.largest_match == len('version = "1.0.0"')
+    assert profile.seconds is not None
+    assert not profile.warnings
+
+
+def test_profile_pattern_no_matches(update: ChangelogUpdate):
+    file = VersionedFile(rel_path=Path("version.py"), pattern="(a+)+$")
+
+    profile = analysis.profile_pattern(file, update, "b")
+
+    assert profile.matches == 0
+    assert any("Nested" in warning for warning in profile.warnings)
+    assert "No matches." in profile.warnings
+
+
+def test_profile_pattern_large_match(update: ChangelogUpdate):
+    file = VersionedFile(rel_path=Path("big.txt"), pattern=r"x[^y]*y")
+    content = "x" + "-" * analysis.LARGE_MATCH_SIZE + "y"
+
+    profile = analysis.profile_pattern(file, update, content)
+
+    assert profile.largest_match == len(content)
+    assert "Matches up to" in profile.warnings[0]
+
+
+def test_profile_pattern_timeout(update: ChangelogUpdate):
+    file = VersionedFile(
+        rel_path=Path("big.txt"),
+        pattern="(a+)+$",
+        timeout=0.2,
+    )
+
+    profile = analysis.profile_pattern(file, update, "a" * 40 + "b")
+
+    assert profile.seconds is None
+    assert "timeout" in profile.warnings[-1]
+
+
+def test_profile_pattern_default_timeout(update: ChangelogUpdate):
+    file = VersionedFile(rel_path=Path("big.txt"), pattern=r"(a+)+b")
+
+    with patch.object(analysis, "DEFAULT_TIMEOUT", 0.2), patch.object(
+        analysis.settings, "PATTERN_TIMEOUT", None
+    ):
+        profile = analysis.profile_pattern(file, update, "ab" + "a" * 30 + "!")
+
+    assert profile.seconds is None
+    assert "0.2s timeout" in profile.warnings[-1]
+
+
+def test_profile_pattern_re2_skips_quantifier_warnings(
+    update: ChangelogUpdate,
+):
+    file = VersionedFile(
+        rel_path=Path("big.txt"),
+        pattern="(a+)+$",
+        engine=RegexEngine.RE2,
+    )
+
+    with patch.object(analysis.engines, "is_available", return_value=True):
+        with patch.object(analysis.templating, "compile_pattern") as compile:
+            compile.return_value = re.compile(file.pattern)
+            profile = analysis.profile_pattern(file, update, "aa")
+
+    assert profile.engine == "re2"
+    assert profile.matches == 1
+    assert not profile.warnings
+
+
+def test_profile_pattern_large_file(
+    tmp_path: Path,
+    update: ChangelogUpdate,
+):
+    path = tmp_path.joinpath("big.txt")
+    path.write_text('version = "1.0.0"\n' * 3)
+    file = VersionedFile(
+        rel_path=path,
+        pattern=r'version = "{{ old_version }}"',
+        timeout=5,
+    )
+
+    profile = analysis.profile_pattern(file, update, None)
+
+    assert profile.matches == 3
+    assert profile.largest_match == len('version = "1.0.0"')
+    assert not profile.warnings
@@ -0,0 +1,140 @@
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from changelogger import cache, transaction
+from changelogger.exceptions import CommandException
+
+
+class TestCache:
+    NAME = "entry"
+
+    @pytest.fixture
+    def mock_settings(self, tmp_path: Path):
+        with patch("changelogger.cache.settings") as mock, patch(
+            "changelogger.transaction.settings", mock
+        ):
+            mock.CACHE_DIR = tmp_path.joinpath("cache")
+            mock.CHANGELOGGER_VERSION = "1.0.0"
+            yield mock
+
+    @pytest.fixture
+    def fingerprint(self) -> dict:
+        return cache.fingerprint(Path("CHANGELOG.md"), b"content", 1, 7)
+
+    def test_fingerprint_changes_with_content(self, fingerprint: dict):
+        other = cache.fingerprint(Path("CHANGELOG.md"), b"contenT", 1, 7)
+        assert fingerprint != other
+        assert fingerprint["size"] == other["size"]
+        assert fingerprint["mtime_ns"] == other["mtime_ns"]
+
+    def test_read_missing(self, mock_settings: MagicMock, fingerprint: dict):
+        assert cache.read(self.NAME, fingerprint) is None
+
+    def test_write_and_read(self, mock_settings: MagicMock, fingerprint: dict):
+        data = dict(some=["data"])
+        cache.write(self.NAME, fingerprint, data)
+
+        assert cache.read(self.NAME, fingerprint) == data
+        assert mock_settings.CACHE_DIR.joinpath(".gitignore").exists()
+
+    def test_read_stale_fingerprint(
+        self,
+        mock_settings: MagicMock,
+        fingerprint: dict,
+    ):
+        cache.write(self.NAME, fingerprint, "data")
+        stale = dict(fingerprint, mtime_ns=2)
+
+        assert cache.read(self.NAME, stale) is None
+
+    def test_read_other_version(
+        self,
+        mock_settings: MagicMock,
+        fingerprint: dict,
+    ):
+        cache.write(self.NAME, fingerprint, "data")
+        mock_settings.CHANGELOGGER_VERSION = "2.0.0"
+
+        assert cache.read(self.NAME, fingerprint) is None
+
+    def test_read_corrupt_entry(
+        self,
+        mock_settings: MagicMock,
+        fingerprint: dict,
+    ):
+        cache.write(self.NAME, fingerprint, "data")
+        mock_settings.CACHE_DIR.joinpath(f"{self.NAME}.json").write_text("{")
+
+        assert cache.read(self.NAME, fingerprint) is None
+
+    def test_entries_and_clear(
+        self,
+        mock_settings: MagicMock,
+        fingerprint: dict,
+    ):
+        assert cache.entries() == []
+
+        cache.write(self.NAME, fingerprint, "data")
+        assert cache.entries() == [
+            mock_settings.CACHE_DIR.joinpath(f"{self.NAME}.json"),
+        ]
+
+        cache.clear()
+        assert cache.entries() == []
+        assert not mock_settings.CACHE_DIR.exists()
+
+    def test_interrupted_upgrade(
+        self,
+        tmp_path: Path,
+        mock_settings: MagicMock,
+        fingerprint: dict,
+    ):
+        path = tmp_path.joinpath("file.txt")
+        path.write_text("old")
+        txn = transaction.Transaction()
+        txn.begin([path])
+        txn.snapshot(path)
+        cache.write(self.NAME, fingerprint, "data")
+
+        assert cache.entries() == [
+            mock_settings.CACHE_DIR.joinpath(f"{self.NAME}.json"),
+        ]
+        with pytest.raises(CommandException):
+            cache.clear()
+        assert transaction.journal_path().exists()
+        assert txn.snapshots[path].exists()
+
+        transaction.recover()
+        cache.clear()
+        assert not mock_settings.CACHE_DIR.exists()
+
+    def test_clear_shared_directory(
+        self,
+        tmp_path: Path,
+        mock_settings: MagicMock,
+        fingerprint: dict,
+    ):
+        mock_settings.CACHE_DIR = tmp_path
+        template = tmp_path.joinpath("templates", "changelog.md.jinja2")
+        template.parent.mkdir()
+        template.write_text("template")
+        tmp_path.joinpath(".gitignore").write_text("*.pyc\n")
+        cache.write(self.NAME, fingerprint, "data")
+        cache.bytecode_dir().mkdir()
+        cache.bytecode_dir().joinpath("template.cache").write_bytes(b"")
+
+        assert cache.entries() == [
+            tmp_path.joinpath(f"{self.NAME}.json"),
+            cache.bytecode_dir().joinpath("template.cache"),
+        ]
+
+        cache.clear()
+
+        assert sorted(tmp_path.rglob("*")) == [
+            tmp_path.joinpath(".gitignore"),
+            template.parent,
+            template,
+        ]
+        assert tmp_path.joinpath(".gitignore").read_text() == "*.pyc\n"
@@ -1,15 +1,29 @@
+import os
+from pathlib import Path
 from textwrap import dedent
+from typing import Callable
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from changelogger import changelog
+from changelogger import changelog, templating, transaction
+from changelogger.conf.defaults import (
+    DEFAULT_LINKS_JINJA_PATTERN,
+    DEFAULT_LINKS_TEMPLATE,
+    DEFAULT_OVERVIEW_JINJA_PATTERN,
+    DEFAULT_OVERVIEW_TEMPLATE,
+)
+from changelogger.conf.models import VersionedFile
 from changelogger.exceptions import (
     CommandException,
     RollbackException,
     UpgradeException,
 )
-from changelogger.models.domain_models import VersionInfo
+from changelogger.models.domain_models import (
+    ChangelogUpdate,
+    ReleaseNotes,
+    VersionInfo,
+)
 
 
 class TestChangelog:
@@ -25,7 +39,22 @@ class TestChangelog:
 
     @pytest.fixture
     def mock_rollback(self):
-        with patch("changelogger.changelog._rollback") as mock:
+        with patch(
+            "changelogger.changelog.transaction.Transaction.rollback"
+        ) as mock:
+            yield mock
+
+    @pytest.fixture
+    def mock_journal(self, tmp_path_factory: pytest.TempPathFactory):
+        cache_dir = tmp_path_factory.mktemp("cache")
+        with patch("changelogger.transaction.settings") as mock:
+            mock.CACHE_DIR = cache_dir
+            yield cache_dir.joinpath(transaction.JOURNAL_NAME)
+
+    @pytest.fixture(autouse=True)
+    def mock_large_files(self):
+        with patch("changelogger.changelog.large_files") as mock:
+            mock.is_large.return_value = False
             yield mock
 
     @pytest.fixture
@@ -33,9 +62,31 @@ class TestChangelog:
         with patch("changelogger.changelog._get_changelog_parition") as mock:
             yield mock
 
+    @pytest.fixture(autouse=True)
+    def mock_cache(self):
+        changelog._load_changelog_index.cache_clear()
+        with patch("changelogger.changelog.cache") as mock:
+            mock.read.return_value = None
+            yield mock
+        changelog._load_changelog_index.cache_clear()
+
+    @pytest.fixture
+    def mock_changelog_content(self, mock_settings: MagicMock):
+        def set_content(release_notes: str = "", links: str = "") -> None:
+            mock_settings.CHANGELOG_PATH.read_bytes.return_value = (
+                f"<!-- BEGIN {changelog.CHANGELOG_PARTITION_RELEASE_NOTES} -->"
+                f"{release_notes}"
+                f"<!-- END {changelog.CHANGELOG_PARTITION_RELEASE_NOTES} -->\n"
+                f"<!-- BEGIN {changelog.CHANGELOG_PARTITION_LINKS} -->"
+                f"{links}"
+                f"<!-- END {changelog.CHANGELOG_PARTITION_LINKS} -->\n"
+            ).encode()
+
+        return set_content
+
     def test_get_all_links(
         self,
-        mock_get_changelog_partition: MagicMock,
+        mock_changelog_content: Callable,
     ) -> None:
         unreleased = "Unreleased"
         v420 = VersionInfo(4, 2)
@@ -48,7 +99,7 @@ class TestChangelog:
         [{v400}]: https://some-link.com/{v400}
         Not a link with a link
         """
-        mock_get_changelog_partition.side_effect = (content,)
+        mock_changelog_content(links=content)
         links = changelog.get_all_links()
         versions = [unreleased, v420, v410, v400]
         for v in versions:
@@ -57,8 +108,7 @@ class TestChangelog:
 
     def test_get_all_versions(
         self,
-        mock_settings: MagicMock,
-        mock_get_changelog_partition: MagicMock,
+        mock_changelog_content: Callable,
     ) -> None:
         v420 = "4.2.0"
         v410 = "4.1.0"
@@ -70,16 +120,14 @@ class TestChangelog:
         ### [{v400}]
         Not a version
         """
-        mock_get_changelog_partition.side_effect = (content,)
-        mock_settings.CHANGELOG_PATH.read_text.side_effect = (content,)
+        mock_changelog_content(release_notes=content)
         all_versions = changelog.get_all_versions()
         expected_versions = [v420, v410, v400]
         assert all_versions == expected_versions
 
     def test_get_sorted_versions(
         self,
-        mock_settings: MagicMock,
-        mock_get_changelog_partition: MagicMock,
+        mock_changelog_content: Callable,
     ) -> None:
         v420 = "4.2.0"
         v410 = "4.1.0"
@@ -90,16 +138,14 @@ class TestChangelog:
         ### [{v400}]
         Not a version
         """
-        mock_get_changelog_partition.side_effect = (content,)
-        mock_settings.CHANGELOG_PATH.read_text.side_effect = (content,)
+        mock_changelog_content(release_notes=content)
         all_versions = changelog.get_sorted_versions()
         expected_versions = [v400, v410, v420]
         assert all_versions == expected_versions
 
     def test_get_latest_versions(
         self,
-        mock_settings: MagicMock,
-        mock_get_changelog_partition: MagicMock,
+        mock_changelog_content: Callable,
     ) -> None:
         v243 = "2.4.3"
         v420 = "4.2.0"
@@ -112,32 +158,27 @@ class TestChangelog:
         ### [{v400}]
         Not a version
         """
-        mock_get_changelog_partition.side_effect = (content,)
-        mock_settings.CHANGELOG_PATH.read_text.side_effect = (content,)
+        mock_changelog_content(release_notes=content)
         latest_version = changelog.get_latest_version()
         assert latest_version == v420
 
     def test_get_latest_versions_no_versions(
         self,
-        mock_settings: MagicMock,
-        mock_get_changelog_partition: MagicMock,
+        mock_changelog_content: Callable,
     ) -> None:
         content = f"""
         Not a version
         """
-        mock_get_changelog_partition.side_effect = (content,)
-        mock_settings.CHANGELOG_PATH.read_text.side_effect = (content,)
+        mock_changelog_content(release_notes=content)
         with pytest.raises(UpgradeException):
             changelog.get_latest_version()
 
     def test_get_release_notes_no_match_raises(
         self,
-        mock_settings,
-        mock_get_changelog_partition: MagicMock,
+        mock_changelog_content: Callable,
     ):
         content = ""
-        mock_get_changelog_partition.side_effect = (content,)
-        mock_settings.CHANGELOG_PATH.read_text.side_effect = (content,)
+        mock_changelog_content(release_notes=content)
         with pytest.raises(UpgradeException) as excinfo:
             changelog.get_release_notes(VersionInfo(0), VersionInfo(0))
 
@@ -145,8 +186,7 @@ class TestChangelog:
 
     def test_get_release_notes(
         self,
-        mock_settings,
-        mock_get_changelog_partition: MagicMock,
+        mock_changelog_content: Callable,
     ):
         v420 = VersionInfo(4, 2)
         v410 = VersionInfo(4, 1)
@@ -170,71 +210,266 @@ class TestChangelog:
         ### [{v400}]
         """
         )
-        mock_get_changelog_partition.side_effect = (content,)
-        mock_settings.CHANGELOG_PATH.read_text.side_effect = (content,)
+        mock_changelog_content(release_notes=content)
         release_notes = changelog.get_release_notes(v420, v410)
         assert not release_notes.deprecated
         assert note1 in release_notes.added
         assert note2 in release_notes.added
 
-    def test_rollback(
-        self,
-    ):
-        path = MagicMock()
-        content = "Some content"
-        changelog._rollback([(path, content)])
-
-        path.write_text.assert_called_once_with(content)
-
     def test_upgrade_versioned_files_raises_upgrade_exc(
         self,
+        tmp_path: Path,
         mock_templating: MagicMock,
+        mock_journal: Path,
     ):
-        mock_templating.update.side_effect = Exception("oops")
-
-        update = MagicMock()
-        versioned_file = MagicMock()
+        mock_templating.rewrite.side_effect = Exception("oops")
+        path = tmp_path.joinpath("file.txt")
+        path.write_text("old")
 
         with pytest.raises(UpgradeException):
             changelog.update_versioned_files(
-                update=update, versioned_files=[versioned_file]
+                update=MagicMock(), versioned_files=[MagicMock(rel_path=path)]
             )
 
+        assert path.read_text() == "old"
+        assert not mock_journal.exists()
+
     def test_upgrade_versioned_files_raises_rollback_exc(
         self,
+        tmp_path: Path,
         mock_templating: MagicMock,
         mock_rollback: MagicMock,
+        mock_journal: Path,
     ):
-        mock_templating.update.side_effect = Exception("oops")
+        mock_templating.rewrite.side_effect = Exception("oops")
         mock_rollback.side_effect = Exception("double oops")
-
-        update = MagicMock()
-        versioned_file = MagicMock()
+        path = tmp_path.joinpath("file.txt")
+        path.write_text("old")
 
         with pytest.raises(RollbackException):
             changelog.update_versioned_files(
-                update=update, versioned_files=[versioned_file]
+                update=MagicMock(), versioned_files=[MagicMock(rel_path=path)]
+            )
+
+        # Left for `recover` to finish undoing the upgrade.
+        assert mock_journal.exists()
+
+    def test_upgrade_versioned_files_journal_exists_raises(
+        self,
+        tmp_path: Path,
+        mock_templating: MagicMock,
+        mock_journal: Path,
+    ):
+        mock_journal.write_text("{}")
+        path = tmp_path.joinpath("file.txt")
+        path.write_text("old")
+
+        with pytest.raises(UpgradeException):
+            changelog.update_versioned_files(
+                update=MagicMock(), versioned_files=[MagicMock(rel_path=path)]
             )
 
+        mock_templating.rewrite.assert_not_called()
+        assert mock_journal.exists()
+
     def test_upgrade_versioned_files(
         self,
+        tmp_path: Path,
         mock_templating: MagicMock,
         mock_rollback: MagicMock,
+        mock_journal: Path,
     ):
         update = MagicMock()
-        versioned_file = MagicMock()
+        path = tmp_path.joinpath("file.txt")
+        path.write_text("old")
+        versioned_file = MagicMock(rel_path=path)
+        mock_templating.rewrite.return_value = ["new"]
 
         changelog.update_versioned_files(
             update=update, versioned_files=[versioned_file]
         )
 
-        mock_templating.update.assert_called_once_with(
+        mock_templating.rewrite.assert_called_once_with(
             versioned_file,
             update,
-            versioned_file.rel_path.read_text(),
+            "old",
+            None,
         )
+        assert path.read_text() == "new"
+        assert sorted(tmp_path.iterdir()) == [path]
+        assert not mock_journal.exists()
         mock_rollback.assert_not_called()
 
+    def test_upgrade_versioned_files_skips_unchanged(
+        self,
+        tmp_path: Path,
+        mock_templating: MagicMock,
+        mock_journal: Path,
+    ):
+        path = tmp_path.joinpath("file.txt")
+        path.write_text("old")
+        inode = path.stat().st_ino
+        mock_templating.rewrite.side_effect = lambda _, __, content, ___: [
+            content[:1],
+            content[1:],
+        ]
+
+        with patch("changelogger.changelog.transaction.Transaction") as txn:
+            changelog.update_versioned_files(
+                update=MagicMock(), versioned_files=[MagicMock(rel_path=path)]
+            )
+
+        txn().stage.assert_not_called()
+        assert path.stat().st_ino == inode
+
+    @pytest.mark.parametrize("jobs", [1, 4])
+    def test_upgrade_versioned_files_groups_by_path(
+        self,
+        jobs: int,
+        tmp_path: Path,
+        mock_templating: MagicMock,
+        mock_journal: Path,
+    ):
+        update = MagicMock()
+        path = tmp_path.joinpath("path")
+        other_path = tmp_path.joinpath("other_path")
+        path.write_text("path")
+        other_path.write_text("other")
+        versioned_files = [
+            MagicMock(rel_path=path),
+            MagicMock(rel_path=other_path),
+            MagicMock(rel_path=path),
+        ]
+        mock_templating.rewrite.side_effect = lambda file, _, content, __: [
+            content,
+            f"+{versioned_files.index(file)}",
+        ]
+
+        changelog.update_versioned_files(
+            update=update, versioned_files=versioned_files, jobs=jobs
+        )
+
+        assert sorted(
+            args[2] for args, _ in mock_templating.rewrite.call_args_list
+        ) == ["other", "path", "path+0"]
+        assert path.read_text() == "path+0+2"
+        assert other_path.read_text() == "other+1"
+
+    def test_upgrade_versioned_files_jobs_all_or_nothing(
+        self,
+        tmp_path: Path,
+        mock_templating: MagicMock,
+        mock_journal: Path,
+    ):
+        paths = [tmp_path.joinpath(f"{i}.txt") for i in range(8)]
+        for path in paths:
+            path.write_text("old")
+
+        def rewrite(file: MagicMock, _, content: str, __) -> list[str]:
+            if file.rel_path == paths[5]:
+                raise Exception("oops")
+            return ["new"]
+
+        mock_templating.rewrite.side_effect = rewrite
+
+        with pytest.raises(UpgradeException):
+            changelog.update_versioned_files(
+                update=MagicMock(),
+                versioned_files=[MagicMock(rel_path=path) for path in paths],
+                jobs=4,
+            )
+
+        assert [path.read_text() for path in paths] == ["old"] * len(paths)
+        assert sorted(tmp_path.iterdir()) == sorted(paths)
+        assert not mock_journal.exists()
+
+    def test_upgrade_versioned_files_rollback_committed(
+        self,
+        tmp_path: Path,
+        mock_templating: MagicMock,
+        mock_journal: Path,
+    ):
+        mock_templating.rewrite.side_effect = (["new"], ["newer"], ["other"])
+        path = tmp_path.joinpath("path")
+        other_path = tmp_path.joinpath("other_path")
+        path.write_text("old")
+        other_path.write_text("old other")
+        versioned_files = [
+            MagicMock(rel_path=path),
+            MagicMock(rel_path=path),
+            MagicMock(rel_path=other_path),
+        ]
+        replace = os.replace
+
+        def fail_other(source: Path, target: Path) -> None:
+            if target == other_path:
+                raise OSError("oops")
+            replace(source, target)
+
+        with patch(
+            "changelogger.transaction.os.replace",
+            side_effect=fail_other,
+        ), pytest.raises(UpgradeException):
+            changelog.update_versioned_files(
+                update=MagicMock(), versioned_files=versioned_files
+            )
+
+        assert path.read_text() == "old"
+        assert other_path.read_text() == "old other"
+        assert sorted(tmp_path.iterdir()) == [other_path, path]
+        assert not list(
+            mock_journal.parent.glob(f"{transaction.SNAPSHOTS_PREFIX}*")
+        )
+
+    def test_upgrade_versioned_files_large_file(
+        self,
+        tmp_path: Path,
+        mock_templating: MagicMock,
+        mock_large_files: MagicMock,
+        mock_journal: Path,
+    ):
+        update = MagicMock()
+        path = tmp_path.joinpath("big.txt")
+        path.write_text("original")
+        versioned_files = [MagicMock(rel_path=path), MagicMock(rel_path=path)]
+        updated = tmp_path.joinpath("updated")
+        updated.write_text("updated")
+        mock_large_files.is_large.return_value = True
+        mock_large_files.update.return_value = updated
+
+        changelog.update_versioned_files(
+            update=update, versioned_files=versioned_files
+        )
+
+        mock_large_files.update.assert_called_once_with(
+            path,
+            versioned_files,
+            update,
+        )
+        mock_templating.rewrite.assert_not_called()
+        assert path.read_text() == "updated"
+        assert sorted(tmp_path.iterdir()) == [path]
+
+    def test_upgrade_versioned_files_large_file_unchanged(
+        self,
+        tmp_path: Path,
+        mock_large_files: MagicMock,
+        mock_journal: Path,
+    ):
+        path = tmp_path.joinpath("big.txt")
+        path.write_text("original")
+        mock_large_files.is_large.return_value = True
+        mock_large_files.update.return_value = None
+
+        changelog.update_versioned_files(
+            update=MagicMock(), versioned_files=[MagicMock(rel_path=path)]
+        )
+
+        assert path.read_text() == "original"
+        assert not list(
+            mock_journal.parent.glob(f"{transaction.SNAPSHOTS_PREFIX}*")
+        )
+
     @pytest.mark.parametrize(
         "delimiter,func_name",
         [
@@ -261,14 +496,16 @@ class TestChangelog:
         mock_settings: MagicMock,
     ):
         expected = "I am expected 👀"
-        partition = "PARTITION"
+        partition = changelog.CHANGELOG_PARTITION_LINKS
         content = f"""
         <!-- BEGIN {partition} -->
         {expected}
         <!-- END {partition} -->
         """
 
-        mock_settings.CHANGELOG_PATH.read_text.side_effect = (content,)
+        mock_settings.CHANGELOG_PATH.read_bytes.side_effect = (
+            content.encode(),
+        )
 
         actual = changelog._get_changelog_parition(partition)
 
@@ -281,10 +518,348 @@ class TestChangelog:
         partition = "PARTITION"
         content = ""
 
-        mock_settings.CHANGELOG_PATH.read_text.side_effect = (content,)
+        mock_settings.CHANGELOG_PATH.read_bytes.side_effect = (
+            content.encode(),
+        )
 
         with pytest.raises(CommandException) as excinfo:
             changelog._get_changelog_parition(partition)
 
         assert excinfo.value.args
         assert f"Expected partition for `{partition}`" in excinfo.value.args[0]
+
+    def test_changelog_read_once(
+        self,
+        mock_settings: MagicMock,
+        mock_changelog_content: Callable,
+    ):
+        mock_changelog_content(
+            release_notes="\n### [Unreleased]\n\n### [0.1.0] - 2023-01-01\n",
+            links="\n[Unreleased]: https://some-link.com/0.1.0...HEAD\n",
+        )
+        changelog.get_all_versions()
+        changelog.get_latest_version()
+        changelog.get_all_links()
+        changelog.get_release_notes("Unreleased", VersionInfo(0, 1))
+
+        mock_settings.CHANGELOG_PATH.read_bytes.assert_called_once()
+
+    def test_changelog_index_restored_from_cache(
+        self,
+        mock_settings: MagicMock,
+        mock_cache: MagicMock,
+    ):
+        index = changelog.ChangelogIndex(TestChangelogIndex.CONTENT)
+        mock_settings.CHANGELOG_PATH.read_bytes.return_value = (
+            index.content.encode()
+        )
+        mock_cache.read.return_value = index.to_dict()
+
+        with patch.object(changelog.ChangelogIndex, "_scan") as mock_scan:
+            restored = changelog.get_changelog_index()
+
+        mock_scan.assert_not_called()
+        mock_cache.write.assert_not_called()
+        assert restored.headings == index.headings
+        assert restored.links == index.links
+        assert restored.partitions == index.partitions
+
+    def test_changelog_index_written_to_cache(
+        self,
+        mock_settings: MagicMock,
+        mock_cache: MagicMock,
+    ):
+        mock_settings.CHANGELOG_PATH.read_bytes.return_value = (
+            TestChangelogIndex.CONTENT.encode()
+        )
+        index = changelog.get_changelog_index()
+
+        mock_cache.write.assert_called_once_with(
+            changelog.CHANGELOG_CACHE_NAME,
+            mock_cache.fingerprint(),
+            index.to_dict(),
+        )
+
+
+class TestChangelogIndex:
+    CONTENT = dedent(
+        """
+        # Changelog
+        <!-- BEGIN RELEASE NOTES -->
+        ### [Unreleased]
+
+        #### Fixed
+        - a fix
+
+        ### [0.2.0] - 2023-02-01
+
+        #### Added
+        - a feature
+        - another feature
+
+        ### [0.1.0] - 2023-01-01
+        <!-- END RELEASE NOTES -->
+        <!-- BEGIN LINKS -->
+        [Unreleased]: https://some-link.com/0.2.0...HEAD
+        [0.2.0]: https://some-link.com/0.1.0...0.2.0
+        [0.1.0]: https://some-link.com/abc...0.1.0
+        <!-- END LINKS -->
+        """
+    )
+
+    def test_headings(self):
+        index = changelog.ChangelogIndex(self.CONTENT)
+
+        labels = [heading.label for heading in index.headings]
+        assert labels == ["Unreleased", "0.2.0", "0.1.0"]
+        assert index.versions == [VersionInfo(0, 2), VersionInfo(0, 1)]
+
+        unreleased, v020, v010 = index.headings
+        assert unreleased.date is None
+        assert v020.date == "2023-02-01"
+        assert v020.line == 9
+        assert self.CONTENT[v020.start :].startswith("### [0.2.0]")
+        assert unreleased.end == v020.start
+        assert v020.end == v010.start
+        assert self.CONTENT[v010.end :].startswith("<!-- END RELEASE NOTES")
+
+    def test_sections(self):
+        index = changelog.ChangelogIndex(self.CONTENT)
+
+        unreleased, v020, v010 = index.headings
+        assert unreleased.sections == {"fixed": ["a fix"]}
+        assert v020.sections == {"added": ["a feature", "another feature"]}
+        assert v010.sections == {}
+
+    def test_links(self):
+        index = changelog.ChangelogIndex(self.CONTENT)
+
+        assert set(index.links) == {
+            "Unreleased",
+            VersionInfo(0, 2),
+            VersionInfo(0, 1),
+        }
+
+    def test_release_notes_non_adjacent_raises(self):
+        index = changelog.ChangelogIndex(self.CONTENT)
+
+        with pytest.raises(UpgradeException):
+            index.release_notes("Unreleased", VersionInfo(0, 1))
+
+    @pytest.mark.parametrize(
+        "old,new,line,message",
+        [
+            (
+                "#### Added",
+                "#### Addded",
+                9,
+                "Failed to validate notes for version 0.2.0: unknown "
+                "section `addded`.",
+            ),
+            (
+                "### [0.2.0] - 2023-02-01",
+                "### [0.2.0.1] - 2023-02-01",
+                9,
+                "`0.2.0.1` is not a valid version.",
+            ),
+            (
+                "### [0.2.0] - 2023-02-01",
+                "### [0.0.1] - 2023-02-01",
+                15,
+                "Version 0.1.0 is out of order",
+            ),
+            (
+                "### [0.1.0] - 2023-01-01",
+                "### [0.2.0] - 2023-01-01",
+                15,
+                "Duplicate heading for version 0.2.0.",
+            ),
+            (
+                "### [Unreleased]",
+                "",
+                3,
+                "Could not find the unreleased heading.",
+            ),
+            (
+                "[0.2.0]: https://some-link.com/0.1.0...0.2.0",
+                "",
+                9,
+                "Could not find the link for version 0.2.0.",
+            ),
+            (
+                "[0.2.0]: https://some-link.com/0.1.0...0.2.0",
+                "[0.2.0]: https://some-link.com/0.2.0",
+                19,
+                "Link is incorrect for version 0.2.0",
+            ),
+            (
+                "[Unreleased]: https://some-link.com/0.2.0...HEAD",
+                "",
+                17,
+                "Could not find the link for unreleased changes.",
+            ),
+            (
+                "[Unreleased]: https://some-link.com/0.2.0...HEAD",
+                "[Unreleased]: https://some-link.com/0.1.0...HEAD",
+                18,
+                "Link is incorrect for the unreleased changes",
+            ),
+            (
+                "[0.1.0]: https://some-link.com/abc...0.1.0",
+                "",
+                15,
+                "Could not find the link for version 0.1.0.",
+            ),
+            (
+                "<!-- BEGIN LINKS -->",
+                "",
+                1,
+                "Expected partition for `LINKS`; None found.",
+            ),
+        ],
+    )
+    def test_validate(self, old: str, new: str, line: int, message: str):
+        assert old in self.CONTENT
+        index = changelog.ChangelogIndex(self.CONTENT.replace(old, new))
+
+        problems = index.validate()
+
+        assert problems
+        assert any(
+            problem.line == line and message in problem.message
+            for problem in problems
+        )
+
+    def test_validate_no_versions(self):
+        content = dedent(
+            """
+            <!-- BEGIN RELEASE NOTES -->
+            ### [Unreleased]
+            <!-- END RELEASE NOTES -->
+            <!-- BEGIN LINKS -->
+            [Unreleased]: https://some-link.com/HEAD
+            <!-- END LINKS -->
+            """
+        )
+        problems = changelog.ChangelogIndex(content).validate()
+
+        assert problems == [
+            changelog.ChangelogProblem(
+                2,
+                "Expected there to be at least 1 version; None found.",
+            ),
+        ]
+
+    def test_validate_valid(self):
+        assert changelog.ChangelogIndex(self.CONTENT).validate() == []
+
+    def test_validate_reports_all_problems(self):
+        content = (
+            self.CONTENT.replace("#### Added", "#### Addded")
+            .replace("abc...0.1.0", "abc")
+            .replace("[0.2.0]: https://some-link.com/0.1.0...0.2.0", "")
+        )
+        problems = changelog.ChangelogIndex(content).validate()
+
+        assert [problem.line for problem in problems] == [9, 9]
+        assert [str(problem) for problem in problems] == [
+            "line 9: Could not find the link for version 0.2.0.",
+            "line 9: Failed to validate notes for version 0.2.0: unknown "
+            "section `addded`.",
+        ]
+
+
+class TestSegmentSpan:
+    CONTENT = TestChangelogIndex.CONTENT
+    CHANGELOG_PATH = Path("CHANGELOG.md")
+
+    @pytest.fixture(autouse=True)
+    def mock_settings(self):
+        with patch("changelogger.changelog.settings") as mock:
+            mock.CHANGELOG_PATH = self.CHANGELOG_PATH
+            yield mock
+
+    @pytest.fixture
+    def update(self):
+        return ChangelogUpdate(
+            old_version="0.2.0",
+            new_version="0.3.0",
+            release_notes=ReleaseNotes(fixed=["a fix"]),
+        )
+
+    def versioned_file(self, pattern: str, **kwargs) -> VersionedFile:
+        return VersionedFile(
+            rel_path=self.CHANGELOG_PATH,
+            pattern=pattern,
+            **kwargs,
+        )
+
+    def test_overview_ends_at_old_version_heading(
+        self,
+        update: ChangelogUpdate,
+    ):
+        file = self.versioned_file(DEFAULT_OVERVIEW_JINJA_PATTERN)
+
+        start, end = changelog.segment_span(file, update, self.CONTENT)
+
+        assert self.CONTENT[start:].startswith("<!-- BEGIN RELEASE NOTES")
+        assert self.CONTENT[:end].endswith("\n### [0.2.0]")
+
+    def test_links_within_partition(self, update: ChangelogUpdate):
+        file = self.versioned_file(DEFAULT_LINKS_JINJA_PATTERN)
+
+        start, end = changelog.segment_span(file, update, self.CONTENT)
+
+        assert self.CONTENT[start:].startswith("\n[Unreleased]:")
+        assert self.CONTENT[end:].startswith("<!-- END LINKS -->")
+
+    @pytest.mark.parametrize(
+        "rel_path,pattern",
+        [
+            (CHANGELOG_PATH, "custom pattern"),
+            (Path("other.md"), DEFAULT_OVERVIEW_JINJA_PATTERN),
+        ],
+    )
+    def test_unbounded(
+        self,
+        rel_path: Path,
+        pattern: str,
+        update: ChangelogUpdate,
+    ):
+        file = VersionedFile(rel_path=rel_path, pattern=pattern)
+
+        assert changelog.segment_span(file, update, self.CONTENT) is None
+
+    def test_overview_without_old_version(self, update: ChangelogUpdate):
+        file = self.versioned_file(DEFAULT_OVERVIEW_JINJA_PATTERN)
+        update.old_version = VersionInfo.parse("9.9.9")
+
+        assert changelog.segment_span(file, update, self.CONTENT) is None
+
+    @pytest.mark.parametrize(
+        "pattern,template",
+        [
+            (DEFAULT_OVERVIEW_JINJA_PATTERN, DEFAULT_OVERVIEW_TEMPLATE),
+            (DEFAULT_LINKS_JINJA_PATTERN, DEFAULT_LINKS_TEMPLATE),
+        ],
+    )
+    def test_bounded_update_matches_unbounded(
+        self,
+        pattern: str,
+        template: Path,
+        update: ChangelogUpdate,
+    ):
+        file = self.versioned_file(
+            pattern,
+            template=template,
+            context=dict(git=dict(repo="owner/repo", first_commit="abc")),
+        )
+        span = changelog.segment_span(file, update, self.CONTENT)
+
+        assert span
+        assert templating.update(
+            file,
+            update,
+            self.CONTENT,
+            span,
+        ) == templating.update(file, update, self.CONTENT)
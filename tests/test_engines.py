@@ -0,0 +1,101 @@
+import re
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from changelogger import engines
+from changelogger.exceptions import CommandException, PatternTimeoutException
+
+CATASTROPHIC_PATTERN = r"(a+)+$"
+CATASTROPHIC_CONTENT = "a" * 40 + "b"
+
+requires_re2 = pytest.mark.skipif(
+    not engines.is_available(engines.RE2),
+    reason="google-re2 isn't installed.",
+)
+
+
+def test_compile_stdlib():
+    compiled = engines.compile("a.b", re.DOTALL)
+
+    assert isinstance(compiled, re.Pattern)
+    assert compiled.search("a\nb")
+
+
+def test_compile_falls_back_without_re2():
+    with patch("changelogger.engines._re2", return_value=None):
+        compiled = engines.compile("a.b", re.IGNORECASE, engines.RE2)
+
+    assert isinstance(compiled, re.Pattern)
+    assert compiled.search("A-B")
+
+
+@requires_re2
+def test_compile_re2_inline_flags():
+    compiled = engines.compile("^a.b$", re.I | re.M | re.S, engines.RE2)
+
+    assert not isinstance(compiled, re.Pattern)
+    assert compiled.search("x\nA\nB\ny")
+
+
+@requires_re2
+def test_compile_re2_unsupported_flags():
+    with pytest.raises(CommandException, match="Unsupported flags"):
+        engines.compile("a", re.VERBOSE, engines.RE2)
+
+
+@requires_re2
+def test_search_re2_is_linear():
+    compiled = engines.compile(CATASTROPHIC_PATTERN, engine=engines.RE2)
+
+    assert not engines.search(compiled, CATASTROPHIC_CONTENT * 100, timeout=1)
+
+
+@pytest.mark.parametrize("timeout", [None, 5])
+def test_search_within_span(timeout: float | None):
+    compiled = engines.compile("abc")
+
+    assert engines.search(compiled, "xxabcxx", timeout=timeout)
+    assert engines.search(compiled, "xxabcxx", 2, 5, timeout=timeout)
+    assert not engines.search(compiled, "xxabcxx", 3, timeout=timeout)
+    assert not engines.search(compiled, "xxabcxx", 0, 4, timeout=timeout)
+
+
+def test_search_timeout():
+    compiled = engines.compile(CATASTROPHIC_PATTERN)
+
+    with pytest.raises(PatternTimeoutException, match="0.2s timeout"):
+        engines.search(compiled, CATASTROPHIC_CONTENT, timeout=0.2)
+
+
+@pytest.mark.parametrize("timeout", [None, 5])
+def test_time_matches(timeout: float | None):
+    compiled = engines.compile("a+")
+
+    seconds, sizes = engines.time_matches(
+        compiled, "xaaxax", 1, 5, timeout=timeout
+    )
+
+    assert seconds >= 0
+    assert sizes == [2, 1]
+
+
+@pytest.mark.parametrize("timeout", [None, 5])
+def test_time_file_matches(tmp_path: Path, timeout: float | None):
+    path = tmp_path.joinpath("file.txt")
+    path.write_text("xaaxax")
+
+    _, sizes = engines.time_file_matches(
+        engines.compile(b"a+"), path, timeout=timeout
+    )
+
+    assert sizes == [2, 1]
+
+
+def test_time_matches_timeout_after_first_match():
+    # The first match is found at once; only later matches backtrack.
+    compiled = engines.compile(r"(a+)+b")
+
+    with pytest.raises(PatternTimeoutException, match="0.2s timeout"):
+        engines.time_matches(compiled, "ab" + "a" * 30 + "!", timeout=0.2)
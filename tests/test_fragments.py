@@ -0,0 +1,65 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from changelogger import fragments
+from changelogger.exceptions import CommandException
+from changelogger.models.domain_models import ReleaseNotes
+
+
+@pytest.fixture(autouse=True)
+def fragments_dir(tmp_path: Path):
+    fragments_dir = tmp_path.joinpath("unreleased")
+    with patch("changelogger.fragments.settings") as mock_settings:
+        mock_settings.FRAGMENTS_DIR = fragments_dir
+        yield fragments_dir
+
+
+def test_write_one_fragment_per_note(fragments_dir: Path):
+    written = fragments.write(
+        ReleaseNotes(added=["first", "second"], fixed=["third"]),
+    )
+
+    assert len(written) == 3
+    assert fragments.paths() == sorted(written)
+    assert [path.read_text() for path in written] == [
+        "first\n",
+        "second\n",
+        "third\n",
+    ]
+
+
+def test_paths_without_fragments_dir(fragments_dir: Path):
+    assert not fragments_dir.exists()
+    assert fragments.paths() == []
+
+
+def test_merge_appends_fragments_in_order():
+    fragments.write(ReleaseNotes(added=["second"]))
+    fragments.write(ReleaseNotes(added=["third"], security=["fourth"]))
+    release_notes = ReleaseNotes(added=["first"])
+
+    merged = fragments.merge(release_notes, fragments.paths())
+
+    assert merged == ReleaseNotes(
+        added=["first", "second", "third"],
+        security=["fourth"],
+    )
+    assert release_notes == ReleaseNotes(added=["first"])
+
+
+def test_merge_unknown_section(fragments_dir: Path):
+    fragments_dir.mkdir()
+    fragments_dir.joinpath("1-abcd.other.md").write_text("note\n")
+
+    with pytest.raises(CommandException, match="Unknown section `other`"):
+        fragments.merge(ReleaseNotes(), fragments.paths())
+
+
+def test_remove():
+    written = fragments.write(ReleaseNotes(removed=["note"]))
+
+    fragments.remove(written)
+
+    assert fragments.paths() == []
@@ -0,0 +1,133 @@
+import re
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from changelogger import large_files
+from changelogger.conf import settings
+from changelogger.conf.models import VersionedFile
+from changelogger.models.domain_models import (
+    ChangelogUpdate,
+    ReleaseNotes,
+    VersionInfo,
+)
+
+CONTENT = 'name = "example"\nversion = "1.0.0"\n' + "x" * 100 + "\n"
+
+
+@pytest.fixture(autouse=True)
+def large_file_size(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "LARGE_FILE_SIZE", 16)
+
+
+@pytest.fixture
+def update() -> ChangelogUpdate:
+    return ChangelogUpdate(
+        new_version=VersionInfo(1, 1),
+        old_version=VersionInfo(1),
+        release_notes=ReleaseNotes(),
+    )
+
+
+@pytest.fixture
+def path(tmp_path: Path) -> Path:
+    path = tmp_path.joinpath("big.txt")
+    path.write_text(CONTENT)
+    return path
+
+
+def test_is_large(tmp_path: Path, path: Path):
+    small = tmp_path.joinpath("small.txt")
+    small.write_text("small")
+
+    assert large_files.is_large(path)
+    assert not large_files.is_large(small)
+    assert not large_files.is_large(tmp_path.joinpath("missing.txt"))
+
+
+def test_is_large_never_the_changelog(path: Path):
+    with patch.object(settings, "CHANGELOG_PATH", path):
+        assert not large_files.is_large(path)
+
+
+def test_search(path: Path):
+    found = VersionedFile(rel_path=path, pattern=r'version = "1\.0\.0"')
+    missing = VersionedFile(rel_path=path, pattern=r'version = "2\.0\.0"')
+
+    assert large_files.search(found, found.pattern)
+    assert not large_files.search(missing, missing.pattern)
+    assert large_files.search(found, found.pattern, timeout=5)
+
+
+def test_update(
+    tmp_path: Path,
+    path: Path,
+    update: ChangelogUpdate,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # Copy the unchanged ranges in several chunks.
+    monkeypatch.setattr(large_files, "COPY_CHUNK_SIZE", 7)
+    files = [
+        VersionedFile(
+            rel_path=path,
+            pattern=r'version = "{{ old_version }}"',
+            jinja='version = "{{ new_version }}"',
+        ),
+        VersionedFile(
+            rel_path=path,
+            pattern=r'name = "(?P<name>\w+)"',
+            jinja="name = \"{{ match.group('name') }}-{{ match[1] }}\"",
+        ),
+    ]
+
+    updated = large_files.update(path, files, update)
+
+    assert updated
+    assert updated.read_text() == CONTENT.replace(
+        'version = "1.0.0"',
+        'version = "1.1.0"',
+    ).replace('"example"', '"example-example"')
+    assert path.read_text() == CONTENT
+    assert sorted(tmp_path.iterdir()) == sorted([path, updated])
+
+
+def test_update_unchanged(
+    tmp_path: Path,
+    path: Path,
+    update: ChangelogUpdate,
+):
+    files = [VersionedFile(rel_path=path, pattern="version", jinja="version")]
+
+    assert large_files.update(path, files, update) is None
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_update_failure_leaves_file(
+    tmp_path: Path,
+    path: Path,
+    update: ChangelogUpdate,
+):
+    files = [
+        VersionedFile(rel_path=path, pattern="version", jinja="release"),
+        VersionedFile(rel_path=path, pattern="x+", jinja="{{ oops() }}"),
+    ]
+
+    with pytest.raises(Exception):
+        large_files.update(path, files, update)
+
+    assert path.read_text() == CONTENT
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_text_match():
+    match = re.search(rb"(?P<a>a)(b)?(c)", b"ac")
+    assert match
+    text_match = large_files.TextMatch(match)
+
+    assert text_match.group() == "ac"
+    assert text_match.group(1, 3) == ("a", "c")
+    assert text_match["a"] == "a"
+    assert text_match.groups() == ("a", None, "c")
+    assert text_match.groupdict() == {"a": "a"}
+    assert text_match.span() == (0, 2)
@@ -0,0 +1,90 @@
+import re
+from unittest.mock import patch
+
+import pytest
+
+from changelogger import engines, literals
+from changelogger.exceptions import CommandException
+
+requires_re2 = pytest.mark.skipif(
+    not engines.is_available(engines.RE2),
+    reason="google-re2 isn't installed.",
+)
+
+
+@pytest.mark.parametrize(
+    "pattern,content",
+    [
+        ("1.0.0", "version = 1.0.0; previous = 1.0.0"),
+        ("aa", "aaaaa"),
+        ("(a+)+", "(a+)+ isn't a regex here"),
+        ("missing", "version = 1.0.0"),
+        ("", "ab"),
+        (b"1.0.0", b"version = 1.0.0"),
+    ],
+)
+def test_finditer_matches_escaped_regex(pattern, content):
+    expected = [
+        (m.span(), m.group()) for m in re.finditer(re.escape(pattern), content)
+    ]
+
+    actual = [
+        (m.span(), m.group())
+        for m in literals.compile(pattern).finditer(content)
+    ]
+
+    assert actual == expected
+
+
+def test_search_within_positions():
+    compiled = literals.compile("1.0.0")
+    content = "1.0.0 then 1.0.0"
+
+    match = compiled.search(content, 1)
+
+    assert match and match.span() == (11, 16)
+    assert compiled.search(content, 1, 15) is None
+
+
+def test_match():
+    match = literals.compile("1.0.0").search("v1.0.0")
+
+    assert match
+    assert match.group() == match[0] == "1.0.0"
+    assert match.group(0, 0) == ("1.0.0", "1.0.0")
+    assert match.groups() == ()
+    assert match.groupdict() == {}
+    assert (match.start(), match.end()) == (1, 6)
+    with pytest.raises(IndexError):
+        match.group(1)
+
+
+def test_compile_ignorecase_unsupported():
+    with pytest.raises(CommandException):
+        literals.compile("version", re.IGNORECASE)
+
+
+def test_find_all_without_re2():
+    found = ["ab", "bc", "zz"] * literals.AUTOMATON_MIN_LITERALS
+
+    with patch("changelogger.engines._re2", return_value=None):
+        assert literals.find_all(found, "abc") == [True, True, False] * (
+            literals.AUTOMATON_MIN_LITERALS
+        )
+
+
+@requires_re2
+def test_find_all_automaton_finds_overlapping_literals():
+    patterns = ["ab", "bc", "a.c", "zz"] * literals.AUTOMATON_MIN_LITERALS
+
+    found = literals.find_all(patterns, "abc")
+    found_bytes = literals.find_all(
+        [pattern.encode() for pattern in patterns],
+        b"abc",
+    )
+
+    assert (
+        found
+        == found_bytes
+        == [True, True, False, False] * (literals.AUTOMATON_MIN_LITERALS)
+    )
@@ -0,0 +1,54 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from changelogger import metrics
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_increment():
+    metrics.increment(metrics.FILE_READS)
+    metrics.increment(metrics.BYTES_READ, 10)
+    metrics.increment(metrics.BYTES_READ, 5)
+
+    assert metrics.snapshot() == {
+        metrics.BYTES_READ: 15,
+        metrics.FILE_READS: 1,
+    }
+
+
+def test_increment_from_threads():
+    with ThreadPoolExecutor(8) as executor:
+        for _ in range(1000):
+            executor.submit(metrics.increment, metrics.REGEX_REUSES)
+
+    assert metrics.snapshot() == {metrics.REGEX_REUSES: 1000}
+
+
+def test_dump(tmp_path: Path):
+    metrics.increment(metrics.JINJA_COMPILES, 2)
+    path = tmp_path.joinpath("metrics.json")
+
+    metrics.dump(path, command="check")
+
+    dumped = json.loads(path.read_text())
+    assert dumped["command"] == "check"
+    assert dumped["counters"] == {metrics.JINJA_COMPILES: 2}
+    assert "version" in dumped
+
+
+def test_dump_to_stderr(capsys: pytest.CaptureFixture):
+    metrics.increment(metrics.FILE_WRITES)
+
+    metrics.dump(Path("-"))
+
+    dumped = json.loads(capsys.readouterr().err)
+    assert dumped["counters"] == {metrics.FILE_WRITES: 1}
@@ -0,0 +1,76 @@
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from changelogger import profiling
+
+
+@pytest.fixture(autouse=True)
+def reset_profiling():
+    yield
+    profiling.disable()
+    profiling._spans.clear()
+
+
+def test_span_disabled_records_nothing():
+    with profiling.span("file read"):
+        pass
+
+    assert profiling.spans() == []
+
+
+def test_span_records_duration_and_args():
+    profiling.enable()
+    with profiling.span("file read", path=Path("CHANGELOG.md")):
+        pass
+
+    (recorded,) = profiling.spans()
+    assert recorded.name == "file read"
+    assert recorded.duration_ns >= 0
+    assert recorded.thread_id == threading.get_ident()
+    assert recorded.args == dict(path="CHANGELOG.md")
+
+
+def test_span_records_on_exception():
+    profiling.enable()
+    with pytest.raises(ValueError):
+        with profiling.span("rollback"):
+            raise ValueError()
+
+    assert [recorded.name for recorded in profiling.spans()] == ["rollback"]
+
+
+def test_summary():
+    profiling.enable()
+    for name in ("file read", "file read", "file write"):
+        with profiling.span(name):
+            pass
+
+    summary = profiling.summary()
+
+    assert {row["name"]: row["count"] for row in summary} == {
+        "file read": 2,
+        "file write": 1,
+    }
+    assert [row["total_ms"] for row in summary] == sorted(
+        (row["total_ms"] for row in summary),
+        reverse=True,
+    )
+
+
+def test_write_trace(tmp_path: Path):
+    profiling.enable()
+    with profiling.span("changelog parse", cached=False):
+        pass
+    trace_path = tmp_path.joinpath("trace.json")
+
+    profiling.write_trace(trace_path)
+
+    (event,) = json.loads(trace_path.read_text())["traceEvents"]
+    assert event["name"] == "changelog parse"
+    assert event["ph"] == "X"
+    assert event["ts"] >= 0
+    assert event["dur"] >= 0
+    assert event["args"] == dict(cached="False")
@@ -1,9 +1,17 @@
+import re
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 from freezegun import freeze_time
 
 from changelogger import templating
+from changelogger.conf.models import MatchMode, VersionedFile
+from changelogger.models.domain_models import (
+    ChangelogUpdate,
+    ReleaseNotes,
+    VersionInfo,
+)
 
 
 class TemplatingFixtures:
@@ -79,6 +87,8 @@ class TestTemplating(TemplatingFixtures):
         file.jinja = r"# This {{ match.rest | reverse }}{{ match.word }}"
         file.context = {}
         file.template = None
+        file.is_literal = False
+        file.regex_flags = 0
 
         content = """
         # This is a test
@@ -100,6 +110,75 @@ class TestTemplating(TemplatingFixtures):
         )
         assert actual == expected
 
+    def test_rewrite(
+        self,
+    ) -> None:
+        file = MagicMock()
+        file.pattern = r"v(\d)"
+        file.jinja = r"v{{ match.group(1) | int + 1 }}"
+        file.context = {}
+        file.template = None
+        file.is_literal = False
+        file.regex_flags = 0
+
+        content = "v1 v2 | v1 v2"
+
+        segments = templating.rewrite(
+            file,
+            MagicMock(),
+            content,
+            (len("v1 v2 | "), len(content)),
+        )
+
+        assert segments == ["v1 v2 | ", "", "v2", " ", "v3", ""]
+
+    def test_update_literal(self) -> None:
+        file = VersionedFile(
+            rel_path=Path("version.txt"),
+            pattern="version = {{ old_version }} (stable)",
+            jinja="version = {{ new_version }} (stable)",
+            match=MatchMode.LITERAL,
+        )
+        update = ChangelogUpdate(
+            new_version=VersionInfo(1, 1),
+            old_version=VersionInfo(1),
+            release_notes=ReleaseNotes(),
+        )
+        content = "version = 1x0x0 (stable)\nversion = 1.0.0 (stable)\n"
+
+        actual = templating.update(file, update, content)
+
+        assert actual == (
+            "version = 1x0x0 (stable)\nversion = 1.1.0 (stable)\n"
+        )
+
+    def test_replacer_renders_once_per_distinct_match(
+        self,
+        mock_render_jinja: MagicMock,
+    ) -> None:
+        file = MagicMock()
+        file.jinja = "jinja"
+        file.template = None
+        repl = templating.replacer(file, MagicMock(), dict(base="variables"))
+
+        matches = [re.match(r"(\w)\w", text) for text in ("ab", "ab", "ac")]
+        replacements = [repl(match) for match in matches]
+
+        assert mock_render_jinja.call_count == 2
+        assert replacements == [
+            mock_render_jinja(),
+            mock_render_jinja(),
+            mock_render_jinja(),
+        ]
+        mock_render_jinja.assert_any_call(
+            "jinja",
+            dict(base="variables", match=matches[0]),
+        )
+        mock_render_jinja.assert_any_call(
+            "jinja",
+            dict(base="variables", match=matches[2]),
+        )
+
     def test_update_neither_jinja_raises(
         self,
     ):
@@ -121,6 +200,7 @@ class TestTemplating(TemplatingFixtures):
         file = MagicMock()
         file.jinja = "jinja"
         file.template = None
+        file.is_literal = False
 
         content = "Some content"
         update = MagicMock()
@@ -134,8 +214,10 @@ class TestTemplating(TemplatingFixtures):
 
         mock_cached_compile.assert_called_once_with(
             mock_settings.TMPL_ENV.from_string().render(),
+            file.regex_flags,
+            file.engine,
         )
-        mock_cached_compile().sub.assert_called_once()
+        mock_cached_compile().finditer.assert_called_once()
 
     def test_update_from_template(
         self,
@@ -146,6 +228,7 @@ class TestTemplating(TemplatingFixtures):
         file = MagicMock()
         file.jinja = None
         file.template = "some_tmpl.jinja2"
+        file.is_literal = False
 
         content = "Some content"
         update = MagicMock()
@@ -157,7 +240,7 @@ class TestTemplating(TemplatingFixtures):
 
         mock_get_variables.assert_called_once_with(file, update)
 
-        mock_cached_compile().sub.assert_called_once()
+        mock_cached_compile().finditer.assert_called_once()
 
     def test_render_jinja(
         self,
@@ -188,3 +271,31 @@ class TestTemplating(TemplatingFixtures):
             **variables,
         )
         assert actual == mock_settings.TMPL_ENV.get_template().render()
+
+    def test_render_jinja_compiles_once(
+        self,
+        mock_settings: MagicMock,
+    ):
+        s = "some string"
+        before = templating.cache_stats()["jinja"]
+        templating.render_jinja(s, dict(hello="world"))
+        templating.render_jinja(s, dict(hello="there"))
+
+        mock_settings.TMPL_ENV.from_string.assert_called_once_with(s)
+        after = templating.cache_stats()["jinja"]
+        assert after["misses"] == before["misses"] + 1
+        assert after["hits"] == before["hits"] + 1
+
+    def test_render_template_loads_once(
+        self,
+        mock_settings: MagicMock,
+    ):
+        template = "template.jinja2"
+        before = templating.cache_stats()["template"]
+        templating.render_template(template, dict(hello="world"))
+        templating.render_template(template, dict(hello="there"))
+
+        mock_settings.TMPL_ENV.get_template.assert_called_once_with(template)
+        after = templating.cache_stats()["template"]
+        assert after["misses"] == before["misses"] + 1
+        assert after["hits"] == before["hits"] + 1
@@ -0,0 +1,337 @@
+import errno
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from changelogger import transaction
+from changelogger.exceptions import UpgradeException
+
+
+class TestTransaction:
+    @pytest.fixture(autouse=True)
+    def mock_settings(self, tmp_path_factory: pytest.TempPathFactory):
+        with patch("changelogger.transaction.settings") as mock:
+            mock.CACHE_DIR = tmp_path_factory.mktemp("cache")
+            yield mock
+
+    @pytest.fixture
+    def journal(self) -> Path:
+        return transaction.journal_path()
+
+    @pytest.fixture
+    def paths(self, tmp_path: Path) -> list[Path]:
+        paths = [tmp_path.joinpath("a.txt"), tmp_path.joinpath("b.txt")]
+        for path in paths:
+            path.write_text(f"old {path.stem}")
+        return paths
+
+    def test_commit(self, tmp_path: Path, paths: list[Path], journal: Path):
+        txn = transaction.Transaction()
+        txn.begin(paths)
+        for path in paths:
+            txn.stage(path, ["new ", path.stem])
+
+        assert [path.read_text() for path in paths] == ["old a", "old b"]
+        assert json.loads(journal.read_text())["state"] == transaction.STAGING
+
+        txn.commit()
+        txn.end()
+
+        assert [path.read_text() for path in paths] == ["new a", "new b"]
+        assert txn.committed == paths
+        assert sorted(tmp_path.iterdir()) == paths
+        assert not journal.exists()
+
+    def test_commit_symlink(self, tmp_path: Path, paths: list[Path]):
+        link = tmp_path.joinpath("link.txt")
+        link.symlink_to(paths[0])
+        txn = transaction.Transaction()
+        txn.begin([link])
+        txn.stage(link, ["new"])
+        txn.snapshot(link)
+        txn.commit()
+
+        assert link.is_symlink()
+        assert paths[0].read_text() == "new"
+
+        txn.rollback()
+        txn.end()
+
+        assert link.is_symlink()
+        assert paths[0].read_text() == "old a"
+        assert sorted(tmp_path.iterdir()) == [*paths, link]
+
+    def test_commit_in_path_order(self, paths: list[Path]):
+        txn = transaction.Transaction()
+        txn.begin(paths)
+        for path in reversed(paths):
+            txn.stage(path, ["new"])
+        txn.commit()
+        txn.end()
+
+        assert txn.committed == paths
+
+    def test_begin_journal_exists_raises(self, paths: list[Path]):
+        transaction.Transaction().begin(paths)
+
+        with pytest.raises(UpgradeException):
+            transaction.Transaction().begin(paths)
+
+    def test_end_removes_uncommitted(
+        self,
+        tmp_path: Path,
+        paths: list[Path],
+        journal: Path,
+    ):
+        txn = transaction.Transaction()
+        txn.begin(paths)
+        txn.stage(paths[0], ["new"])
+        txn.snapshot(paths[0])
+        txn.end()
+
+        assert paths[0].read_text() == "old a"
+        assert sorted(tmp_path.iterdir()) == paths
+        assert not list(
+            journal.parent.glob(f"{transaction.SNAPSHOTS_PREFIX}*")
+        )
+
+    def test_snapshot(self, paths: list[Path], journal: Path):
+        txn = transaction.Transaction()
+        txn.begin(paths)
+        for path in paths:
+            txn.snapshot(path)
+
+        assert txn.snapshot_dir
+        assert txn.snapshot_dir.parent == journal.parent
+        assert [txn.snapshots[path].read_text() for path in paths] == [
+            "old a",
+            "old b",
+        ]
+        assert txn.snapshots[paths[0]].samefile(paths[0])
+        assert json.loads(journal.read_text())["snapshots"] == str(
+            txn.snapshot_dir
+        )
+
+    def test_snapshot_copies_when_link_fails(self, paths: list[Path]):
+        paths[0].chmod(0o755)
+        txn = transaction.Transaction()
+        txn.begin(paths)
+        with patch(
+            "changelogger.transaction.os.link",
+            side_effect=OSError("cross-device link"),
+        ):
+            txn.snapshot(paths[0])
+
+        snapshot = txn.snapshots[paths[0]]
+        assert snapshot.read_text() == "old a"
+        assert not snapshot.samefile(paths[0])
+        assert snapshot.stat().st_mode & 0o777 == 0o755
+
+    def test_rollback(self, tmp_path: Path, paths: list[Path]):
+        txn = transaction.Transaction()
+        txn.begin(paths)
+        for path in paths:
+            txn.stage(path, ["new"])
+            txn.snapshot(path)
+        txn.commit()
+        txn.rollback()
+        txn.end()
+
+        assert [path.read_text() for path in paths] == ["old a", "old b"]
+        assert sorted(tmp_path.iterdir()) == paths
+
+    def test_rollback_copied_snapshots_across_devices(
+        self,
+        tmp_path: Path,
+        paths: list[Path],
+    ):
+        txn = transaction.Transaction()
+        txn.begin(paths)
+        with patch(
+            "changelogger.transaction.os.link",
+            side_effect=OSError("cross-device link"),
+        ):
+            for path in paths:
+                txn.stage(path, ["new"])
+                txn.snapshot(path)
+        txn.commit()
+
+        replace = transaction.os.replace
+        snapshots = set(txn.snapshots.values())
+
+        def cross_device(source: Path, target: Path) -> None:
+            if source in snapshots:
+                raise OSError(errno.EXDEV, "Invalid cross-device link")
+            replace(source, target)
+
+        with patch(
+            "changelogger.transaction.os.replace",
+            side_effect=cross_device,
+        ):
+            txn.rollback()
+        txn.end()
+
+        assert [path.read_text() for path in paths] == ["old a", "old b"]
+        assert sorted(tmp_path.iterdir()) == paths
+
+    def test_stage_write_fails(self, tmp_path: Path, paths: list[Path]):
+        def fail_partway():
+            yield "new"
+            raise OSError(errno.ENOSPC, "No space left on device")
+
+        txn = transaction.Transaction()
+        txn.begin(paths)
+        with pytest.raises(OSError):
+            txn.stage(paths[0], fail_partway())
+        txn.end()
+
+        assert not txn.staged
+        assert paths[0].read_text() == "old a"
+        assert sorted(tmp_path.iterdir()) == paths
+
+    def test_stage_file(self, tmp_path: Path, paths: list[Path]):
+        source = tmp_path.joinpath("source")
+        source.write_text("new")
+        paths[0].chmod(0o755)
+        txn = transaction.Transaction()
+        txn.begin(paths)
+        txn.stage_file(paths[0], source)
+        txn.commit()
+        txn.end()
+
+        assert paths[0].read_text() == "new"
+        assert paths[0].stat().st_mode & 0o777 == 0o755
+        assert not source.exists()
+
+    def test_commit_interrupted(self, paths: list[Path]):
+        txn = transaction.Transaction()
+        txn.begin(paths)
+        for path in paths:
+            txn.stage(path, ["new"])
+
+        replace = transaction.os.replace
+
+        def fail_second(source: Path, target: Path) -> None:
+            if target == paths[1]:
+                raise OSError("oops")
+            replace(source, target)
+
+        with patch(
+            "changelogger.transaction.os.replace",
+            side_effect=fail_second,
+        ), pytest.raises(OSError):
+            txn.commit()
+
+        assert txn.committed == paths[:1]
+        assert [path.read_text() for path in paths] == ["new", "old b"]
+
+    def test_recover_undoes_failed_rollback(
+        self,
+        tmp_path: Path,
+        journal: Path,
+    ):
+        paths = [tmp_path.joinpath(f"f{i}.txt") for i in range(3)]
+        for path in paths:
+            path.write_text("old")
+        txn = transaction.Transaction()
+        txn.begin(paths)
+        for path in paths:
+            txn.stage(path, ["new"])
+            txn.snapshot(path)
+
+        replace = transaction.os.replace
+        snapshots = txn.snapshots
+
+        def fail_third_and_first_restore(source: Path, target: Path) -> None:
+            if target == paths[2] or source == snapshots[paths[0]]:
+                raise OSError("oops")
+            replace(source, target)
+
+        with patch(
+            "changelogger.transaction.os.replace",
+            side_effect=fail_third_and_first_restore,
+        ):
+            with pytest.raises(OSError):
+                txn.commit()
+            with pytest.raises(OSError):
+                txn.rollback()
+
+            assert [path.read_text() for path in paths] == [
+                "new",
+                "old",
+                "old",
+            ]
+            assert json.loads(journal.read_text())["state"] == (
+                transaction.ROLLING_BACK
+            )
+
+            # The snapshots are kept until every file is restored.
+            with pytest.raises(OSError):
+                transaction.recover()
+            assert journal.exists()
+            assert snapshots[paths[0]].exists()
+
+        recovery = transaction.recover()
+
+        assert recovery == transaction.Recovery(False, paths)
+        assert [path.read_text() for path in paths] == ["old", "old", "old"]
+        assert sorted(tmp_path.iterdir()) == paths
+        assert not journal.exists()
+        assert not list(
+            journal.parent.glob(f"{transaction.SNAPSHOTS_PREFIX}*")
+        )
+
+    def test_recover_nothing(self):
+        assert transaction.recover() is None
+
+    def test_recover_finishes_committing(
+        self,
+        tmp_path: Path,
+        paths: list[Path],
+        journal: Path,
+    ):
+        txn = transaction.Transaction()
+        txn.begin(paths)
+        for path in paths:
+            txn.stage(path, ["new"])
+            txn.snapshot(path)
+        transaction._write_journal(
+            transaction.COMMITTING,
+            paths,
+            txn.snapshot_dir,
+        )
+        # Interrupted after the first file was renamed.
+        transaction.staged_path(paths[0]).replace(paths[0])
+
+        recovery = transaction.recover()
+
+        assert recovery == transaction.Recovery(True, paths)
+        assert [path.read_text() for path in paths] == ["new", "new"]
+        assert sorted(tmp_path.iterdir()) == paths
+        assert not list(
+            journal.parent.glob(f"{transaction.SNAPSHOTS_PREFIX}*")
+        )
+
+    def test_recover_undoes_staging(
+        self,
+        tmp_path: Path,
+        paths: list[Path],
+        journal: Path,
+    ):
+        txn = transaction.Transaction()
+        txn.begin(paths)
+        txn.stage(paths[0], ["new"])
+
+        recovery = transaction.recover()
+
+        assert recovery == transaction.Recovery(False, paths)
+        assert [path.read_text() for path in paths] == ["old a", "old b"]
+        assert sorted(tmp_path.iterdir()) == paths
+        assert not journal.exists()
+
+    def test_staged_path(self):
+        assert transaction.staged_path(Path("dir/file.txt")) == Path(
+            f"dir/.file.txt{transaction.STAGED_SUFFIX}"
+        )
@@ -1,10 +1,18 @@
 import re
 import secrets
+from pathlib import Path
 from unittest.mock import MagicMock, call, patch
 
 import pytest
 
-from changelogger.utils import cached_compile
+from changelogger import metrics, utils
+from changelogger.utils import (
+    cached_compile,
+    read_text,
+    register_pattern,
+    write_segments,
+    write_text,
+)
 
 
 class TestUtils:
@@ -23,7 +31,7 @@ class TestUtils:
         cached_compile(pattern)
         cached_compile(pattern)
 
-        mock_compile.assert_called_once_with(pattern)
+        mock_compile.assert_called_once_with(pattern, 0)
 
     def test_cached_compile_called_twice_diff_pattern(
         self,
@@ -37,7 +45,100 @@ class TestUtils:
 
         mock_compile.assert_has_calls(
             [
-                call(pattern1),
-                call(pattern2),
+                call(pattern1, 0),
+                call(pattern2, 0),
             ]
         )
+
+    def test_cached_compile_counts_compiles_and_reuses(self) -> None:
+        pattern = secrets.token_hex(5)
+        before = metrics.snapshot()
+
+        cached_compile(pattern)
+        cached_compile(pattern)
+        cached_compile(pattern)
+
+        after = metrics.snapshot()
+        assert after[metrics.REGEX_COMPILES] == (
+            before.get(metrics.REGEX_COMPILES, 0) + 1
+        )
+        assert after[metrics.REGEX_REUSES] == (
+            before.get(metrics.REGEX_REUSES, 0) + 2
+        )
+
+    def test_write_segments(self, tmp_path: Path) -> None:
+        path = tmp_path.joinpath("version.py")
+        metrics.reset()
+
+        write_segments(path, ['version = "', "", "1.0.0", '"\n'])
+
+        assert path.read_text() == 'version = "1.0.0"\n'
+        assert metrics.snapshot() == {
+            metrics.BYTES_WRITTEN: len('version = "1.0.0"\n'),
+            metrics.FILE_WRITES: 1,
+        }
+
+    def test_read_and_write_text_count_bytes(self, tmp_path: Path) -> None:
+        path = tmp_path.joinpath("CHANGELOG.md")
+        metrics.reset()
+
+        with patch("changelogger.utils.settings") as mock_settings:
+            mock_settings.CHANGELOG_PATH = path
+            write_text(path, "versión")
+            assert read_text(path) == "versión"
+
+        assert metrics.snapshot() == {
+            metrics.BYTES_READ: 8,
+            metrics.BYTES_WRITTEN: 8,
+            metrics.CHANGELOG_READS: 1,
+            metrics.FILE_READS: 1,
+            metrics.FILE_WRITES: 1,
+        }
+
+    def test_read_text_universal_newlines(self, tmp_path: Path) -> None:
+        path = tmp_path.joinpath("file.txt")
+        path.write_bytes(b"a\r\nb\rc\n")
+
+        assert read_text(path) == path.read_text() == "a\nb\nc\n"
+
+    def test_cached_compile_evicts_least_recently_used(self) -> None:
+        patterns = [secrets.token_hex(5) for _ in range(3)]
+        with patch.object(utils, "REGEX_CACHE_SIZE", 2):
+            first = cached_compile(patterns[0])
+            cached_compile(patterns[1])
+            # Using the first pattern again makes the second the oldest.
+            assert cached_compile(patterns[0]) is first
+            cached_compile(patterns[2])
+
+            assert cached_compile(patterns[0]) is first
+            assert utils.regex_cache_stats()["currsize"] <= 2
+            assert (patterns[1], 0) not in utils._compiled
+
+    def test_cached_compile_with_flags(self) -> None:
+        pattern = secrets.token_hex(5)
+
+        assert cached_compile(pattern, re.I) is not cached_compile(pattern)
+        assert cached_compile(pattern, re.I).flags & re.I
+
+    def test_cached_compile_stats(self) -> None:
+        pattern = secrets.token_hex(5)
+        before = utils.regex_cache_stats()
+
+        cached_compile(pattern)
+        cached_compile(pattern)
+
+        after = utils.regex_cache_stats()
+        assert after["misses"] == before["misses"] + 1
+        assert after["hits"] == before["hits"] + 1
+
+    def test_registered_patterns_are_not_evicted(
+        self,
+        mock_compile: MagicMock,
+    ) -> None:
+        pattern = secrets.token_hex(5)
+        registered = register_pattern(pattern)
+
+        with patch.object(utils, "REGEX_CACHE_SIZE", 0):
+            assert cached_compile(pattern) is registered
+
+        mock_compile.assert_called_once_with(pattern, 0)